@@ -0,0 +1,131 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from biosync.renderers import ColumnarJSONRenderer, PackedColumnarRenderer
+
+from .models import BiometricData, BIOMETRIC_METRICS
+
+COLUMNAR_FORMAT = 'biosync-columnar'
+COLUMNAR_VERSION = 1
+COLUMNAR_RENDERERS = (ColumnarJSONRenderer, PackedColumnarRenderer)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+def _scales():
+    """Decimal places per metric: decimals are sent as integers scaled by 10**places."""
+    return {
+        metric: getattr(BiometricData._meta.get_field(metric), 'decimal_places', 0)
+        for metric in BIOMETRIC_METRICS
+    }
+
+
+def _parse_bound(value, name, end=False):
+    """An ISO datetime, or a date meaning the start (or, for `end`, the end) of that day."""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({name: "Must be an ISO 8601 date or datetime."})
+        parsed = datetime.combine(day, time.max if end else time.min)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def encode_columns(rows, scales):
+    """
+    Turns (timestamp, *metrics) rows into the columnar payload's `t0` and `columns`:
+
+    - `timestamp`: `{"delta": [...]}`, milliseconds since the previous sample (0 for the first,
+      which is `t0` ms after the Unix epoch);
+    - each metric: `{"values": [...]}`, plus `"index": [...]` (delta-encoded row numbers) when
+      some rows are null, so nulls take no space; metrics null on every row are left out.
+      Decimals are integers scaled by `10**scale`, e.g. 72.35 kg is `7235` with `"scale": 2`.
+    """
+    if not rows:
+        return None, {}
+    timestamps, *metric_columns = zip(*rows)
+
+    millis = [(ts - _EPOCH) // _MILLISECOND for ts in timestamps]
+    columns = {'timestamp': {'delta': [0] + [b - a for a, b in zip(millis, millis[1:])]}}
+
+    for metric, values in zip(BIOMETRIC_METRICS, metric_columns):
+        scale = scales[metric]
+        present = [index for index, value in enumerate(values) if value is not None]
+        if not present:
+            continue
+        column = {}
+        if len(present) < len(values):
+            column['index'] = [present[0]] + [b - a for a, b in zip(present, present[1:])]
+            values = [values[index] for index in present]
+        if scale:
+            factor = 10 ** scale
+            column['scale'] = scale
+            column['values'] = [int(value * factor) for value in values]
+        else:
+            column['values'] = list(values)
+        columns[metric] = column
+    return millis[0], columns
+
+
+class ColumnarListMixin:
+    """
+    Opt-in compact list format for biometric time series, negotiated like any DRF format:
+    `Accept: application/vnd.biosync.columnar+json` (or `?format=columnar`) for column arrays,
+    `Accept: application/vnd.biosync.packed` (or `?format=packed`) for the same columns as
+    little-endian typed arrays (see PackedColumnarRenderer).
+
+    Samples are returned oldest first, filtered by `start`/`end` (ISO dates or datetimes,
+    inclusive) and continued with the `next` link. The email, ids and audit timestamps of the
+    row format are omitted; timestamps have millisecond precision. Other formats and actions
+    are unaffected.
+    """
+    columnar_limit = 50000
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == 'list':
+            renderers += [renderer() for renderer in COLUMNAR_RENDERERS]
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format not in {renderer.format for renderer in COLUMNAR_RENDERERS}:
+            return super().list(request, *args, **kwargs)
+
+        params = request.query_params
+        samples = BiometricData.objects.filter(user=request.user)
+        if params.get('start'):
+            samples = samples.filter(timestamp__gte=_parse_bound(params['start'], 'start'))
+        if params.get('end'):
+            samples = samples.filter(timestamp__lte=_parse_bound(params['end'], 'end', end=True))
+        if params.get('after'):
+            samples = samples.filter(timestamp__gt=_parse_bound(params['after'], 'after'))
+
+        try:
+            limit = min(int(params.get('limit', self.columnar_limit)), self.columnar_limit)
+        except ValueError:
+            raise ValidationError({'limit': "Must be an integer."})
+        if limit < 1:
+            raise ValidationError({'limit': "Must be positive."})
+
+        rows = list(samples.order_by('timestamp').values_list('timestamp', *BIOMETRIC_METRICS)[:limit + 1])
+        next_link = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_link = replace_query_param(request.build_absolute_uri(), 'after', rows[-1][0].isoformat())
+
+        t0, columns = encode_columns(rows, _scales())
+        return Response({
+            'format': COLUMNAR_FORMAT,
+            'version': COLUMNAR_VERSION,
+            'count': len(rows),
+            'time_unit': 'ms',
+            't0': t0,
+            'columns': columns,
+            'next': next_link,
+        })
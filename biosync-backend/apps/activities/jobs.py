@@ -0,0 +1,44 @@
+from apps.jobs.queue import job
+from apps.users.models import CustomUser
+
+from .readiness import rescore_readiness as rescore
+from .records import rebuild_personal_records as rebuild_records
+from .rollups import rebuild_biometric_rollups as rebuild_rollups
+from .stats import rebuild_training_stats as rebuild_stats
+
+
+def _merge_record_keys(pending, new):
+    """One rebuild covers both exercise key sets; None (every exercise) covers anything."""
+    if pending.get('keys') is None or new.get('keys') is None:
+        return {**pending, 'keys': None}
+    return {**pending, 'keys': sorted(set(pending['keys']) | set(new['keys']))}
+
+
+@job('activities.rebuild_personal_records', key=['user_id'], coalesce=_merge_record_keys)
+def rebuild_personal_records(user_id, keys=None):
+    """Recomputes the user's records for `keys` (every exercise when None); see records.py."""
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is not None:
+        rebuild_records(user, keys)
+
+
+@job('activities.rebuild_training_stats')
+def rebuild_training_stats(user_id):
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is not None:
+        rebuild_stats(user)
+
+
+@job('activities.rebuild_biometric_rollups')
+def rebuild_biometric_rollups(user_id, chunk_days=90):
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is not None:
+        rebuild_rollups(user, chunk_days=chunk_days)
+
+
+@job('activities.rescore_readiness')
+def rescore_readiness(user_id):
+    """Rescores the user's whole history after samples were backdated, edited or deleted."""
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is not None:
+        rescore(user)
@@ -0,0 +1,134 @@
+import math
+from datetime import timedelta
+
+from django.db.models import Sum
+
+from .models import DailyTrainingVolume
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without it the same series are computed in pure Python
+    np = None
+
+# Daily training load, measured two ways: lifted volume (sum of weight x reps) and minutes trained
+LOAD_MEASURES = ('volume_kg', 'duration_minutes')
+# Rolling windows (in days) of the acute and chronic load
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+
+
+def daily_loads(user, start, end):
+    """
+    The user's load per day from `start` to `end` (inclusive), CHRONIC_DAYS - 1 days of history
+    before `start` included: {measure: [load of each day]}, rest days as 0. One aggregated query
+    over the daily stats table, whatever the length of the history.
+    """
+    first = start - timedelta(days=CHRONIC_DAYS - 1)
+    length = (end - first).days + 1
+    loads = {measure: [0.0] * length for measure in LOAD_MEASURES}
+    rows = (
+        DailyTrainingVolume.objects.filter(user=user, day__gte=first, day__lte=end)
+        .values('day').annotate(**{measure: Sum(measure) for measure in LOAD_MEASURES})
+        .order_by('day').values_list('day', *LOAD_MEASURES)
+    )
+    for day, *values in rows:
+        for measure, value in zip(LOAD_MEASURES, values):
+            loads[measure][(day - first).days] = float(value or 0)
+    return loads
+
+
+def _load_series_numpy(loads, days):
+    """load_series for one measure with NumPy: every window is a row of a strided view, no copy."""
+    loads = np.asarray(loads, dtype=np.float64)
+    chronic_windows = np.lib.stride_tricks.sliding_window_view(loads, CHRONIC_DAYS)[-days:]
+    acute_windows = chronic_windows[:, -ACUTE_DAYS:]
+
+    weekly = acute_windows.sum(axis=1)
+    acute = weekly / ACUTE_DAYS
+    chronic = chronic_windows.mean(axis=1)
+    deviation = acute_windows.std(axis=1)
+    # Undefined (NaN, rendered as null) without a chronic load, or for a week of identical loads
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+        monotony = np.where(np.ptp(acute_windows, axis=1) > 0, acute / deviation, np.nan)
+    return {
+        'load': loads[-days:],
+        'acute': acute,
+        'chronic': chronic,
+        'acwr': acwr,
+        'monotony': monotony,
+        'strain': weekly * monotony,
+    }
+
+
+def _load_series_python(loads, days):
+    """load_series for one measure without NumPy, the same formulas one window at a time."""
+    series = {name: [] for name in ('load', 'acute', 'chronic', 'acwr', 'monotony', 'strain')}
+    for end in range(len(loads) - days, len(loads)):
+        chronic_window = loads[end - CHRONIC_DAYS + 1:end + 1]
+        acute_window = chronic_window[-ACUTE_DAYS:]
+        weekly = sum(acute_window)
+        acute = weekly / ACUTE_DAYS
+        chronic = sum(chronic_window) / CHRONIC_DAYS
+        deviation = math.sqrt(sum((load - acute) ** 2 for load in acute_window) / ACUTE_DAYS)
+        monotony = acute / deviation if max(acute_window) > min(acute_window) else math.nan
+        for name, value in (
+            ('load', loads[end]), ('acute', acute), ('chronic', chronic),
+            ('acwr', acute / chronic if chronic > 0 else math.nan),
+            ('monotony', monotony), ('strain', weekly * monotony),
+        ):
+            series[name].append(value)
+    return series
+
+
+def _rounded(values, digits):
+    """The values as a list of rounded floats, NaN as None."""
+    if np is not None and isinstance(values, np.ndarray):
+        values = np.round(values, digits).tolist()
+    else:
+        values = [round(value, digits) for value in values]
+    return [None if value != value else value for value in values]
+
+
+def load_series(loads, days, use_numpy=None):
+    """
+    Training load indicators for the last `days` days of one daily load series (as returned by
+    daily_loads, so CHRONIC_DAYS - 1 days longer), per day:
+
+    - acute / chronic: average daily load over the last ACUTE_DAYS / CHRONIC_DAYS days, the
+      acute week included in the chronic month (coupled rolling averages);
+    - acwr: the acute:chronic workload ratio, null without any chronic load;
+    - monotony: the week's average daily load over its standard deviation (Foster), null for a
+      week of identical loads (usually all rest days);
+    - strain: the week's total load times its monotony.
+
+    Computed on arrays with NumPy when it is installed (or `use_numpy`), otherwise in Python.
+    """
+    use_numpy = np is not None if use_numpy is None else use_numpy
+    series = (_load_series_numpy if use_numpy else _load_series_python)(loads, days)
+    return {
+        name: _rounded(values, 3 if name in ('acwr', 'monotony') else 2)
+        for name, values in series.items()
+    }
+
+
+def training_load(user, start, end, use_numpy=None):
+    """
+    The training load indicators (see load_series) of every load measure for each day from
+    `start` to `end`, as columns: the n-th value of every list belongs to day `start + n`.
+    One query.
+    """
+    days = (end - start).days + 1
+    loads = daily_loads(user, start, end)
+    measures = {measure: load_series(loads[measure], days, use_numpy) for measure in LOAD_MEASURES}
+    return {
+        'start': start,
+        'end': end,
+        'acute_days': ACUTE_DAYS,
+        'chronic_days': CHRONIC_DAYS,
+        'measures': measures,
+        'current': {
+            measure: {name: values[-1] for name, values in series.items()}
+            for measure, series in measures.items()
+        },
+    }
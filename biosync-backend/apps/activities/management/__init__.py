@@ -0,0 +1 @@
+# This file marks the management directory as a Python package.
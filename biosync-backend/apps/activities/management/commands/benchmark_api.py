@@ -0,0 +1,397 @@
+import json
+import platform
+import random
+import subprocess
+import time
+import uuid
+from datetime import date, timedelta
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from biosync.response_cache import RESPONSE_CACHE
+from apps.activities.models import Workout, ExerciseLog, SetLog, BiometricData, ExerciseRecord
+from apps.activities.seed import generate_account
+from apps.exercises.catalog import import_catalog
+from apps.exercises.models import Exercise
+from apps.exercises.search import AUTOCOMPLETE_CACHE
+from apps.exercises.seed import synthetic_dump
+from apps.goals.models import Goal
+from apps.progress.models import ProgressEntry
+from apps.sync.backup import export_records
+from apps.users.models import CustomUser
+from apps.users.tokens import issue_tokens
+
+API_PREFIX = '/api/v1/'
+BENCHMARK_PASSWORD = 'benchmark-pass-1'
+
+# (label, method, url name, the ids the URL needs, query params). Request bodies come from the
+# `body_<label>` methods of the command. Every URL name under /api/v1/ should appear here;
+# the run reports any that don't, so new endpoints aren't silently left out.
+# The router index pages and staff-only operational endpoints
+UNBENCHMARKED = {'api-root', 'performance-metrics'}
+
+ENDPOINTS = [
+    ('profile', 'get', 'user-profile', (), {}),
+    ('login', 'post', 'user-login', (), {}),
+    ('register', 'post', 'user-register', (), {}),
+    ('token_refresh', 'post', 'token-refresh', (), {}),
+    ('logout', 'post', 'user-logout', (), {}),
+    ('workouts_list', 'get', 'workout-list', (), {}),
+    ('workouts_detail', 'get', 'workout-detail', ('workout',), {}),
+    ('workouts_metrics', 'get', 'workout-metrics', (), {}),
+    ('workouts_training_load', 'get', 'workout-training-load', (), {'days': 365}),
+    ('workouts_create', 'post', 'workout-list', (), {}),
+    ('workouts_bulk', 'post', 'workout-bulk-import', (), {}),
+    ('workouts_edit_set', 'patch', 'workout-detail', ('strength_workout',), {}),
+    ('biometrics_list', 'get', 'biometricdata-list', (), {}),
+    ('biometrics_columnar', 'get', 'biometricdata-list', (), {'format': 'columnar', 'limit': 50}),
+    ('biometrics_packed', 'get', 'biometricdata-list', (), {'format': 'packed', 'limit': 50}),
+    ('biometrics_detail', 'get', 'biometricdata-detail', ('biometric',), {}),
+    ('biometrics_trends_day', 'get', 'biometricdata-trends', (), {}),
+    ('biometrics_trends_week', 'get', 'biometricdata-trends', (), {'resolution': 'week'}),
+    ('biometrics_ingest', 'post', 'biometricdata-ingest', (), {}),
+    ('records_list', 'get', 'personalrecord-list', (), {}),
+    ('records_detail', 'get', 'personalrecord-detail', ('record',), {}),
+    ('records_history', 'get', 'personalrecord-history', ('record',), {}),
+    ('goals_list', 'get', 'goal-list', (), {}),
+    ('goals_detail', 'get', 'goal-detail', ('goal',), {}),
+    ('goals_create', 'post', 'goal-list', (), {}),
+    ('goals_complete', 'post', 'goal-complete', ('goal',), {}),
+    ('progress_list', 'get', 'progressentry-list', (), {}),
+    ('progress_detail', 'get', 'progressentry-detail', ('progress',), {}),
+    ('progress_series', 'get', 'progressentry-series', (), {}),
+    ('progress_create', 'post', 'progressentry-list', (), {}),
+    ('progress_bulk', 'post', 'progressentry-bulk-log', (), {}),
+    ('dashboard', 'get', 'dashboard', (), {}),
+    ('sync_initial', 'get', 'sync', (), {}),
+    ('export_ndjson', 'get', 'sync-export', (), {}),
+    ('import_ndjson', 'post', 'sync-import', (), {}),
+    ('exercises_list', 'get', 'exercise-list', (), {}),
+    ('exercises_detail', 'get', 'exercise-detail', ('exercise',), {}),
+    ('exercises_autocomplete', 'get', 'exercise-autocomplete', (), {'q': 'bench pr'}),
+]
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+    return samples[index]
+
+
+def _api_url_names(patterns, prefix=''):
+    """Every named URL pattern reachable under `prefix`."""
+    names = set()
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            names |= _api_url_names(pattern.url_patterns, route)
+        elif isinstance(pattern, URLPattern) and pattern.name and route.lstrip('^').startswith(API_PREFIX.lstrip('/')):
+            names.add(pattern.name)
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        "End-to-end API benchmark: drives every /api/v1/ endpoint in-process through the test client "
+        "(JWT authentication, middleware, routing, rendering included) and reports p50/p95/p99 latency, "
+        "queries and bytes per request. Results are written as JSON so runs can be compared across "
+        "commits with --compare. Everything, including writes, is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help="Benchmark this existing account (e.g. from generate_dataset) instead of generating one.")
+        parser.add_argument('--password', default=BENCHMARK_PASSWORD, help="Password of --email, used by the login endpoint.")
+        parser.add_argument('--days', type=int, default=180, help="History of the generated account.")
+        parser.add_argument('--biometric-days', type=int, default=2, help="Days of minute-level heart rate in the generated account.")
+        parser.add_argument('--iterations', type=int, default=30, help="Measured requests per endpoint.")
+        parser.add_argument('--warmup', type=int, default=3, help="Unmeasured requests per endpoint.")
+        parser.add_argument('--only', help="Comma-separated endpoint labels to run.")
+        parser.add_argument('--warm-cache', action='store_true', help="Keep the response cache between requests instead of measuring cold reads.")
+        parser.add_argument('--output', help="Write the results to this JSON file.")
+        parser.add_argument('--compare', help="A previous results file; prints the change per endpoint.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help="Print the results as JSON instead of a table.")
+
+    def handle(self, *args, **options):
+        endpoints = ENDPOINTS
+        if options['only']:
+            wanted = set(options['only'].split(','))
+            unknown = wanted - {label for label, *_ in ENDPOINTS}
+            if unknown:
+                raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+            endpoints = [endpoint for endpoint in ENDPOINTS if endpoint[0] in wanted]
+
+        self.rng = random.Random(options['seed'])
+        self.counter = 0
+        results = []
+
+        with transaction.atomic():
+            if options['email']:
+                self.user = CustomUser.objects.filter(email__iexact=options['email']).first()
+                if self.user is None:
+                    raise CommandError(f"No user with email {options['email']}")
+                self.password = options['password']
+            else:
+                self.user = generate_account(
+                    self.rng, days=options['days'], biometric_days=options['biometric_days'],
+                    prefix='bench', password=BENCHMARK_PASSWORD,
+                )
+                self.password = BENCHMARK_PASSWORD
+            self.import_body = b''.join(self.limited_export(50))
+            if not Exercise.objects.exists():
+                import_catalog(synthetic_dump(self.rng, 2000))
+
+            client = APIClient(SERVER_NAME='localhost')
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {issue_tokens(self.user)['access']}")
+            self.ids = self.object_ids()
+            for endpoint in endpoints:
+                # Each endpoint's writes are rolled back, so every endpoint sees the same dataset
+                # whichever subset (--only) runs, and results stay comparable between runs
+                with transaction.atomic():
+                    results.append(self.measure(client, *endpoint, options))
+                    transaction.set_rollback(True)
+                if not options['json']:
+                    self.stdout.write(self.format_row(results[-1]))
+
+            transaction.set_rollback(True)
+
+        uncovered = sorted(_api_url_names(get_resolver().url_patterns) - {name for _, _, name, *_ in ENDPOINTS} - UNBENCHMARKED)
+        report = {
+            'benchmark': 'api',
+            'meta': self.run_metadata(options),
+            'uncovered_endpoints': uncovered,
+            'results': results,
+        }
+
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+        elif uncovered:
+            self.stdout.write(self.style.WARNING(f"Not benchmarked: {', '.join(uncovered)}"))
+        if options['compare']:
+            self.compare(results, json.loads(Path(options['compare']).read_text()))
+
+    def object_ids(self):
+        """A representative object per detail route; the most recent one, as a client would open it."""
+        ids = {
+            'workout': Workout.objects.filter(user=self.user).order_by('-start_time').values_list('pk', flat=True).first(),
+            'strength_workout': Workout.objects.filter(user=self.user, exercises__sets__isnull=False)
+                .order_by('-start_time').values_list('pk', flat=True).first(),
+            'biometric': BiometricData.objects.filter(user=self.user).order_by('-timestamp').values_list('pk', flat=True).first(),
+            'record': ExerciseRecord.objects.filter(user=self.user).values_list('pk', flat=True).first(),
+            'goal': Goal.objects.filter(user=self.user).order_by('-start_date').values_list('pk', flat=True).first(),
+            'progress': ProgressEntry.objects.filter(user=self.user).order_by('-date').values_list('pk', flat=True).first(),
+            'exercise': Exercise.objects.filter(is_active=True).values_list('pk', flat=True).first(),
+        }
+        missing = [name for name, pk in ids.items() if pk is None]
+        if missing:
+            raise CommandError(f"The account has no {', '.join(missing)} to benchmark detail routes with.")
+        return ids
+
+    def limited_export(self, records):
+        """The export header and the first `records` records as NDJSON lines, the import payload."""
+        return [
+            json.dumps(record, cls=DjangoJSONEncoder).encode() + b'\n'
+            for record in islice(export_records(self.user, chunk_size=records), records + 1)
+        ]
+
+    def measure(self, client, label, method, url_name, id_names, params, options):
+        path = reverse(url_name, kwargs={'pk': self.ids[id_names[0]]} if id_names else None)
+        body = getattr(self, f'body_{label}', None)
+        latencies, queries, sizes, statuses = [], [], [], set()
+
+        for iteration in range(options['warmup'] + options['iterations']):
+            if not options['warm_cache']:
+                caches[RESPONSE_CACHE].clear()
+                AUTOCOMPLETE_CACHE.clear()
+            request_kwargs = body() if body else {}
+            if params:
+                request_kwargs['data'] = params
+
+            # The query log is a bounded deque; once full, CaptureQueriesContext would count nothing
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as captured:
+                began = time.perf_counter()
+                response = getattr(client, method)(path, **request_kwargs)
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+                elapsed = time.perf_counter() - began
+
+            if response.status_code >= 400:
+                raise CommandError(f"{label}: {method.upper()} {path} returned HTTP {response.status_code}: {content[:300]!r}")
+            if iteration < options['warmup']:
+                continue
+            latencies.append(elapsed * 1000)
+            queries.append(len(captured))
+            sizes.append(len(content))
+            statuses.add(response.status_code)
+
+        latencies.sort()
+        # DRF views record their class as `cls`, plain Django views as `view_class`
+        view = resolve(path).func
+        return {
+            'endpoint': label,
+            'method': method.upper(),
+            'path': path,
+            'view': (getattr(view, 'cls', None) or view.view_class).__name__,
+            'status': sorted(statuses),
+            'iterations': len(latencies),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(sum(latencies) / len(latencies), 3),
+            'queries': round(sum(queries) / len(queries), 2),
+            'bytes': round(sum(sizes) / len(sizes)),
+        }
+
+    # --- Request bodies for the write endpoints; each call yields a request that succeeds ---
+
+    def next_id(self):
+        self.counter += 1
+        return self.counter
+
+    def body_login(self):
+        return {'data': {'email': self.user.email, 'password': self.password}, 'format': 'json'}
+
+    def body_register(self):
+        name = f"bench-{uuid.uuid4().hex[:12]}"
+        password = f"Pw-{uuid.uuid4().hex}"
+        return {'data': {'email': f"{name}@example.com", 'username': name, 'password': password, 'password2': password}, 'format': 'json'}
+
+    def body_token_refresh(self):
+        # Refresh tokens rotate, so every request needs a fresh one
+        return {'data': {'refresh': issue_tokens(self.user)['refresh']}, 'format': 'json'}
+
+    body_logout = body_token_refresh
+
+    def workout_payload(self):
+        start = timezone.now() - timedelta(days=self.rng.randint(0, 30), hours=self.rng.randint(0, 12))
+        return {
+            'title': f"Benchmark {self.next_id()}",
+            'start_time': start.isoformat(),
+            'duration_minutes': 60,
+            'activity_type': 'weightlifting',
+            'exercises': [
+                {
+                    'custom_name': name,
+                    'order_in_workout': order,
+                    'sets': [
+                        {'set_number': number, 'weight_kg': str(self.rng.randint(40, 140)), 'repetitions': self.rng.randint(4, 10), 'rpe': 8}
+                        for number in range(1, 5)
+                    ],
+                }
+                for order, name in enumerate(['Barbell Squat', 'Bench Press', 'Barbell Row', 'Overhead Press'], start=1)
+            ],
+        }
+
+    def body_workouts_create(self):
+        return {'data': self.workout_payload(), 'format': 'json'}
+
+    def body_workouts_bulk(self):
+        return {'data': [self.workout_payload() for _ in range(10)], 'format': 'json'}
+
+    def body_workouts_edit_set(self):
+        # A mid-session correction: the reps of one set, every other exercise and set sent by id
+        exercise_ids = list(
+            ExerciseLog.objects.filter(workout=self.ids['strength_workout'], sets__isnull=False)
+            .order_by('order_in_workout').values_list('pk', flat=True).distinct()
+        )
+        remaining = ExerciseLog.objects.filter(workout=self.ids['strength_workout']).exclude(pk__in=exercise_ids)
+        sets = [
+            {'id': str(pk)} for pk in
+            SetLog.objects.filter(exercise_log=exercise_ids[0]).order_by('set_number').values_list('pk', flat=True)
+        ]
+        sets[-1]['repetitions'] = self.rng.randint(4, 12)
+        exercises = [{'id': str(exercise_ids[0]), 'sets': sets}]
+        exercises += [{'id': str(pk)} for pk in [*exercise_ids[1:], *remaining.values_list('pk', flat=True)]]
+        return {'data': {'exercises': exercises}, 'format': 'json'}
+
+    def body_biometrics_ingest(self):
+        # A new hour of per-minute samples each time, far enough back not to overlap the dataset
+        start = timezone.now() - timedelta(days=3650, hours=self.next_id())
+        samples = [
+            {'timestamp': (start + timedelta(minutes=minute)).isoformat(), 'resting_heart_rate': self.rng.randint(50, 90)}
+            for minute in range(60)
+        ]
+        return {'data': samples, 'format': 'json'}
+
+    def body_goals_create(self):
+        return {'data': {
+            'title': f"Benchmark goal {self.next_id()}",
+            'start_date': date.today().isoformat(),
+            'target_value': '100.00',
+            'target_unit': 'km',
+        }, 'format': 'json'}
+
+    def progress_date(self):
+        # Dates before the generated history, so they never clash with logged entries
+        return (date.today() - timedelta(days=3650 + self.next_id())).isoformat()
+
+    def body_progress_create(self):
+        return {'data': {'goal': self.ids['goal'], 'date': self.progress_date(), 'value': '2.50'}, 'format': 'json'}
+
+    def body_progress_bulk(self):
+        return {'data': [
+            {'goal': self.ids['goal'], 'date': self.progress_date(), 'value': '1.25'}
+            for _ in range(20)
+        ], 'format': 'json'}
+
+    def body_import_ndjson(self):
+        return {'data': self.import_body, 'content_type': 'application/x-ndjson'}
+
+    # --- Reporting ---
+
+    def run_metadata(self, options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'recorded_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'dataset': {'email': options['email']} if options['email'] else {
+                'days': options['days'], 'biometric_days': options['biometric_days'], 'seed': options['seed'],
+            },
+            'iterations': options['iterations'],
+            'warm_cache': options['warm_cache'],
+        }
+
+    @staticmethod
+    def format_row(row):
+        return (
+            f"{row['endpoint']:>24}  p50 {row['p50_ms']:>8.2f} ms  p95 {row['p95_ms']:>8.2f} ms  "
+            f"p99 {row['p99_ms']:>8.2f} ms  {row['queries']:>6.1f} q  {row['bytes']:>9} B"
+        )
+
+    def compare(self, results, baseline):
+        previous = {row['endpoint']: row for row in baseline.get('results', [])}
+        self.stdout.write(f"Compared with {baseline.get('meta', {}).get('commit') or 'baseline'}:")
+        for row in results:
+            before = previous.get(row['endpoint'])
+            if before is None:
+                self.stdout.write(f"{row['endpoint']:>24}  (new)")
+                continue
+            change = (row['p50_ms'] / before['p50_ms'] - 1) * 100 if before['p50_ms'] else 0.0
+            line = (
+                f"{row['endpoint']:>24}  p50 {before['p50_ms']:.2f} -> {row['p50_ms']:.2f} ms ({change:+.1f}%)  "
+                f"queries {before['queries']} -> {row['queries']}  bytes {before['bytes']} -> {row['bytes']}"
+            )
+            regressed = change > 10 or row['queries'] > before['queries']
+            self.stdout.write(self.style.WARNING(line) if regressed else line)
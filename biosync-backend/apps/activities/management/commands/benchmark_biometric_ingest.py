@@ -0,0 +1,85 @@
+import json
+import random
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.activities.models import BiometricData
+from apps.activities.views import BiometricDataViewSet
+from apps.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures biometric ingest throughput (samples/sec) through the ingest endpoint. "
+        "Each sync resends an overlapping window, like a wearable would. All data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--syncs', type=int, default=10, help="Number of sync requests to send.")
+        parser.add_argument('--samples', type=int, default=5000, help="Samples per sync request.")
+        parser.add_argument('--overlap', type=float, default=0.5, help="Fraction of each sync already sent by the previous one.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help="Print the result as a single JSON object.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        per_sync = options['samples']
+        step = max(1, int(per_sync * (1 - options['overlap'])))
+
+        view = BiometricDataViewSet.as_view({'post': 'ingest'})
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        start = timezone.now() - timedelta(minutes=options['syncs'] * step + per_sync)
+
+        elapsed = 0.0
+        sent = 0
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:8]
+            user = CustomUser.objects.create(email=f"ingest-{tag}@example.com", username=f"ingest-{tag}")
+
+            for sync in range(options['syncs']):
+                first_minute = sync * step
+                payload = [
+                    {
+                        'timestamp': (start + timedelta(minutes=first_minute + i)).isoformat(),
+                        'resting_heart_rate': rng.randint(45, 70),
+                        'heart_rate_variability': rng.randint(30, 120),
+                    }
+                    for i in range(per_sync)
+                ]
+                request = factory.post('/', payload, format='json')
+                force_authenticate(request, user=user)
+
+                began = time.perf_counter()
+                response = view(request)
+                elapsed += time.perf_counter() - began
+                sent += per_sync
+
+                if response.status_code != 200:
+                    raise CommandError(f"Ingest returned HTTP {response.status_code}: {response.data}")
+
+            stored = BiometricData.objects.filter(user=user).count()
+            transaction.set_rollback(True)
+
+        expected = (options['syncs'] - 1) * step + per_sync
+        if stored != expected:
+            raise CommandError(f"Deduplication failed: stored {stored} rows, expected {expected}")
+
+        result = {
+            'benchmark': 'biometric_ingest',
+            'syncs': options['syncs'],
+            'samples_sent': sent,
+            'rows_stored': stored,
+            'seconds': round(elapsed, 4),
+            'samples_per_sec': round(sent / elapsed, 1) if elapsed else None,
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+        else:
+            for key, value in result.items():
+                self.stdout.write(f"{key:>14}: {value}")
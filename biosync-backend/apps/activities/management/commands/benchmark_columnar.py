@@ -0,0 +1,161 @@
+import gzip
+import json
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+from urllib.parse import parse_qsl, urlsplit
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from biosync.fast_read import ValuesRepresentation
+from biosync.renderers import ColumnarJSONRenderer, FastJSONRenderer, PackedColumnarRenderer, unpack_columnar
+from biosync.response_cache import RESPONSE_CACHE
+from apps.activities.columnar import COLUMNAR_FORMAT, encode_columns, _scales, _EPOCH
+from apps.activities.models import BiometricData, BIOMETRIC_METRICS
+from apps.activities.serializers import BiometricDataSerializer
+from apps.activities.views import BiometricDataViewSet
+from apps.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares payload size and server encode time of the row JSON biometric list with the "
+        "columnar JSON and packed binary formats, for minute-level samples with a daily summary. "
+        "Round-trips the formats through the view to check they decode to the stored values. "
+        "All seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Days of minute-level samples.")
+        parser.add_argument('--repeat', type=int, default=3, help="Encodes per format.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help="Print the results as a single JSON object.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        results = {}
+
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:8]
+            user = CustomUser.objects.create(email=f"columnar-{tag}@example.com", username=f"columnar-{tag}")
+            self.seed(rng, user, options['days'])
+            samples = BiometricData.objects.filter(user=user).order_by('timestamp')
+            count = samples.count()
+
+            representation = ValuesRepresentation(BiometricDataSerializer())
+            scales = _scales()
+
+            def rows_json():
+                return FastJSONRenderer().render(representation.represent(list(samples.values(*representation.columns()))))
+
+            def columnar(renderer):
+                def encode():
+                    t0, columns = encode_columns(list(samples.values_list('timestamp', *BIOMETRIC_METRICS)), scales)
+                    return renderer.render({'format': COLUMNAR_FORMAT, 'count': count, 't0': t0, 'columns': columns})
+                return encode
+
+            for name, encode in (
+                ('rows_json', rows_json),
+                ('columnar_json', columnar(ColumnarJSONRenderer())),
+                ('packed', columnar(PackedColumnarRenderer())),
+            ):
+                encode()  # warm-up
+                began = time.perf_counter()
+                for _ in range(options['repeat']):
+                    content = encode()
+                elapsed = (time.perf_counter() - began) / options['repeat']
+                results[name] = {
+                    'bytes': len(content),
+                    'gzip_bytes': len(gzip.compress(content, 6)),
+                    'encode_ms': round(elapsed * 1000, 1),
+                }
+
+            self.check_round_trip(user, samples)
+            transaction.set_rollback(True)
+
+        baseline = results['rows_json']
+        for result in results.values():
+            result['size_reduction'] = round(baseline['bytes'] / result['bytes'], 1)
+            result['encode_speedup'] = round(baseline['encode_ms'] / result['encode_ms'], 1) if result['encode_ms'] else None
+
+        if options['json']:
+            self.stdout.write(json.dumps({'benchmark': 'columnar', 'samples': count, 'results': results}))
+            return
+        self.stdout.write(f"{count} samples")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:>14}: {result['bytes']:>10} B ({result['gzip_bytes']:>8} B gzipped), "
+                f"{result['encode_ms']:>8} ms   {result['size_reduction']}x smaller, "
+                f"{result['encode_speedup']}x faster than rows"
+            )
+
+    def seed(self, rng, user, days):
+        """Heart rate every minute and a full daily summary, like a wearable sync."""
+        now = timezone.now().replace(second=0, microsecond=0)
+        start = now - timedelta(days=days)
+        samples = []
+        for minute in range(days * 24 * 60):
+            timestamp = start + timedelta(minutes=minute)
+            sample = BiometricData(user=user, timestamp=timestamp, resting_heart_rate=rng.randint(48, 110))
+            if minute % (24 * 60) == 6 * 60:
+                sample.recorded_weight_kg = Decimal(f"{rng.uniform(60, 90):.2f}")
+                sample.sleep_duration_hours = Decimal(f"{rng.uniform(5, 9):.2f}")
+                sample.sleep_score = rng.randint(50, 100)
+                sample.heart_rate_variability = rng.randint(30, 120)
+                sample.readiness_score = rng.randint(40, 100)
+            samples.append(sample)
+        BiometricData.objects.bulk_create(samples, batch_size=5000)
+
+    def check_round_trip(self, user, samples):
+        """Both formats, fetched through the view in pages, must decode to exactly the stored samples."""
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        view = BiometricDataViewSet.as_view({'get': 'list'})
+        expected = list(samples.values_list('timestamp', *BIOMETRIC_METRICS))
+        scales = _scales()
+
+        for file_format in ('columnar', 'packed'):
+            decoded, params = [], {'format': file_format, 'limit': max(1, len(expected) // 3)}
+            while params is not None:
+                caches[RESPONSE_CACHE].clear()
+                request = factory.get('/', params)
+                force_authenticate(request, user=user)
+                response = view(request)
+                response.render()
+                if response.status_code != 200:
+                    raise CommandError(f"{file_format}: HTTP {response.status_code}")
+                data = unpack_columnar(response.content) if file_format == 'packed' else json.loads(response.content)
+                decoded.extend(self.decode(data, scales))
+                params = dict(parse_qsl(urlsplit(data['next']).query)) if data['next'] else None
+
+            if len(decoded) != len(expected):
+                raise CommandError(f"{file_format}: decoded {len(decoded)} samples, expected {len(expected)}")
+            for got, row in zip(decoded, expected):
+                want = (row[0].replace(microsecond=row[0].microsecond // 1000 * 1000), *row[1:])
+                if got != want:
+                    raise CommandError(f"{file_format}: decoded {got}, expected {want}")
+
+    @staticmethod
+    def decode(data, scales):
+        """Rebuilds (timestamp, *metrics) rows from a columnar payload, as a client would."""
+        count = data['count']
+        if not count:
+            return []
+        millis = list(accumulate(data['columns']['timestamp']['delta'], initial=data['t0']))[1:]
+        timestamps = [_EPOCH + timedelta(milliseconds=ms) for ms in millis]
+
+        metric_columns = []
+        for metric in BIOMETRIC_METRICS:
+            column = data['columns'].get(metric, {'index': [], 'values': []})
+            indexes = accumulate(column['index']) if 'index' in column else range(count)
+            values = [None] * count
+            for index, value in zip(indexes, column['values']):
+                values[index] = Decimal(value).scaleb(-column['scale']) if 'scale' in column else value
+            metric_columns.append(values)
+        return list(zip(timestamps, *metric_columns))
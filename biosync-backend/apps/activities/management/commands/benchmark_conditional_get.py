@@ -0,0 +1,112 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.activities.seed import seed_user
+from apps.activities.views import WorkoutViewSet, BiometricDataViewSet
+from apps.goals.views import GoalViewSet
+from apps.progress.views import ProgressEntryViewSet
+
+CONDITIONAL_VIEWSETS = (
+    WorkoutViewSet,
+    BiometricDataViewSet,
+    GoalViewSet,
+    ProgressEntryViewSet,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the bandwidth, CPU time and queries saved by conditional GETs: each list and "
+        "detail endpoint is fetched unconditionally (200) and revalidated with If-None-Match (304). "
+        "All seeded data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workouts', type=int, default=40, help="Workouts to seed.")
+        parser.add_argument('--exercises', type=int, default=8, help="Exercises per workout.")
+        parser.add_argument('--sets', type=int, default=5, help="Sets per exercise.")
+        parser.add_argument('--repeat', type=int, default=50, help="Requests per endpoint and mode.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help="Print the results as a JSON list.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        results = []
+
+        with transaction.atomic():
+            user = seed_user(rng, options['workouts'], options['exercises'], options['sets'], prefix='etag')
+            for viewset in CONDITIONAL_VIEWSETS:
+                list_view = viewset.as_view({'get': 'list'})
+                detail_view = viewset.as_view({'get': 'retrieve'})
+
+                instance = viewset.serializer_class.Meta.model.objects.filter(user=user).first()
+                if instance is None:
+                    raise CommandError(f"{viewset.__name__}: nothing seeded to fetch")
+
+                for action, view, kwargs in (
+                    ('list', list_view, {}),
+                    ('retrieve', detail_view, {'pk': instance.pk}),
+                ):
+                    results.append(self.measure(factory, user, viewset, action, view, kwargs, options['repeat']))
+            transaction.set_rollback(True)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results))
+            return
+        for row in results:
+            self.stdout.write(
+                f"{row['endpoint']:>32}  200: {row['full_bytes']:>7} B {row['full_cpu_ms']:>8.3f} ms "
+                f"{row['full_queries']} q   304: {row['revalidated_bytes']:>3} B {row['revalidated_cpu_ms']:>7.3f} ms "
+                f"{row['revalidated_queries']} q   saved {row['bytes_saved_pct']:.1f}% bytes, "
+                f"{row['cpu_saved_pct']:.1f}% cpu"
+            )
+
+    def measure(self, factory, user, viewset, action, view, kwargs, repeat):
+        def fetch(headers):
+            request = factory.get('/', **headers)
+            force_authenticate(request, user=user)
+            response = view(request, **kwargs)
+            # 304s come straight from Django and have nothing to render.
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
+        first = fetch({})
+        etag = first.get('ETag')
+        if first.status_code != 200 or not etag:
+            raise CommandError(f"{viewset.__name__}.{action}: expected 200 with an ETag, got {first.status_code}")
+
+        modes = {}
+        for mode, headers, expected in (('full', {}, 200), ('revalidated', {'HTTP_IF_NONE_MATCH': etag}, 304)):
+            with CaptureQueriesContext(connection) as queries:
+                began = time.process_time()
+                for _ in range(repeat):
+                    response = fetch(headers)
+                cpu = (time.process_time() - began) / repeat
+            if response.status_code != expected:
+                raise CommandError(f"{viewset.__name__}.{action}: expected {expected}, got {response.status_code}")
+            modes[mode] = {
+                'bytes': len(response.content),
+                'cpu_ms': round(cpu * 1000, 3),
+                'queries': len(queries) // repeat,
+            }
+
+        full, revalidated = modes['full'], modes['revalidated']
+        return {
+            'endpoint': f"{viewset.__name__}.{action}",
+            'full_bytes': full['bytes'],
+            'full_cpu_ms': full['cpu_ms'],
+            'full_queries': full['queries'],
+            'revalidated_bytes': revalidated['bytes'],
+            'revalidated_cpu_ms': revalidated['cpu_ms'],
+            'revalidated_queries': revalidated['queries'],
+            'bytes_saved_pct': round(100 * (1 - revalidated['bytes'] / full['bytes']), 1) if full['bytes'] else 0.0,
+            'cpu_saved_pct': round(100 * (1 - revalidated['cpu_ms'] / full['cpu_ms']), 1) if full['cpu_ms'] else 0.0,
+        }
@@ -0,0 +1,155 @@
+import json
+import random
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework import mixins
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from biosync.fast_read import ValuesRepresentation
+from biosync.renderers import FastJSONRenderer, orjson
+from biosync.response_cache import RESPONSE_CACHE
+from apps.activities.models import Workout, BiometricData, workout_tree_prefetch
+from apps.activities.seed import seed_user
+from apps.activities.serializers import WorkoutSerializer, BiometricDataSerializer
+from apps.activities.views import WorkoutViewSet, BiometricDataViewSet
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the DRF serializer read path (model instances + nested ModelSerializers + "
+        "JSONRenderer) with the values() fast path (ValuesRepresentation + FastJSONRenderer) for "
+        "workouts and biometric samples. Verifies the JSON is byte-identical, through the views "
+        "as well, and reports CPU per object for each stage. All seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workouts', type=int, default=100, help="Workouts to seed (and serialize per run).")
+        parser.add_argument('--exercises', type=int, default=6, help="Exercises per workout.")
+        parser.add_argument('--sets', type=int, default=4, help="Sets per exercise.")
+        parser.add_argument('--repeat', type=int, default=10, help="Runs per path.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help="Print the results as a single JSON object.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        results = {}
+
+        with transaction.atomic():
+            user = seed_user(rng, options['workouts'], options['exercises'], options['sets'], prefix='serialize')
+
+            workouts = Workout.objects.filter(user=user).order_by(*WorkoutViewSet.ordering)
+            results['workouts'] = self.compare(
+                WorkoutSerializer,
+                lambda: workouts.select_related('user').prefetch_related(workout_tree_prefetch()),
+                lambda representation: workouts.values(*representation.columns()),
+                (workout_tree_prefetch(),),
+                options['repeat'],
+            )
+            samples = BiometricData.objects.filter(user=user).order_by(*BiometricDataViewSet.ordering)
+            results['biometrics'] = self.compare(
+                BiometricDataSerializer,
+                lambda: samples.select_related('user'),
+                lambda representation: samples.values(*representation.columns()),
+                (),
+                options['repeat'],
+            )
+
+            for viewset in (WorkoutViewSet, BiometricDataViewSet):
+                self.check_views(viewset, user)
+            transaction.set_rollback(True)
+
+        report = {'benchmark': 'serialization', 'orjson': orjson is not None, 'results': results}
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed; FastJSONRenderer falls back to DRF's renderer."))
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:>10} ({result['objects']} objects, {result['bytes']} B, identical JSON): "
+                f"serializer path {result['serializer_us_per_object']} us/object "
+                f"(serialize {result['serializer_serialize_us']}, render {result['serializer_render_us']}), "
+                f"fast path {result['fast_us_per_object']} us/object "
+                f"(serialize {result['fast_serialize_us']}, render {result['fast_render_us']}), "
+                f"{result['speedup']}x"
+            )
+
+    def compare(self, serializer_class, instances, rows, prefetches, repeat):
+        """CPU per object of both paths, including the queries; fails unless the bytes match."""
+        representation = ValuesRepresentation(serializer_class(), prefetches)
+
+        def serializer_path():
+            return serializer_class(list(instances()), many=True).data, JSONRenderer()
+
+        def fast_path():
+            return representation.represent(list(rows(representation))), FastJSONRenderer()
+
+        timings, outputs = {}, {}
+        for name, build in (('serializer', serializer_path), ('fast', fast_path)):
+            build()  # warm-up
+            serialize = render = 0.0
+            for _ in range(repeat):
+                began = time.process_time()
+                data, renderer = build()
+                built = time.process_time()
+                outputs[name] = renderer.render(data)
+                render += time.process_time() - built
+                serialize += built - began
+            timings[name] = (serialize / repeat, render / repeat, len(data))
+
+        if outputs['serializer'] != outputs['fast']:
+            raise CommandError(f"{serializer_class.__name__}: the fast path's JSON differs from the serializer's")
+
+        objects = timings['serializer'][2]
+        if not objects:
+            raise CommandError(f"{serializer_class.__name__}: nothing seeded to serialize")
+
+        def per_object(seconds):
+            return round(seconds / objects * 1e6, 1)
+
+        serializer_total = sum(timings['serializer'][:2])
+        fast_total = sum(timings['fast'][:2])
+        return {
+            'objects': objects,
+            'bytes': len(outputs['fast']),
+            'serializer_us_per_object': per_object(serializer_total),
+            'serializer_serialize_us': per_object(timings['serializer'][0]),
+            'serializer_render_us': per_object(timings['serializer'][1]),
+            'fast_us_per_object': per_object(fast_total),
+            'fast_serialize_us': per_object(timings['fast'][0]),
+            'fast_render_us': per_object(timings['fast'][1]),
+            'speedup': round(serializer_total / fast_total, 2) if fast_total else None,
+        }
+
+    def check_views(self, viewset, user):
+        """The list (first and second page) and detail responses must match the serializer path byte for byte."""
+        baseline = type(f'{viewset.__name__}SerializerPath', (viewset,), {
+            'list': mixins.ListModelMixin.list,
+            'retrieve': mixins.RetrieveModelMixin.retrieve,
+            'renderer_classes': [JSONRenderer],
+        })
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        model = viewset.serializer_class.Meta.model
+        pk = model.objects.filter(user=user).values_list('pk', flat=True).first()
+
+        def fetch(view_class, action, params=None, **kwargs):
+            caches[RESPONSE_CACHE].clear()
+            request = factory.get('/', params or {})
+            force_authenticate(request, user=user)
+            response = view_class.as_view({'get': action})(request, **kwargs)
+            response.render()
+            return response
+
+        first = fetch(viewset, 'list', {'page_size': 5})
+        cases = [('list', {'page_size': 5}, {}), ('retrieve', None, {'pk': pk})]
+        if first.data.get('next'):
+            cursor = first.data['next'].split('cursor=')[1].split('&')[0]
+            cases.append(('list', {'page_size': 5, 'cursor': cursor}, {}))
+        for action, params, kwargs in cases:
+            fast, slow = fetch(viewset, action, params, **kwargs), fetch(baseline, action, params, **kwargs)
+            if fast.status_code != 200 or fast.content != slow.content:
+                raise CommandError(f"{viewset.__name__}.{action} {params or ''}: the fast path's response differs")
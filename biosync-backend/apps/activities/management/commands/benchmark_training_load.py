@@ -0,0 +1,210 @@
+import json
+import math
+import random
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, time as day_start, timedelta
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from biosync.response_cache import RESPONSE_CACHE
+from apps.activities import load
+from apps.activities.models import DailyTrainingVolume, Workout
+from apps.activities.rollups import day_bucket
+from apps.activities.seed import generate_account
+from apps.activities.views import WorkoutViewSet
+from apps.users.models import CustomUser
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(samples):
+    return {
+        'samples': len(samples),
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'total_ms': round(sum(samples), 1),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the training load analytics (acute:chronic ratio, monotony, strain) on --users "
+        "accounts with --years of daily training stats each. Times the NumPy computation against the "
+        "same formulas in Python, the endpoint cold and cached, and the per-row approach (every "
+        "workout and set through the ORM) on a few fully generated accounts, checking all of them "
+        "agree. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help="Accounts with synthetic daily stats.")
+        parser.add_argument('--years', type=float, default=5.0, help="History of each account.")
+        parser.add_argument('--days', type=int, default=365, help="Days of training load requested.")
+        parser.add_argument('--workouts-per-week', type=int, default=4)
+        parser.add_argument('--detailed-users', type=int, default=3, help="Accounts generated with every workout and set.")
+        parser.add_argument('--requests', type=int, default=100, help="Endpoint requests per measurement.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help="Print the results as a single JSON object.")
+
+    def handle(self, *args, **options):
+        if load.np is None:
+            raise CommandError("NumPy is not installed: `pip install numpy` to compare both implementations.")
+        if not 1 <= options['days'] <= options['years'] * 365:
+            raise CommandError("--days must be between 1 and the length of the history.")
+        rng = random.Random(options['seed'])
+        history = int(options['years'] * 365)
+        self.end = timezone.localdate()
+        self.start = self.end - timedelta(days=options['days'] - 1)
+        report = {'benchmark': 'training_load', 'users': options['users'], 'years': options['years'], 'days': options['days']}
+
+        with transaction.atomic():
+            began = time.perf_counter()
+            users = self.synthetic_users(rng, options['users'], history, options['workouts_per_week'])
+            report['rows'] = DailyTrainingVolume.objects.filter(user__in=users).count()
+            report['generate_s'] = round(time.perf_counter() - began, 1)
+
+            report['compute'] = self.measure_compute(users)
+            report['endpoint'] = self.measure_endpoint(rng.sample(users, min(options['requests'], len(users))))
+            detailed = [
+                generate_account(rng, days=history, workouts_per_week=options['workouts_per_week'],
+                                 biometric_days=0, goals=0, prefix='load')
+                for _ in range(options['detailed_users'])
+            ]
+            report['per_row_orm'] = self.measure_per_row(detailed)
+            transaction.set_rollback(True)
+        caches[RESPONSE_CACHE].clear()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+        self.stdout.write(
+            f"{report['users']} users, {report['rows']} daily rows over {options['years']} years "
+            f"(generated in {report['generate_s']} s); {options['days']} days of load per request"
+        )
+        for section in ('compute', 'endpoint', 'per_row_orm'):
+            for name, result in report[section].items():
+                self.stdout.write(
+                    f"{name:>24}: p50 {result['p50_ms']:>9} ms  p95 {result['p95_ms']:>9} ms  "
+                    f"total {result['total_ms']:>9} ms  ({result['samples']} users)"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            "NumPy, Python and the per-row ORM computation agree; the endpoint takes one query."
+        ))
+
+    def synthetic_users(self, rng, count, history, workouts_per_week):
+        """Accounts with only the daily stats rows the analytics read, bulk inserted."""
+        users = [
+            CustomUser(email=f"load-{tag}@example.com", username=f"load-{tag}")
+            for tag in (uuid.uuid4().hex[:12] for _ in range(count))
+        ]
+        CustomUser.objects.bulk_create(users)
+        rows = []
+        for user in users:
+            for day in range(history + 1):
+                if rng.random() >= workouts_per_week / 7:
+                    continue
+                strength = rng.random() < 0.7
+                rows.append(DailyTrainingVolume(
+                    user=user, day=self.end - timedelta(days=day),
+                    activity_type='weightlifting' if strength else rng.choice(['cardio', 'hiit']),
+                    workouts=1,
+                    volume_kg=Decimal(rng.randint(2000, 12000)) if strength else Decimal('0'),
+                    duration_minutes=rng.randint(45, 90) if strength else rng.randint(20, 60),
+                ))
+            if len(rows) >= 20000:
+                DailyTrainingVolume.objects.bulk_create(rows, batch_size=5000)
+                rows = []
+        DailyTrainingVolume.objects.bulk_create(rows, batch_size=5000)
+        return users
+
+    def measure_compute(self, users):
+        """The query, then each implementation on the same daily series, per user."""
+        days = (self.end - self.start).days + 1
+        timings = defaultdict(list)
+        for user in users:
+            began = time.perf_counter()
+            loads = load.daily_loads(user, self.start, self.end)
+            timings['query'].append((time.perf_counter() - began) * 1000)
+            results = {}
+            for name, use_numpy in (('numpy', True), ('python', False)):
+                began = time.perf_counter()
+                results[name] = {measure: load.load_series(loads[measure], days, use_numpy) for measure in load.LOAD_MEASURES}
+                timings[name].append((time.perf_counter() - began) * 1000)
+            self.compare(results['numpy'], results['python'], f"{user.email}: NumPy and Python")
+        return {name: summarize(samples) for name, samples in timings.items()}
+
+    def measure_endpoint(self, users):
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        view = WorkoutViewSet.as_view({'get': 'training_load'})
+        params = {'days': (self.end - self.start).days + 1}
+
+        def request(user):
+            request = factory.get('/', params)
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as ctx:
+                began = time.perf_counter()
+                response = view(request)
+                response.render()
+                elapsed = (time.perf_counter() - began) * 1000
+            if response.status_code != 200:
+                raise CommandError(f"training-load returned HTTP {response.status_code}: {response.data}")
+            return elapsed, len(ctx.captured_queries)
+
+        cold, hot = [], []
+        for user in users:
+            caches[RESPONSE_CACHE].clear()
+            cold.append(request(user))
+            hot.append(request(user))
+        queries = max(count for _, count in cold)
+        if queries > WorkoutViewSet.query_budget['training_load']:
+            raise CommandError(f"training-load issued {queries} queries")
+        return {
+            'endpoint (cold)': summarize([ms for ms, _ in cold]),
+            'endpoint (cached)': summarize([ms for ms, _ in hot]),
+        }
+
+    def measure_per_row(self, users):
+        """Loads every workout, exercise and set of the window and sums them in Python."""
+        days = (self.end - self.start).days + 1
+        first = self.start - timedelta(days=load.CHRONIC_DAYS - 1)
+        since = timezone.make_aware(datetime.combine(first, day_start.min))
+        per_row, stats = [], []
+        for user in users:
+            began = time.perf_counter()
+            daily = {measure: defaultdict(float) for measure in load.LOAD_MEASURES}
+            workouts = Workout.objects.filter(user=user, start_time__gte=since).prefetch_related('exercises__sets')
+            for workout in workouts:
+                day = day_bucket(workout.start_time)
+                daily['duration_minutes'][day] += workout.duration_minutes or 0
+                for exercise in workout.exercises.all():
+                    for set_log in exercise.sets.all():
+                        daily['volume_kg'][day] += float(set_log.weight_kg * set_log.repetitions)
+            expected = {}
+            for measure, by_day in daily.items():
+                series = [by_day.get(first + timedelta(days=offset), 0.0) for offset in range((self.end - first).days + 1)]
+                expected[measure] = load.load_series(series, days, use_numpy=False)
+            per_row.append((time.perf_counter() - began) * 1000)
+
+            began = time.perf_counter()
+            got = load.training_load(user, self.start, self.end)['measures']
+            stats.append((time.perf_counter() - began) * 1000)
+            self.compare(got, expected, f"{user.email}: daily stats and raw workouts")
+        return {'per-row ORM': summarize(per_row), 'daily stats + NumPy': summarize(stats)}
+
+    def compare(self, got, expected, label):
+        for measure, series in expected.items():
+            for name, values in series.items():
+                for day, (a, b) in enumerate(zip(got[measure][name], values)):
+                    if (a is None) != (b is None) or (a is not None and not math.isclose(a, b, rel_tol=1e-6, abs_tol=0.011)):
+                        raise CommandError(f"{label} differ: {measure} {name} on {self.start + timedelta(days=day)}: {a} != {b}")
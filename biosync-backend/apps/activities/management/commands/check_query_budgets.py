@@ -0,0 +1,112 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from apps.activities.seed import seed_user
+from apps.activities.views import WorkoutViewSet, BiometricDataViewSet, PersonalRecordViewSet
+from apps.goals.views import GoalViewSet
+from apps.progress.views import ProgressEntryViewSet
+from apps.users.tokens import issue_tokens
+
+# Every viewset checked by this command. Each one declares a `query_budget`
+# mapping read actions to the maximum number of SQL queries they may issue.
+BUDGETED_VIEWSETS = (
+    WorkoutViewSet,
+    BiometricDataViewSet,
+    PersonalRecordViewSet,
+    GoalViewSet,
+    ProgressEntryViewSet,
+)
+
+# Plain views checked through the test client, by URL name. Their `query_budget` maps the
+# HTTP method to its maximum number of SQL queries.
+BUDGETED_VIEWS = (
+    'dashboard',
+)
+
+
+def request_view(url_name, user):
+    """GETs a plain view as `user` (JWT authenticated) and returns the response and the queries it issued."""
+    client = APIClient(SERVER_NAME='localhost')
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {issue_tokens(user)['access']}")
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(reverse(url_name))
+    if response.status_code != 200:
+        raise CommandError(f"{url_name} returned HTTP {response.status_code}")
+    return response, ctx.captured_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds realistic workout, biometric, goal and progress trees and fails if any "
+        "endpoint issues more SQL queries than its viewset's declared query_budget. "
+        "All seeded data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workouts', type=int, default=40, help="Workouts to seed for the heavy user.")
+        parser.add_argument('--exercises', type=int, default=8, help="Exercises per workout.")
+        parser.add_argument('--sets', type=int, default=5, help="Sets per exercise.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed for reproducible data.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        failures = []
+
+        with transaction.atomic():
+            # A light and a heavy account: the query count must not grow with history size.
+            users = [
+                seed_user(rng, workouts=2, exercises=2, sets=2, prefix='budget'),
+                seed_user(rng, options['workouts'], options['exercises'], options['sets'], prefix='budget'),
+            ]
+
+            for viewset in BUDGETED_VIEWSETS:
+                for action, budget in viewset.query_budget.items():
+                    counts = [self._count_queries(viewset, action, user) for user in users]
+                    worst = max(counts)
+                    label = f"{viewset.__name__}.{action}"
+                    if worst > budget:
+                        failures.append(f"{label}: {worst} queries (budget {budget})")
+                        self.stdout.write(self.style.ERROR(f"FAIL {label}: {counts} > {budget}"))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f"ok   {label}: {counts} <= {budget}"))
+
+            for url_name in BUDGETED_VIEWS:
+                view = resolve(reverse(url_name)).func.view_class
+                counts = [len(request_view(url_name, user)[1]) for user in users]
+                worst, budget = max(counts), view.query_budget['get']
+                label = f"{view.__name__}.get"
+                if worst > budget:
+                    failures.append(f"{label}: {worst} queries (budget {budget})")
+                    self.stdout.write(self.style.ERROR(f"FAIL {label}: {counts} > {budget}"))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f"ok   {label}: {counts} <= {budget}"))
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError("Query budget exceeded:\n" + "\n".join(failures))
+
+    def _count_queries(self, viewset, action, user):
+        """Runs one read action against the viewset and returns the number of queries issued."""
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        request = factory.get('/')
+        force_authenticate(request, user=user)
+
+        kwargs = {}
+        if action == 'retrieve' or getattr(getattr(viewset, action, None), 'detail', False):
+            model = viewset.serializer_class.Meta.model
+            kwargs['pk'] = model.objects.filter(user=user).values_list('pk', flat=True).first()
+
+        view = viewset.as_view({'get': action})
+        with CaptureQueriesContext(connection) as ctx:
+            response = view(request, **kwargs)
+            response.render()
+
+        if response.status_code != 200:
+            raise CommandError(f"{viewset.__name__}.{action} returned HTTP {response.status_code}")
+        return len(ctx.captured_queries)
@@ -0,0 +1,139 @@
+import random
+from urllib.parse import parse_qsl, urlsplit
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from biosync.response_cache import RESPONSE_CACHE
+from apps.activities.seed import seed_user
+from apps.goals.models import Goal
+from apps.progress.views import ProgressEntryViewSet
+
+from .check_query_budgets import BUDGETED_VIEWS, BUDGETED_VIEWSETS, request_view
+
+# Plan details that mean a query reads more rows than it returns, or sorts them after reading:
+# a table scan without an index, or a temporary B-tree built for ORDER BY / GROUP BY / DISTINCT.
+FULL_SCAN = 'SCAN'
+TEMP_SORT = 'USE TEMP B-TREE'
+SUBQUERY_SCAN = 'SCAN (subquery-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds realistic data, runs every budgeted read action (plus filtered and second-page "
+        "variants of the lists) and checks the EXPLAIN QUERY PLAN of each SQL statement they issue. "
+        "Fails if a statement needs a full table scan or a temporary B-tree sort. SQLite only; "
+        "all seeded data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workouts', type=int, default=40, help="Workouts to seed.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed for reproducible data.")
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the plan of every statement.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError(f"EXPLAIN QUERY PLAN checks need SQLite, not {connection.vendor}.")
+
+        rng = random.Random(options['seed'])
+        failures = []
+
+        with transaction.atomic():
+            user = seed_user(rng, options['workouts'], exercises=4, sets=3, prefix='plan')
+            # A second account, so every query has other users' rows to skip over
+            seed_user(rng, options['workouts'], exercises=4, sets=3, prefix='plan')
+
+            for viewset in BUDGETED_VIEWSETS:
+                for action in viewset.query_budget:
+                    for label, params in self._variants(viewset, action, user):
+                        for sql, plan in self._plans(viewset, action, user, params):
+                            problems = [line for line in plan if self._is_problem(line)]
+                            name = f"{viewset.__name__}.{action}{label}"
+                            if problems:
+                                failures.append(f"{name}: {'; '.join(problems)}\n    {sql}")
+                                self.stdout.write(self.style.ERROR(f"FAIL {name}: {'; '.join(problems)}"))
+                            elif options['verbose_plans']:
+                                self.stdout.write(f"ok   {name}: {'; '.join(plan)}")
+                        self.stdout.write(self.style.SUCCESS(f"checked {viewset.__name__}.{action}{label}"))
+
+            for url_name in BUDGETED_VIEWS:
+                for sql, plan in self._explain(request_view(url_name, user)[1]):
+                    problems = [line for line in plan if self._is_problem(line)]
+                    if problems:
+                        failures.append(f"{url_name}: {'; '.join(problems)}\n    {sql}")
+                        self.stdout.write(self.style.ERROR(f"FAIL {url_name}: {'; '.join(problems)}"))
+                    elif options['verbose_plans']:
+                        self.stdout.write(f"ok   {url_name}: {'; '.join(plan)}")
+                self.stdout.write(self.style.SUCCESS(f"checked {url_name}"))
+
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError("Query plans with full scans or temp sorts:\n" + "\n".join(failures))
+
+    @staticmethod
+    def _is_problem(line):
+        """
+        `SCAN t` (no index) is a full scan. `SCAN t USING INDEX i` walks a whole index, which is
+        still a scan of every row. Only `SEARCH` (an index seek), constant rows and the read-out of
+        a co-routine subquery (e.g. the rows produced by a window function) are accepted.
+        """
+        if TEMP_SORT in line:
+            return True
+        return line.startswith(FULL_SCAN) and 'CONSTANT ROW' not in line and not line.startswith(SUBQUERY_SCAN)
+
+    def _variants(self, viewset, action, user):
+        """(label, query params) for each request to plan: the action itself, and list filters/pages."""
+        yield '', {}
+        if viewset is ProgressEntryViewSet and action == 'list':
+            goal_id = Goal.objects.filter(user=user).values_list('pk', flat=True).first()
+            yield '[goal_id]', {'goal_id': goal_id}
+        if action == 'list' and getattr(viewset, 'pagination_class', None):
+            # The keyset condition of a later page must still be an index range scan
+            response = self._request(viewset, action, user, {'page_size': 5})
+            if response.data.get('next'):
+                yield '[page 2]', dict(parse_qsl(urlsplit(response.data['next']).query))
+
+    @staticmethod
+    def _view_kwargs(viewset, action, user):
+        if action == 'retrieve' or getattr(getattr(viewset, action, None), 'detail', False):
+            model = viewset.serializer_class.Meta.model
+            return {'pk': model.objects.filter(user=user).values_list('pk', flat=True).first()}
+        return {}
+
+    def _request(self, viewset, action, user, params, kwargs=None):
+        request = APIRequestFactory(SERVER_NAME='localhost').get('/', params)
+        force_authenticate(request, user=user)
+        if kwargs is None:
+            kwargs = self._view_kwargs(viewset, action, user)
+        response = viewset.as_view({'get': action})(request, **kwargs)
+        response.render()
+        if response.status_code != 200:
+            raise CommandError(f"{viewset.__name__}.{action} returned HTTP {response.status_code}")
+        return response
+
+    def _plans(self, viewset, action, user, params):
+        """Runs the request and returns (sql, plan detail lines) for every statement it issued."""
+        # Looked up first so only the action's own statements are captured
+        kwargs = self._view_kwargs(viewset, action, user)
+        # A cached response would issue no queries worth planning
+        caches[RESPONSE_CACHE].clear()
+        with CaptureQueriesContext(connection) as ctx:
+            self._request(viewset, action, user, params, kwargs)
+        return self._explain(ctx.captured_queries)
+
+    @staticmethod
+    def _explain(queries):
+        """(sql, plan detail lines) for every SELECT among the captured `queries`."""
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
@@ -0,0 +1,76 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.activities.models import Workout, SetLog, BiometricData
+from apps.activities.seed import generate_account
+from apps.progress.models import ProgressEntry
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a realistic, reproducible dataset: N users with years of workouts (exercises and "
+        "sets), daily biometric summaries, minute-level heart rate and goals with progress entries. "
+        "Unlike the benchmark commands, the data is kept, so it can be benchmarked repeatedly "
+        "(see `benchmark_api --email`)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1, help="Accounts to create.")
+        parser.add_argument('--years', type=float, default=1.0, help="Length of each account's history.")
+        parser.add_argument('--workouts-per-week', type=int, default=4)
+        parser.add_argument('--exercises', type=int, default=4, help="Exercises per strength workout.")
+        parser.add_argument('--sets', type=int, default=4, help="Sets per exercise.")
+        parser.add_argument('--biometric-days', type=int, default=7, help="Most recent days with minute-level heart rate.")
+        parser.add_argument('--biometric-interval', type=int, default=1, help="Minutes between heart-rate samples.")
+        parser.add_argument('--goals', type=int, default=4, help="Goals per account.")
+        parser.add_argument('--password', default=None, help="Password for the accounts (unusable if omitted).")
+        parser.add_argument('--prefix', default='synthetic', help="Prefix of the generated emails and usernames.")
+        parser.add_argument('--seed', type=int, default=42, help="Random seed for reproducible data.")
+        parser.add_argument('--json', action='store_true', help="Print the summary as a single JSON object.")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['years'] <= 0:
+            raise CommandError("--users and --years must be positive.")
+
+        rng = random.Random(options['seed'])
+        days = int(options['years'] * 365)
+        accounts = []
+        began = time.perf_counter()
+
+        for _ in range(options['users']):
+            # One transaction per account: an interrupted run leaves only complete accounts
+            with transaction.atomic():
+                user = generate_account(
+                    rng,
+                    days=days,
+                    workouts_per_week=options['workouts_per_week'],
+                    exercises=options['exercises'],
+                    sets=options['sets'],
+                    biometric_days=options['biometric_days'],
+                    biometric_interval=options['biometric_interval'],
+                    goals=options['goals'],
+                    prefix=options['prefix'],
+                    password=options['password'],
+                )
+            accounts.append({
+                'email': user.email,
+                'workouts': Workout.objects.filter(user=user).count(),
+                'sets': SetLog.objects.filter(exercise_log__workout__user=user).count(),
+                'biometrics': BiometricData.objects.filter(user=user).count(),
+                'progress_entries': ProgressEntry.objects.filter(user=user).count(),
+            })
+            if not options['json']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"{user.email}: {accounts[-1]['workouts']} workouts, {accounts[-1]['sets']} sets, "
+                    f"{accounts[-1]['biometrics']} biometric samples, {accounts[-1]['progress_entries']} progress entries"
+                ))
+
+        elapsed = round(time.perf_counter() - began, 2)
+        if options['json']:
+            self.stdout.write(json.dumps({'seed': options['seed'], 'days': days, 'seconds': elapsed, 'accounts': accounts}))
+            return
+        self.stdout.write(f"Generated {len(accounts)} account(s) in {elapsed} s")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from apps.activities import jobs
+from apps.activities.models import BiometricData
+from apps.activities.rollups import rebuild_biometric_rollups
+from apps.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds daily and weekly biometric rollups from raw samples. Normally rollups are "
+        "refreshed incrementally on every write; use this to backfill or repair them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enqueue', action='store_true', help="Queue a background job per user instead of rebuilding here.")
+        parser.add_argument('--user', help="Only rebuild rollups for the user with this email.")
+        parser.add_argument('--chunk-days', type=int, default=90, help="Days of samples aggregated per query.")
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.filter(pk__in=BiometricData.objects.values('user'))
+        if options['user']:
+            users = users.filter(email__iexact=options['user'])
+
+        rebuilt = 0
+        for user in users.iterator():
+            if options['enqueue']:
+                jobs.rebuild_biometric_rollups.enqueue(user_id=user.pk, chunk_days=options['chunk_days'])
+            else:
+                rebuild_biometric_rollups(user, chunk_days=options['chunk_days'])
+            rebuilt += 1
+
+        done = "Queued biometric rollup rebuilds" if options['enqueue'] else "Rebuilt biometric rollups"
+        self.stdout.write(self.style.SUCCESS(f"{done} for {rebuilt} user(s)."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from apps.activities import jobs
+from apps.activities.models import Workout
+from apps.activities.stats import rebuild_training_stats
+from apps.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the per-user training stats (totals, volume per activity type, daily volume) "
+        "from the workout history. Stats are maintained incrementally; use this to backfill or repair drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enqueue', action='store_true', help="Queue a background job per user instead of rebuilding here.")
+        parser.add_argument('--user', help="Only rebuild stats for the user with this email.")
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.filter(pk__in=Workout.objects.values('user'))
+        if options['user']:
+            users = users.filter(email__iexact=options['user'])
+
+        rebuilt = 0
+        for user in users.iterator():
+            if options['enqueue']:
+                jobs.rebuild_training_stats.enqueue(user_id=user.pk)
+            else:
+                rebuild_training_stats(user)
+            rebuilt += 1
+
+        done = "Queued training stats rebuilds" if options['enqueue'] else "Rebuilt training stats"
+        self.stdout.write(self.style.SUCCESS(f"{done} for {rebuilt} user(s)."))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.activities import jobs, readiness
+from apps.activities.models import BiometricData
+from apps.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes every readiness score and the running baselines behind them from the raw "
+        "recovery samples, one pass over each user's history (vectorized with NumPy when it is "
+        "installed). New samples are scored incrementally on write; use this to backfill or repair."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enqueue', action='store_true', help="Queue a background job per user instead of rescoring here.")
+        parser.add_argument('--user', help="Only rescore the user with this email.")
+        parser.add_argument('--python', action='store_true', help="Rescore one sample at a time, even with NumPy installed.")
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.filter(pk__in=BiometricData.objects.values('user'))
+        if options['user']:
+            users = users.filter(email__iexact=options['user'])
+
+        rescored = changed = 0
+        began = time.perf_counter()
+        for user in users.iterator():
+            if options['enqueue']:
+                jobs.rescore_readiness.enqueue(user_id=user.pk)
+            else:
+                changed += readiness.rescore_readiness(user, use_numpy=False if options['python'] else None)
+            rescored += 1
+
+        if options['enqueue']:
+            self.stdout.write(self.style.SUCCESS(f"Queued readiness rescores for {rescored} user(s)."))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored readiness for {rescored} user(s) in {time.perf_counter() - began:.1f} s; "
+            f"{changed} score(s) changed."
+        ))
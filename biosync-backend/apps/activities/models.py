@@ -10,6 +10,16 @@ ACTIVITY_TYPES = [
     ('other', 'Other'),
 ]
 
+# Numeric vitals stored on each BiometricData sample
+BIOMETRIC_METRICS = (
+    'recorded_weight_kg',
+    'sleep_duration_hours',
+    'sleep_score',
+    'resting_heart_rate',
+    'heart_rate_variability',
+    'readiness_score',
+)
+
 # --- Core Activity Logging (3-Tier Structure) ---
 
 class Workout(models.Model):
@@ -29,6 +39,14 @@ class Workout(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # The history list: a user's workouts newest first, id breaking ties (keyset pagination).
+            models.Index(fields=['user', '-start_time', '-id'], name='workout_user_start_idx'),
+            # Serves the delta sync's per-user "changed since cursor" range scan.
+            models.Index(fields=['user', 'updated_at', 'id'], name='workout_user_updated_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username}'s {self.activity_type} on {self.start_time.strftime('%Y-%m-%d')}"
 
@@ -41,17 +59,28 @@ class ExerciseLog(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     workout = models.ForeignKey(Workout, on_delete=models.CASCADE, related_name='exercises')
     
-    # Metadata about the exercise itself
-    wger_exercise_id = models.IntegerField(null=True, blank=True, help_text="ID from WGER exercise API.")
-    custom_name = models.CharField(max_length=255, help_text="The name of the exercise (e.g., 'Barbell Squat').")
+    # Metadata about the exercise itself. The column stays `wger_exercise_id`; without a database
+    # constraint, logs may reference WGER ids that the local catalog hasn't imported yet.
+    wger_exercise = models.ForeignKey(
+        'exercises.Exercise', null=True, blank=True, on_delete=models.DO_NOTHING, db_constraint=False,
+        related_name='+', help_text="ID from WGER exercise API.",
+    )
+    # Optional when the exercise is in the catalog, whose name is then used
+    custom_name = models.CharField(max_length=255, blank=True, help_text="The name of the exercise (e.g., 'Barbell Squat').")
     
     # Tracking the order for display
     order_in_workout = models.IntegerField(default=1)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Serves the prefetch of a page of workouts' exercises, already in display order.
+            models.Index(fields=['workout', 'order_in_workout'], name='exercise_workout_order_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.custom_name} in {self.workout.title or self.workout.id}"
+        return f"{self.custom_name or f'WGER {self.wger_exercise_id}'} in {self.workout.title or self.workout.id}"
 
 
 class SetLog(models.Model):
@@ -72,11 +101,31 @@ class SetLog(models.Model):
 
     class Meta:
         ordering = ['set_number']
+        indexes = [
+            # Serves the prefetch of a page of exercises' sets, already in set order.
+            models.Index(fields=['exercise_log', 'set_number'], name='set_exercise_number_idx'),
+        ]
 
     def __str__(self):
         return f"Set {self.set_number}: {self.repetitions} reps @ {self.weight_kg}kg"
 
 
+def workout_tree_prefetch():
+    """
+    Prefetch for a workout's exercises (in workout order, joined to their catalog entries) with
+    their sets (in set order).
+    Rows are ordered by parent first, so the `parent_id IN (...)` lookups read the
+    (parent, position) indexes in order instead of sorting the rows afterwards.
+    """
+    sets = SetLog.objects.order_by('exercise_log_id', 'set_number')
+    exercises = (
+        ExerciseLog.objects.order_by('workout_id', 'order_in_workout')
+        .select_related('wger_exercise')
+        .prefetch_related(models.Prefetch('sets', queryset=sets))
+    )
+    return models.Prefetch('exercises', queryset=exercises)
+
+
 # --- Biometric Data ---
 
 class BiometricData(models.Model):
@@ -102,8 +151,213 @@ class BiometricData(models.Model):
     readiness_score = models.IntegerField(null=True, blank=True, help_text="Overall recovery score (e.g., 0-100).")
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         # Ensure fast lookup by time
         ordering = ['-timestamp'] 
         verbose_name_plural = "Biometric Data"
+        constraints = [
+            # A device sync may resend the same sample; one row per user per instant.
+            # The backing unique index on (user, timestamp) also serves per-user time range scans.
+            models.UniqueConstraint(fields=['user', 'timestamp'], name='unique_biometric_sample'),
+        ]
+        indexes = [
+            # Serves the delta sync's per-user "changed since cursor" range scan.
+            models.Index(fields=['user', 'updated_at', 'id'], name='biometric_user_updated_idx'),
+        ]
+
+
+class BiometricRollup(models.Model):
+    """
+    Pre-aggregated count/sum/min/max of one biometric metric over a day or a week for a user.
+    Trend charts read these instead of raw samples; rows are maintained incrementally by
+    apps.activities.rollups whenever samples are written or deleted.
+    """
+    RESOLUTION_CHOICES = [
+        ('day', 'Day'),
+        ('week', 'Week'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='biometric_rollups')
+    resolution = models.CharField(max_length=10, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateField(help_text="First day of the bucket (Monday for weekly buckets).")
+    metric = models.CharField(max_length=50, help_text="Name of the BiometricData field being aggregated.")
+
+    count = models.IntegerField()
+    total = models.FloatField()
+    minimum = models.FloatField()
+    maximum = models.FloatField()
+
+    class Meta:
+        ordering = ['bucket_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'resolution', 'metric', 'bucket_start'], name='unique_biometric_rollup_bucket'
+            ),
+        ]
+        indexes = [
+            # Trend charts read several metrics at once in bucket order; with the metric last,
+            # the rows come out of the index already ordered instead of one run per metric.
+            models.Index(fields=['user', 'resolution', 'bucket_start', 'metric'], name='rollup_user_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} {self.resolution} {self.bucket_start}: n={self.count}"
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else None
+
+
+class ReadinessBaseline(models.Model):
+    """
+    Running baselines of one readiness input (HRV, resting heart rate, sleep) for a user:
+    exponentially weighted sums of the samples, their squares and their weights over a short
+    (7-day) and a long (60-day) span, decayed to `last_day`. Mean and standard deviation come
+    straight from the sums, so scoring a new sample never reads the history; maintained by
+    apps.activities.readiness.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='readiness_baselines')
+    metric = models.CharField(max_length=50, help_text="Name of the BiometricData field.")
+    last_day = models.DateField(help_text="Day the sums are decayed to.")
+    last_timestamp = models.DateTimeField(help_text="Newest sample included in the sums.")
+
+    short_weight = models.FloatField()
+    short_total = models.FloatField()
+    short_squares = models.FloatField()
+    long_weight = models.FloatField()
+    long_total = models.FloatField()
+    long_squares = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'metric'], name='unique_readiness_baseline'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} baseline through {self.last_day}"
+
+
+# --- Training Statistics (maintained incrementally by apps.activities.stats) ---
+
+class TrainingStats(models.Model):
+    """
+    Lifetime training totals for one user and activity type.
+    Lets the dashboard read totals without re-aggregating the SetLog history.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='training_stats')
+    activity_type = models.CharField(max_length=50, choices=ACTIVITY_TYPES)
+    total_workouts = models.IntegerField(default=0)
+    total_volume_kg = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "Training Stats"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'activity_type'], name='unique_training_stats'),
+        ]
+
+    def __str__(self):
+        return f"{self.activity_type}: {self.total_workouts} workouts, {self.total_volume_kg}kg"
+
+
+class DailyTrainingVolume(models.Model):
+    """
+    Workouts, volume (sum of weight x reps) and minutes trained per user, day and activity type.
+    Backs the windowed (last 7/30/90 days) and weekly metrics, and the training load series.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='daily_training_volume')
+    day = models.DateField()
+    activity_type = models.CharField(max_length=50, choices=ACTIVITY_TYPES)
+    workouts = models.IntegerField(default=0)
+    volume_kg = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    duration_minutes = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day', 'activity_type'], name='unique_daily_training_volume'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.activity_type}: {self.volume_kg}kg"
+
+
+# --- Personal Records (maintained incrementally by apps.activities.records) ---
+
+PERSONAL_RECORD_TYPES = [
+    ('weight', 'Heaviest Weight'),
+    ('e1rm', 'Estimated 1RM'),
+    ('volume', 'Session Volume'),
+    ('reps', 'Most Reps at Weight'),
+]
+
+
+class ExerciseRecord(models.Model):
+    """
+    The current personal bests of one user for one exercise.
+    Exercises are identified by `exercise_key`: the WGER id when known, otherwise the
+    normalized custom name, so 'Barbell Squat' and 'barbell squat ' share a record.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='exercise_records')
+    exercise_key = models.CharField(max_length=300)
+    exercise_name = models.CharField(max_length=255)
+    wger_exercise_id = models.IntegerField(null=True, blank=True)
+
+    best_weight_kg = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    best_weight_reps = models.IntegerField(null=True, blank=True)
+    best_weight_at = models.DateTimeField(null=True, blank=True)
+
+    best_e1rm_kg = models.DecimalField(max_digits=8, decimal_places=2, null=True, blank=True, help_text="Epley estimated one-rep max.")
+    best_e1rm_at = models.DateTimeField(null=True, blank=True)
+
+    best_session_volume_kg = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    best_session_volume_at = models.DateTimeField(null=True, blank=True)
+
+    # Best repetitions ever completed at each weight, e.g. {"100.00": 8, "102.50": 6}
+    reps_by_weight = models.JSONField(default=dict, blank=True)
+
+    last_performed_at = models.DateTimeField(help_text="Start time of the most recent session folded into this record.")
+
+    class Meta:
+        ordering = ['exercise_name']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'exercise_key'], name='unique_exercise_record'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'exercise_name'], name='record_user_name_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.exercise_name}: {self.best_weight_kg}kg, e1RM {self.best_e1rm_kg}kg"
+
+
+class PersonalRecordEvent(models.Model):
+    """
+    One improvement of a personal record, in the order it was achieved.
+    Deleting the workout that set it removes the event (and triggers a recompute of the record).
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='personal_record_events')
+    workout = models.ForeignKey(Workout, on_delete=models.CASCADE, related_name='personal_record_events')
+    exercise_key = models.CharField(max_length=300)
+    record_type = models.CharField(max_length=10, choices=PERSONAL_RECORD_TYPES)
+    value = models.DecimalField(max_digits=12, decimal_places=2, help_text="The new best: kg for weight/e1rm/volume, reps for reps.")
+    weight_kg = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    repetitions = models.IntegerField(null=True, blank=True)
+    achieved_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['achieved_at']
+        indexes = [
+            # One exercise's PR history in the order it was set.
+            models.Index(fields=['user', 'exercise_key', 'achieved_at'], name='pr_event_user_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.exercise_key} {self.record_type} PR: {self.value} on {self.achieved_at:%Y-%m-%d}"
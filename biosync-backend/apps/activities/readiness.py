@@ -0,0 +1,257 @@
+import math
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from biosync.response_cache import bump_cache_version
+from apps.jobs.queue import enqueue
+
+from .models import BiometricData, ReadinessBaseline
+from .rollups import day_bucket, refresh_biometric_rollups
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without it the history is rescored one sample at a time
+    np = None
+
+# Inputs of the readiness score: metric -> (direction, weight, smallest standard deviation).
+# Above-baseline HRV, sleep and sleep quality raise readiness, an above-baseline resting heart
+# rate lowers it. The floor keeps a very steady baseline from turning noise into extremes.
+READINESS_INPUTS = {
+    'heart_rate_variability': (1, 0.4, 3.0),
+    'resting_heart_rate': (-1, 0.3, 1.0),
+    'sleep_duration_hours': (1, 0.15, 0.25),
+    'sleep_score': (1, 0.15, 3.0),
+}
+# Samples carrying any of these are daily recovery summaries, which are scored and feed the
+# baselines; heart-rate-only samples are the minute-level stream and are left alone.
+RECOVERY_MARKERS = ('heart_rate_variability', 'sleep_duration_hours', 'sleep_score')
+
+# The baselines are exponentially weighted over days, with the decay of a 7- and a 60-day span
+SHORT_DAYS, LONG_DAYS = 7, 60
+SHORT_DECAY, LONG_DECAY = 1 - 2 / (SHORT_DAYS + 1), 1 - 2 / (LONG_DAYS + 1)
+# A metric counts once its long baseline holds about a week of daily samples
+MIN_BASELINE_WEIGHT = 6.0
+# Deviations are capped at this many standard deviations before they are combined
+MAX_DEVIATION = 3.0
+# Terms below this share of the total weight are dropped by the vectorized rescore
+KERNEL_PRECISION = 1e-12
+
+WINDOWS = (('short', SHORT_DECAY), ('long', LONG_DECAY))
+BASELINE_FIELDS = [
+    'last_day', 'last_timestamp',
+    *(f'{window}_{field}' for window, _ in WINDOWS for field in ('weight', 'total', 'squares')),
+]
+
+
+def is_recovery_sample(values):
+    """Whether a sample (a model instance or a dict of its fields) is a daily recovery summary."""
+    get = values.get if isinstance(values, dict) else lambda field: getattr(values, field)
+    return any(get(field) is not None for field in RECOVERY_MARKERS)
+
+
+def _recovery_filter():
+    return reduce(or_, (Q(**{f'{field}__isnull': False}) for field in RECOVERY_MARKERS))
+
+
+def readiness(deviations):
+    """
+    The 0-100 readiness score from (weight, deviation) pairs: the weighted mean deviation of
+    the short baselines from the long ones, in long standard deviations, mapped through tanh so
+    one deviation above baseline scores 73 and one below 27. None without any input.
+    """
+    if not deviations:
+        return None
+    total = sum(weight for weight, _ in deviations)
+    combined = sum(weight * deviation for weight, deviation in deviations) / total
+    return round(50 + 50 * math.tanh(combined / 2))
+
+
+# --- One sample at a time (new samples, and the rescore without NumPy) ---
+
+def _accumulate(baseline, day, value):
+    """Decays `baseline` to `day` and adds `value`: O(1) whatever the length of the history."""
+    elapsed = (day - baseline.last_day).days if baseline.last_day else 0
+    for window, decay in WINDOWS:
+        factor = decay ** elapsed
+        setattr(baseline, f'{window}_weight', getattr(baseline, f'{window}_weight') * factor + 1)
+        setattr(baseline, f'{window}_total', getattr(baseline, f'{window}_total') * factor + value)
+        setattr(baseline, f'{window}_squares', getattr(baseline, f'{window}_squares') * factor + value * value)
+    baseline.last_day = day
+
+
+def _deviation(baseline, direction, floor):
+    """How far the short baseline is from the long one, in long standard deviations (None if too new)."""
+    if baseline.long_weight < MIN_BASELINE_WEIGHT:
+        return None
+    long_mean = baseline.long_total / baseline.long_weight
+    variance = baseline.long_squares / baseline.long_weight - long_mean * long_mean
+    deviation = direction * (baseline.short_total / baseline.short_weight - long_mean) / max(math.sqrt(max(variance, 0)), floor)
+    return max(-MAX_DEVIATION, min(MAX_DEVIATION, deviation))
+
+
+def _score_sample(user, baselines, sample):
+    """Adds a recovery sample to the baselines and scores it against them."""
+    day = day_bucket(sample.timestamp)
+    deviations = []
+    for metric, (direction, weight, floor) in READINESS_INPUTS.items():
+        value = getattr(sample, metric)
+        if value is None:
+            continue
+        baseline = baselines.get(metric)
+        if baseline is None:
+            baseline = baselines[metric] = ReadinessBaseline(
+                user=user, metric=metric, short_weight=0, short_total=0, short_squares=0,
+                long_weight=0, long_total=0, long_squares=0,
+            )
+        _accumulate(baseline, day, float(value))
+        baseline.last_timestamp = sample.timestamp
+        deviation = _deviation(baseline, direction, floor)
+        if deviation is not None:
+            deviations.append((weight, deviation))
+    return readiness(deviations)
+
+
+def update_readiness(user, timestamps):
+    """
+    Scores the recovery samples just written at `timestamps`, updating the user's running
+    baselines. New samples cost O(1) each and a constant number of queries.
+
+    A sample at or before the newest one already in the baselines changes history they have
+    absorbed and can't take back, so the whole history is rescored by a background job instead.
+    Resent samples the upsert left unchanged must not be passed: upsert_biometric_samples
+    returns only the samples it wrote, so overlapping sync windows are still scored here.
+    Returns {sample id: score} of the samples scored here.
+    """
+    if not timestamps:
+        return {}
+    with transaction.atomic():
+        baselines = {
+            baseline.metric: baseline
+            for baseline in ReadinessBaseline.objects.select_for_update().filter(user=user)
+        }
+        applied = max((baseline.last_timestamp for baseline in baselines.values()), default=None)
+        if applied is not None and min(timestamps) <= applied:
+            schedule_rescore(user)
+            return {}
+
+        samples = list(
+            BiometricData.objects.filter(user=user, timestamp__gte=min(timestamps), timestamp__lte=max(timestamps))
+            .filter(_recovery_filter()).order_by('timestamp')
+        )
+        now = timezone.now()
+        for sample in samples:
+            sample.readiness_score, sample.updated_at = _score_sample(user, baselines, sample), now
+        BiometricData.objects.bulk_update(samples, ['readiness_score', 'updated_at'])
+        ReadinessBaseline.objects.bulk_update(
+            [baseline for baseline in baselines.values() if not baseline._state.adding], BASELINE_FIELDS,
+        )
+        ReadinessBaseline.objects.bulk_create([baseline for baseline in baselines.values() if baseline._state.adding])
+    return {sample.pk: sample.readiness_score for sample in samples}
+
+
+def schedule_rescore(user):
+    """Queues a rescore of the user's whole history, run once however often it is requested."""
+    enqueue('activities.rescore_readiness', user_id=user.pk)
+
+
+# --- Whole history (rescore) ---
+
+def _rescore_python(user, samples):
+    baselines = {}
+    scores = [_score_sample(user, baselines, sample) for sample in samples]
+    return scores, baselines
+
+
+def _kernel(decay):
+    """decay**0, decay**1, ... until the terms no longer matter."""
+    return decay ** np.arange(math.ceil(math.log(KERNEL_PRECISION) / math.log(decay)) + 1)
+
+
+def _rescore_numpy(user, samples):
+    """
+    The same scores and final baselines as scoring the samples one by one, with array
+    operations over the whole history. Per metric, each day's sums are the day's own samples
+    plus the previous day's sums decayed: a convolution of the daily sums with the decay kernel.
+    A sample sees the previous day's sums and the samples of its own day up to itself.
+    """
+    days = np.array([day_bucket(sample.timestamp).toordinal() for sample in samples])
+    deviations = np.full((len(samples), len(READINESS_INPUTS)), np.nan)
+    baselines = {}
+
+    for column, (metric, (direction, weight, floor)) in enumerate(READINESS_INPUTS.items()):
+        values = np.array([getattr(sample, metric) for sample in samples], dtype=float)  # None -> NaN
+        index = np.flatnonzero(~np.isnan(values))
+        if not len(index):
+            continue
+        grid = days[index] - days[index[0]]
+        # Where each sample's day starts among the metric's samples, for the same-day running sums
+        day_start = np.searchsorted(grid, grid)
+        x = values[index]
+
+        sums = {}
+        for window, decay in WINDOWS:
+            for field, terms in (('weight', np.ones_like(x)), ('total', x), ('squares', x * x)):
+                daily = np.bincount(grid, weights=terms)
+                decayed = np.convolve(daily, _kernel(decay))[:len(daily)]
+                before = np.concatenate(([0.0], decayed))[grid] * decay
+                running = np.concatenate(([0.0], np.cumsum(terms)))
+                sums[f'{window}_{field}'] = before + running[1:] - running[day_start]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            long_mean = sums['long_total'] / sums['long_weight']
+            spread = np.sqrt(np.maximum(sums['long_squares'] / sums['long_weight'] - long_mean ** 2, 0))
+            deviation = direction * (sums['short_total'] / sums['short_weight'] - long_mean) / np.maximum(spread, floor)
+        deviations[index, column] = np.where(
+            sums['long_weight'] >= MIN_BASELINE_WEIGHT, np.clip(deviation, -MAX_DEVIATION, MAX_DEVIATION), np.nan,
+        )
+
+        # The state scoring the samples one by one would have left
+        last = samples[index[-1]]
+        baselines[metric] = ReadinessBaseline(
+            user=user, metric=metric, last_day=day_bucket(last.timestamp), last_timestamp=last.timestamp,
+            **{field: float(values_[-1]) for field, values_ in sums.items()},
+        )
+
+    weights = np.where(np.isnan(deviations), 0.0, [weight for _, weight, _ in READINESS_INPUTS.values()])
+    totals = weights.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        combined = (np.nan_to_num(deviations) * weights).sum(axis=1) / totals
+    scores = np.where(totals > 0, np.round(50 + 50 * np.tanh(combined / 2)), np.nan)
+    return [None if score != score else int(score) for score in scores.tolist()], baselines
+
+
+def rescore_readiness(user, use_numpy=None):
+    """
+    Rescores every recovery sample of `user` from scratch in one pass over the history (one
+    query), vectorized with NumPy when it is installed (or `use_numpy`), and replaces the
+    running baselines with the state the last sample left. Only changed scores are written,
+    and the rollups of their days refreshed. Returns the number of samples whose score changed.
+    """
+    use_numpy = np is not None if use_numpy is None else use_numpy
+    with transaction.atomic():
+        # Locked first, so a concurrent update_readiness waits for the new baselines
+        list(ReadinessBaseline.objects.select_for_update().filter(user=user).values_list('pk'))
+        samples = list(
+            BiometricData.objects.filter(user=user).filter(_recovery_filter()).order_by('timestamp')
+            .only('id', 'timestamp', 'readiness_score', *READINESS_INPUTS)
+        )
+        scores, baselines = (_rescore_numpy if use_numpy else _rescore_python)(user, samples)
+
+        now = timezone.now()
+        changed = []
+        for sample, score in zip(samples, scores):
+            if sample.readiness_score != score:
+                sample.readiness_score, sample.updated_at = score, now
+                changed.append(sample)
+        # updated_at moves so offline clients pick the new scores up in their next delta sync
+        BiometricData.objects.bulk_update(changed, ['readiness_score', 'updated_at'], batch_size=1000)
+        ReadinessBaseline.objects.filter(user=user).delete()
+        ReadinessBaseline.objects.bulk_create(baselines.values())
+        if changed:
+            refresh_biometric_rollups(user, [sample.timestamp for sample in changed])
+            bump_cache_version(user.pk, 'biometrics')
+    return len(changed)
@@ -0,0 +1,218 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce, Lower, NullIf, Trim
+
+from apps.exercises.catalog import exercise_names
+
+from .models import ExerciseRecord, PersonalRecordEvent, SetLog
+
+TWO_PLACES = Decimal('0.01')
+
+# Events are written in batches while rebuilding long histories
+EVENT_BATCH_SIZE = 5000
+
+RECORD_FIELDS = [
+    'exercise_name', 'best_weight_kg', 'best_weight_reps', 'best_weight_at',
+    'best_e1rm_kg', 'best_e1rm_at', 'best_session_volume_kg', 'best_session_volume_at',
+    'reps_by_weight', 'last_performed_at',
+]
+
+
+def exercise_key(wger_exercise_id, custom_name):
+    """Identifies an exercise across workouts: by WGER id when known, else by normalized name."""
+    if wger_exercise_id is not None:
+        return f'wger:{wger_exercise_id}'
+    return 'name:' + custom_name.strip().lower()
+
+
+def estimated_1rm(weight_kg, repetitions):
+    """Epley estimate of the one-rep max for a set."""
+    if repetitions <= 1:
+        return Decimal(weight_kg).quantize(TWO_PLACES)
+    return (Decimal(weight_kg) * (30 + repetitions) / 30).quantize(TWO_PLACES)
+
+
+def sessions_from_rows(rows):
+    """
+    Groups set rows into exercise sessions (one exercise within one workout).
+    `rows` are (workout_id, start_time, wger_exercise_id, name, weight_kg, repetitions)
+    tuples in which each workout's rows are contiguous; sessions are yielded in row order.
+    """
+    current_workout, pending = None, {}
+    for workout_id, performed_at, wger_exercise_id, custom_name, weight_kg, repetitions in rows:
+        if workout_id != current_workout:
+            yield from pending.values()
+            current_workout, pending = workout_id, {}
+        key = exercise_key(wger_exercise_id, custom_name)
+        session = pending.get(key)
+        if session is None:
+            session = pending[key] = {
+                'key': key,
+                'name': custom_name,
+                'wger_exercise_id': wger_exercise_id,
+                'workout_id': workout_id,
+                'performed_at': performed_at,
+                'sets': [],
+            }
+        session['sets'].append((Decimal(weight_kg), repetitions))
+    yield from pending.values()
+
+
+def _fold_session(record, session):
+    """Applies one session to `record` in place and returns the PersonalRecordEvents it set."""
+    events = []
+
+    def achieved(record_type, value, weight_kg=None, repetitions=None):
+        events.append(PersonalRecordEvent(
+            user_id=record.user_id,
+            workout_id=session['workout_id'],
+            exercise_key=record.exercise_key,
+            record_type=record_type,
+            value=value,
+            weight_kg=weight_kg,
+            repetitions=repetitions,
+            achieved_at=session['performed_at'],
+        ))
+
+    record.exercise_name = session['name']
+    if record.last_performed_at is None or session['performed_at'] > record.last_performed_at:
+        record.last_performed_at = session['performed_at']
+
+    lifted = [(weight_kg, repetitions) for weight_kg, repetitions in session['sets'] if repetitions > 0]
+    if not lifted:
+        return events
+
+    weight_kg, repetitions = max(lifted)
+    if record.best_weight_kg is None or weight_kg > record.best_weight_kg:
+        record.best_weight_kg, record.best_weight_reps, record.best_weight_at = weight_kg, repetitions, session['performed_at']
+        achieved('weight', weight_kg, weight_kg, repetitions)
+
+    e1rm, weight_kg, repetitions = max((estimated_1rm(w, r), w, r) for w, r in lifted)
+    if record.best_e1rm_kg is None or e1rm > record.best_e1rm_kg:
+        record.best_e1rm_kg, record.best_e1rm_at = e1rm, session['performed_at']
+        achieved('e1rm', e1rm, weight_kg, repetitions)
+
+    volume = sum(w * r for w, r in lifted).quantize(TWO_PLACES)
+    if record.best_session_volume_kg is None or volume > record.best_session_volume_kg:
+        record.best_session_volume_kg, record.best_session_volume_at = volume, session['performed_at']
+        achieved('volume', volume)
+
+    reps_by_weight = dict(record.reps_by_weight)
+    for weight_kg, repetitions in lifted:
+        weight_key = str(weight_kg.quantize(TWO_PLACES))
+        if repetitions > reps_by_weight.get(weight_key, 0):
+            reps_by_weight[weight_key] = repetitions
+            achieved('reps', repetitions, weight_kg, repetitions)
+    record.reps_by_weight = reps_by_weight
+
+    return events
+
+
+def _new_record(user, session):
+    return ExerciseRecord(
+        user=user,
+        exercise_key=session['key'],
+        exercise_name=session['name'],
+        wger_exercise_id=session['wger_exercise_id'],
+        reps_by_weight={},
+    )
+
+
+def update_personal_records(user, sessions):
+    """
+    Folds newly logged sessions into the user's records without reading any raw sets.
+    Costs a constant number of queries. A session older than the newest one already folded
+    into its record would rewrite history out of order, so that exercise is rebuilt instead.
+    """
+    sessions = sorted(sessions, key=lambda session: session['performed_at'])
+    if not sessions:
+        return
+
+    # Catalog exercises logged without a custom name are recorded under the catalog name
+    unnamed = [session for session in sessions if not session['name']]
+    if unnamed:
+        names = exercise_names(session['wger_exercise_id'] for session in unnamed)
+        for session in unnamed:
+            session['name'] = names.get(session['wger_exercise_id'], '')
+
+    with transaction.atomic():
+        records = {
+            record.exercise_key: record
+            for record in ExerciseRecord.objects.select_for_update().filter(
+                user=user, exercise_key__in={session['key'] for session in sessions}
+            )
+        }
+        backdated = {
+            session['key'] for session in sessions
+            if session['key'] in records and session['performed_at'] < records[session['key']].last_performed_at
+        }
+
+        created, events = {}, []
+        for session in sessions:
+            if session['key'] in backdated:
+                continue
+            record = records.get(session['key'])
+            if record is None:
+                record = records[session['key']] = created[session['key']] = _new_record(user, session)
+            events.extend(_fold_session(record, session))
+
+        ExerciseRecord.objects.bulk_create(created.values())
+        ExerciseRecord.objects.bulk_update(
+            [record for key, record in records.items() if key not in created and key not in backdated], RECORD_FIELDS
+        )
+        PersonalRecordEvent.objects.bulk_create(events)
+
+        if backdated:
+            rebuild_personal_records(user, backdated)
+
+
+def rebuild_personal_records(user, keys=None):
+    """
+    Recomputes records and their history from the raw sets, for `keys` or for every exercise.
+    Used when a workout is edited or deleted; rows are streamed so memory stays bounded.
+    """
+    records_qs = ExerciseRecord.objects.filter(user=user)
+    events_qs = PersonalRecordEvent.objects.filter(user=user)
+    rows = SetLog.objects.filter(exercise_log__workout__user=user)
+
+    if keys is not None:
+        keys = set(keys)
+        if not keys:
+            return
+        records_qs = records_qs.filter(exercise_key__in=keys)
+        events_qs = events_qs.filter(exercise_key__in=keys)
+        wger_ids = [int(key[5:]) for key in keys if key.startswith('wger:')]
+        names = [key[5:] for key in keys if key.startswith('name:')]
+        rows = rows.alias(name_key=Lower(Trim('exercise_log__custom_name'))).filter(
+            Q(exercise_log__wger_exercise_id__in=wger_ids)
+            | Q(exercise_log__wger_exercise_id__isnull=True, name_key__in=names)
+        )
+
+    # As in update_personal_records, a blank custom name falls back to the catalog name
+    rows = rows.annotate(exercise_name=Coalesce(
+        NullIf('exercise_log__custom_name', Value('')), 'exercise_log__wger_exercise__name', Value(''),
+    ))
+    rows = rows.order_by('exercise_log__workout__start_time', 'exercise_log__workout_id').values_list(
+        'exercise_log__workout_id', 'exercise_log__workout__start_time',
+        'exercise_log__wger_exercise_id', 'exercise_name',
+        'weight_kg', 'repetitions',
+    )
+
+    with transaction.atomic():
+        records_qs.delete()
+        events_qs.delete()
+
+        records, events = {}, []
+        for session in sessions_from_rows(rows.iterator(chunk_size=2000)):
+            record = records.get(session['key'])
+            if record is None:
+                record = records[session['key']] = _new_record(user, session)
+            events.extend(_fold_session(record, session))
+            if len(events) >= EVENT_BATCH_SIZE:
+                PersonalRecordEvent.objects.bulk_create(events)
+                events = []
+
+        ExerciseRecord.objects.bulk_create(records.values())
+        PersonalRecordEvent.objects.bulk_create(events)
@@ -0,0 +1,149 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from biosync.response_cache import bump_cache_version
+
+from .models import BiometricData, BiometricRollup, BIOMETRIC_METRICS
+
+# --- Bucket helpers ---
+
+def day_bucket(timestamp):
+    """The calendar day (in the active time zone) a sample belongs to."""
+    return timezone.localtime(timestamp).date()
+
+
+def week_bucket(day):
+    """The Monday starting the ISO week that contains `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+def _contiguous_runs(days):
+    """Groups sorted dates into (first, last) runs of consecutive days."""
+    runs = []
+    for day in sorted(days):
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def _day_ranges(days):
+    """A filter matching samples whose timestamp falls on any of `days`, one range per run."""
+    tz = timezone.get_current_timezone()
+    return reduce(or_, (
+        Q(timestamp__gte=datetime.combine(first, time.min, tzinfo=tz),
+          timestamp__lt=datetime.combine(last + timedelta(days=1), time.min, tzinfo=tz))
+        for first, last in _contiguous_runs(days)
+    ))
+
+
+# --- Refresh ---
+
+def refresh_biometric_rollups(user, timestamps):
+    """
+    Recomputes the daily and weekly rollups touched by samples at `timestamps`.
+
+    Only the affected buckets are rebuilt: daily buckets are re-aggregated from raw samples
+    with one grouped query, then weekly buckets are folded from their (at most seven) daily
+    rows, so the raw table is never scanned outside the changed days. Works for inserts,
+    updates and deletes alike because buckets are recomputed rather than adjusted.
+    """
+    days = {day_bucket(timestamp) for timestamp in timestamps}
+    if not days:
+        return
+    weeks = {week_bucket(day) for day in days}
+
+    with transaction.atomic():
+        daily = _aggregate_days(user, days)
+        BiometricRollup.objects.filter(user=user, resolution='day', bucket_start__in=days).delete()
+        BiometricRollup.objects.bulk_create(daily)
+
+        weekly = _fold_weeks(user, weeks)
+        BiometricRollup.objects.filter(user=user, resolution='week', bucket_start__in=weeks).delete()
+        BiometricRollup.objects.bulk_create(weekly)
+
+
+def _aggregate_days(user, days):
+    aggregates = {}
+    for metric in BIOMETRIC_METRICS:
+        aggregates[f'{metric}__count'] = Count(metric)
+        aggregates[f'{metric}__sum'] = Sum(metric)
+        aggregates[f'{metric}__min'] = Min(metric)
+        aggregates[f'{metric}__max'] = Max(metric)
+
+    rows = (
+        BiometricData.objects.filter(_day_ranges(days), user=user)
+        .annotate(bucket=TruncDate('timestamp'))
+        .values('bucket')
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+    rollups = []
+    for row in rows:
+        for metric in BIOMETRIC_METRICS:
+            if not row[f'{metric}__count']:
+                continue
+            rollups.append(BiometricRollup(
+                user=user,
+                resolution='day',
+                bucket_start=row['bucket'],
+                metric=metric,
+                count=row[f'{metric}__count'],
+                total=float(row[f'{metric}__sum']),
+                minimum=float(row[f'{metric}__min']),
+                maximum=float(row[f'{metric}__max']),
+            ))
+    return rollups
+
+
+def _fold_weeks(user, weeks):
+    week_days = Q()
+    for week in weeks:
+        week_days |= Q(bucket_start__gte=week, bucket_start__lt=week + timedelta(days=7))
+
+    folded = defaultdict(lambda: {'count': 0, 'total': 0.0, 'minimum': None, 'maximum': None})
+    daily = BiometricRollup.objects.filter(week_days, user=user, resolution='day')
+    for day in daily.values('bucket_start', 'metric', 'count', 'total', 'minimum', 'maximum'):
+        bucket = folded[(week_bucket(day['bucket_start']), day['metric'])]
+        bucket['count'] += day['count']
+        bucket['total'] += day['total']
+        bucket['minimum'] = day['minimum'] if bucket['minimum'] is None else min(bucket['minimum'], day['minimum'])
+        bucket['maximum'] = day['maximum'] if bucket['maximum'] is None else max(bucket['maximum'], day['maximum'])
+
+    return [
+        BiometricRollup(user=user, resolution='week', bucket_start=week, metric=metric, **stats)
+        for (week, metric), stats in folded.items()
+    ]
+
+
+def rebuild_biometric_rollups(user, chunk_days=90):
+    """
+    Rebuilds every rollup for `user` from scratch, `chunk_days` days of samples at a time, and
+    invalidates the cached trends read from them. One transaction: readers keep seeing the old
+    rollups until the new ones are complete, and a failure leaves the old ones in place.
+    """
+    with transaction.atomic():
+        BiometricRollup.objects.filter(user=user).delete()
+        days = sorted(
+            BiometricData.objects.filter(user=user)
+            .annotate(day=TruncDate('timestamp'))
+            .values_list('day', flat=True)
+            .order_by()
+            .distinct()
+        )
+        for i in range(0, len(days), chunk_days):
+            BiometricRollup.objects.bulk_create(_aggregate_days(user, days[i:i + chunk_days]))
+
+        weeks = sorted({week_bucket(day) for day in days})
+        for i in range(0, len(weeks), chunk_days):
+            BiometricRollup.objects.bulk_create(_fold_weeks(user, weeks[i:i + chunk_days]))
+        bump_cache_version(user.pk, 'biometrics')
@@ -0,0 +1,237 @@
+import math
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.utils import timezone
+
+from apps.goals.models import Goal
+from apps.progress.models import ProgressEntry
+from apps.progress.tracking import recompute_goal_progress
+from apps.users.models import CustomUser
+
+from .models import Workout, ExerciseLog, SetLog, BiometricData
+from .readiness import rescore_readiness
+from .records import rebuild_personal_records
+from .rollups import rebuild_biometric_rollups
+from .stats import rebuild_training_stats
+
+EXERCISE_NAMES = [
+    'Barbell Squat', 'Bench Press', 'Deadlift', 'Overhead Press',
+    'Barbell Row', 'Pull Up', 'Romanian Deadlift', 'Lunge',
+]
+
+
+def seed_user(rng, workouts, exercises, sets, prefix='seed'):
+    """
+    Creates a user with a realistic Workout/ExerciseLog/SetLog tree, biometrics, goals and
+    progress entries, using bulk inserts. Derived tables (stats, records, rollups and goal
+    progress) are rebuilt so the account looks as if it had been filled through the API.
+    """
+    tag = uuid.uuid4().hex[:8]
+    user = CustomUser.objects.create(email=f"{prefix}-{tag}@example.com", username=f"{prefix}-{tag}")
+    now = timezone.now()
+
+    workout_objs, exercise_objs, set_objs = [], [], []
+    for w in range(workouts):
+        workout = Workout(
+            user=user,
+            title=f"Session {w + 1}",
+            start_time=now - timedelta(days=w, hours=rng.randint(0, 12)),
+            duration_minutes=rng.randint(30, 90),
+        )
+        workout_objs.append(workout)
+        for e in range(exercises):
+            exercise = ExerciseLog(
+                workout=workout,
+                custom_name=rng.choice(EXERCISE_NAMES),
+                order_in_workout=e + 1,
+            )
+            exercise_objs.append(exercise)
+            for s in range(sets):
+                set_objs.append(SetLog(
+                    exercise_log=exercise,
+                    set_number=s + 1,
+                    weight_kg=Decimal(rng.randint(20, 180)),
+                    repetitions=rng.randint(3, 12),
+                    rpe=rng.randint(6, 10),
+                ))
+    Workout.objects.bulk_create(workout_objs)
+    ExerciseLog.objects.bulk_create(exercise_objs)
+    SetLog.objects.bulk_create(set_objs)
+    rebuild_training_stats(user)
+    rebuild_personal_records(user)
+
+    BiometricData.objects.bulk_create([
+        BiometricData(
+            user=user,
+            timestamp=now - timedelta(hours=h),
+            resting_heart_rate=rng.randint(45, 70),
+            heart_rate_variability=rng.randint(30, 120),
+        )
+        for h in range(workouts * 2)
+    ])
+    rescore_readiness(user)
+    rebuild_biometric_rollups(user)
+
+    goals = Goal.objects.bulk_create([
+        Goal(
+            user=user,
+            title=f"Goal {g + 1}",
+            start_date=date.today() - timedelta(days=workouts),
+            target_value=Decimal('100.00'),
+            target_unit='km',
+        )
+        for g in range(max(1, workouts // 4))
+    ])
+    ProgressEntry.objects.bulk_create([
+        ProgressEntry(user=user, goal=goal, date=date.today() - timedelta(days=d), value=Decimal('1.50'))
+        for goal in goals
+        for d in range(4)
+    ])
+    recompute_goal_progress(Goal.objects.filter(user=user))
+    return user
+
+
+# Typical training split used by the synthetic data generator: a strength day alternates
+# between these sessions, the rest of the week is cardio or HIIT.
+TRAINING_SPLIT = [
+    ('Lower Body', ['Barbell Squat', 'Romanian Deadlift', 'Lunge', 'Deadlift']),
+    ('Upper Body', ['Bench Press', 'Overhead Press', 'Barbell Row', 'Pull Up']),
+]
+
+
+def generate_account(rng, days=365, workouts_per_week=4, exercises=5, sets=4, biometric_days=7,
+                     biometric_interval=1, goals=4, prefix='synthetic', password=None, batch_size=2000):
+    """
+    Creates a user with `days` of realistic history, written with batched bulk inserts so memory
+    stays bounded for multi-year datasets:
+
+    - workouts on `workouts_per_week` random days a week, strength sessions with progressively
+      heavier sets (rounded to 2.5 kg) and shorter cardio/HIIT sessions;
+    - a morning biometric summary (weight, sleep, HRV) every day, scored for readiness, plus heart-rate
+      samples every `biometric_interval` minutes for the last `biometric_days` days;
+    - `goals` goals spread over the period, with progress logged on most days of each goal.
+
+    Derived tables are rebuilt afterwards, exactly as `seed_user` does.
+    """
+    tag = uuid.uuid4().hex[:8]
+    user = CustomUser(email=f"{prefix}-{tag}@example.com", username=f"{prefix}-{tag}")
+    if password:
+        user.set_password(password)
+    else:
+        user.set_unusable_password()
+    user.save()
+
+    now = timezone.now().replace(second=0, microsecond=0)
+    first_day = now - timedelta(days=days)
+    # Starting working weight per exercise; progression is ~0.3% per week with daily noise
+    base_weight = {name: rng.randint(30, 120) for name in EXERCISE_NAMES}
+
+    workout_objs, exercise_objs, set_objs = [], [], []
+
+    def flush_workouts():
+        Workout.objects.bulk_create(workout_objs, batch_size=batch_size)
+        ExerciseLog.objects.bulk_create(exercise_objs, batch_size=batch_size)
+        SetLog.objects.bulk_create(set_objs, batch_size=batch_size)
+        for batch in (workout_objs, exercise_objs, set_objs):
+            batch.clear()
+
+    strength_days = 0
+    for week in range(days // 7 + 1):
+        for weekday in sorted(rng.sample(range(7), min(7, workouts_per_week))):
+            start = first_day + timedelta(days=week * 7 + weekday, hours=rng.choice([6, 7, 12, 17, 18, 19]))
+            if start > now:
+                break
+            strength = rng.random() < 0.7
+            duration = rng.randint(45, 90) if strength else rng.randint(20, 60)
+            if strength:
+                title, names = TRAINING_SPLIT[strength_days % len(TRAINING_SPLIT)]
+                strength_days += 1
+                activity_type, names = 'weightlifting', rng.sample(names, min(exercises, len(names)))
+            else:
+                activity_type = rng.choice(['cardio', 'hiit'])
+                title, names = ('HIIT' if activity_type == 'hiit' else 'Cardio'), []
+            workout = Workout(
+                user=user,
+                title=title,
+                start_time=start,
+                end_time=start + timedelta(minutes=duration),
+                duration_minutes=duration,
+                activity_type=activity_type,
+            )
+            workout_objs.append(workout)
+
+            progression = 1 + 0.003 * week
+            for order, name in enumerate(names, start=1):
+                exercise = ExerciseLog(workout=workout, custom_name=name, order_in_workout=order)
+                exercise_objs.append(exercise)
+                working = base_weight[name] * progression * rng.uniform(0.95, 1.05)
+                for number in range(1, sets + 1):
+                    set_objs.append(SetLog(
+                        exercise_log=exercise,
+                        set_number=number,
+                        weight_kg=Decimal(str(round(working / 2.5) * 2.5)),
+                        repetitions=max(1, rng.randint(5, 10) - number // 2),
+                        rpe=min(10, 6 + number + rng.randint(0, 1)),
+                        to_failure=number == sets and rng.random() < 0.2,
+                    ))
+            if len(set_objs) >= batch_size:
+                flush_workouts()
+    flush_workouts()
+    rebuild_training_stats(user)
+    rebuild_personal_records(user)
+
+    samples = []
+    weight = rng.uniform(60, 95)
+    for day in range(days + 1):
+        weight += rng.uniform(-0.3, 0.28)
+        sleep = rng.uniform(5.5, 8.5)
+        # Summaries sit on the half minute, so they never collide with the per-minute samples
+        samples.append(BiometricData(
+            user=user,
+            timestamp=first_day + timedelta(days=day, hours=6, seconds=30),
+            recorded_weight_kg=Decimal(f"{weight:.2f}"),
+            sleep_duration_hours=Decimal(f"{sleep:.2f}"),
+            sleep_score=min(100, int(sleep * 11 + rng.randint(-5, 5))),
+            resting_heart_rate=rng.randint(48, 62),
+            heart_rate_variability=rng.randint(40, 110),
+        ))
+    minutes = biometric_days * 24 * 60
+    for minute in range(0, minutes, max(1, biometric_interval)):
+        timestamp = now - timedelta(minutes=minutes - minute)
+        # Heart rate follows a daily rhythm: lowest at night, highest mid-afternoon
+        rhythm = 15 * math.sin((timestamp.hour - 9) / 24 * 2 * math.pi)
+        samples.append(BiometricData(user=user, timestamp=timestamp, resting_heart_rate=int(65 + rhythm + rng.gauss(0, 4))))
+        if len(samples) >= batch_size:
+            BiometricData.objects.bulk_create(samples, batch_size=batch_size)
+            samples.clear()
+    BiometricData.objects.bulk_create(samples, batch_size=batch_size)
+    rescore_readiness(user)
+    rebuild_biometric_rollups(user)
+
+    goal_objs = []
+    span = max(1, days // max(1, goals))
+    for g in range(goals):
+        start_date = (first_day + timedelta(days=g * span)).date()
+        goal_objs.append(Goal(
+            user=user,
+            title=f"Goal {g + 1}: {rng.choice(['Run', 'Cycle', 'Row', 'Swim'])} {rng.choice([50, 100, 250, 500])} km",
+            start_date=start_date,
+            target_date=start_date + timedelta(days=span * 2),
+            target_value=Decimal(rng.choice([50, 100, 250, 500])),
+            target_unit='km',
+            goal_type='Fitness',
+        ))
+    goal_objs = Goal.objects.bulk_create(goal_objs)
+
+    entries = []
+    for goal in goal_objs:
+        day = goal.start_date
+        while day <= min(goal.target_date, now.date()):
+            if rng.random() < 0.6:
+                entries.append(ProgressEntry(user=user, goal=goal, date=day, value=Decimal(f"{rng.uniform(1, 12):.2f}")))
+            day += timedelta(days=1)
+    ProgressEntry.objects.bulk_create(entries, batch_size=batch_size)
+    recompute_goal_progress(Goal.objects.filter(user=user))
+    return user
@@ -1,10 +1,253 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
-from .models import Workout, ExerciseLog, SetLog, BiometricData
+from .models import (
+    Workout, ExerciseLog, SetLog, BiometricData, BIOMETRIC_METRICS, ExerciseRecord, PersonalRecordEvent,
+    workout_tree_prefetch,
+)
+from . import jobs
+from .records import exercise_key, sessions_from_rows, update_personal_records
+from .stats import apply_workout_stats
+
+# Fields a new set must carry, even in a PATCH where nested fields are otherwise optional
+SET_REQUIRED_FIELDS = ('set_number', 'weight_kg', 'repetitions')
+
+
+def create_workout_trees(items):
+    """
+    Inserts complete Workout -> ExerciseLog -> SetLog trees using one bulk_create per table,
+    so the number of round-trips is constant no matter how many workouts, exercises or sets
+    are written. `items` are validated WorkoutSerializer payloads that include the owning `user`.
+    """
+    workouts, exercise_logs, set_logs = [], [], []
+    contributions = defaultdict(list)
+    set_rows = defaultdict(list)
+
+    for workout_data in items:
+        workout_data = dict(workout_data)
+        exercises_data = workout_data.pop('exercises', [])
+        workout = Workout(**workout_data)
+        workouts.append(workout)
+        volume = 0
+
+        for exercise_data in exercises_data:
+            exercise_data = dict(exercise_data)
+            sets_data = [_without_id(set_data) for set_data in exercise_data.pop('sets', [])]
+            exercise_data.pop('id', None)
+            # UUID primary keys are assigned in Python, so children can reference parents before insert
+            exercise_log = ExerciseLog(workout=workout, **exercise_data)
+            exercise_logs.append(exercise_log)
+            set_logs.extend(SetLog(exercise_log=exercise_log, **set_data) for set_data in sets_data)
+            volume += sum(set_data['weight_kg'] * set_data['repetitions'] for set_data in sets_data)
+            set_rows[workout.user].extend(
+                (workout.id, workout.start_time, exercise_log.wger_exercise_id, exercise_log.custom_name,
+                 set_data['weight_kg'], set_data['repetitions'])
+                for set_data in sets_data
+            )
+
+        contributions[workout.user].append((workout.start_time, workout.activity_type, volume, workout.duration_minutes or 0))
+
+    with transaction.atomic():
+        Workout.objects.bulk_create(workouts)
+        ExerciseLog.objects.bulk_create(exercise_logs)
+        SetLog.objects.bulk_create(set_logs)
+
+        # Volumes and sets are known from the payload, so stats and records need no read-back
+        for user, user_contributions in contributions.items():
+            apply_workout_stats(user, user_contributions)
+        for user, rows in set_rows.items():
+            update_personal_records(user, sessions_from_rows(rows))
+
+    return workouts
+
+
+def _without_id(data):
+    """A nested payload without the `id` that only matters when editing a stored tree."""
+    return {field: value for field, value in data.items() if field != 'id'}
+
+
+def _assign(instance, data):
+    """Sets the fields of `data` on `instance` and returns the names of those that changed."""
+    changed = [field for field, value in data.items() if getattr(instance, field) != value]
+    for field in changed:
+        setattr(instance, field, data[field])
+    return changed
+
+
+def _tree_state(workout, tree):
+    """
+    The stats contribution of an in-memory workout tree ([(exercise, sets)]) and, per exercise
+    id, what its personal records depend on: (key, name, sorted (weight, reps) of its sets).
+    """
+    volume = sum((set_log.weight_kg * set_log.repetitions for _, sets in tree for set_log in sets), Decimal('0'))
+    contribution = (workout.start_time, workout.activity_type, volume, workout.duration_minutes or 0)
+    records = {
+        exercise.id: (
+            exercise_key(exercise.wger_exercise_id, exercise.custom_name), exercise.custom_name,
+            sorted((set_log.weight_kg, set_log.repetitions) for set_log in sets),
+        )
+        for exercise, sets in tree
+    }
+    return contribution, records
+
+
+def _diff_sets(exercise, stored_sets, sets_data, plan):
+    """Matches `sets_data` to the stored sets of one exercise by id; returns the new list of sets."""
+    stored = {set_log.id: set_log for set_log in stored_sets}
+    sets, errors = [], {}
+    for index, set_data in enumerate(sets_data):
+        set_data = dict(set_data)
+        set_id = set_data.pop('id', None)
+        if set_id is None:
+            missing = [field for field in SET_REQUIRED_FIELDS if field not in set_data]
+            if missing:
+                errors[index] = {field: ["This field is required."] for field in missing}
+                continue
+            set_log = SetLog(exercise_log=exercise, **set_data)
+            plan['created_sets'].append(set_log)
+        else:
+            set_log = stored.pop(set_id, None)
+            if set_log is None:
+                errors[index] = {'id': ["Not a set of this exercise."]}
+                continue
+            changed = _assign(set_log, set_data)
+            if changed:
+                plan['updated_sets'].append(set_log)
+                plan['set_fields'].update(changed)
+        sets.append(set_log)
+    plan['deleted_sets'].extend(stored)
+    return sets, errors
+
+
+def update_workout_tree(workout, validated_data):
+    """
+    Applies a validated WorkoutSerializer payload to a stored workout, writing only what changed.
+
+    When `exercises` is given it is the workout's complete list: items with the `id` of a stored
+    exercise update it, items without an `id` are inserted, and stored exercises left out are
+    deleted. An exercise's `sets` are diffed the same way, and left as they are when omitted.
+    The stored tree is the one prefetched with the workout (loaded here otherwise), so the edit
+    costs one insert, one bulk_update and one delete per table at most, whatever its size.
+
+    The workout row is always saved, moving `updated_at` for offline clients. Training stats are
+    moved and personal records rebuilt (in a background job) only when what they depend on changed.
+    """
+    data = dict(validated_data)
+    exercises_data = data.pop('exercises', None)
+    prefetch_related_objects([workout], workout_tree_prefetch())
+    tree = [(exercise, list(exercise.sets.all())) for exercise in workout.exercises.all()]
+    previous, previous_records = _tree_state(workout, tree)
+    changed = _assign(workout, data)
+
+    plan = defaultdict(list)
+    plan['exercise_fields'], plan['set_fields'] = set(), set()
+    if exercises_data is not None:
+        stored = {exercise.id: (exercise, sets) for exercise, sets in tree}
+        tree, errors = [], {}
+        for index, exercise_data in enumerate(exercises_data):
+            exercise_data = dict(exercise_data)
+            sets_data = exercise_data.pop('sets', None)
+            exercise_id = exercise_data.pop('id', None)
+            if exercise_id is None:
+                exercise, sets = ExerciseLog(workout=workout, **exercise_data), []
+                plan['created_exercises'].append(exercise)
+            else:
+                exercise, sets = stored.pop(exercise_id, (None, None))
+                if exercise is None:
+                    errors[index] = {'id': ["Not an exercise of this workout."]}
+                    continue
+                exercise_changed = _assign(exercise, exercise_data)
+                if exercise.wger_exercise_id is None and not exercise.custom_name.strip():
+                    errors[index] = {'custom_name': ["Required unless wger_exercise_id is given."]}
+                    continue
+                if exercise_changed:
+                    plan['updated_exercises'].append(exercise)
+                    plan['exercise_fields'].update(exercise_changed)
+            if sets_data is not None:
+                sets, set_errors = _diff_sets(exercise, sets, sets_data, plan)
+                if set_errors:
+                    errors[index] = {'sets': set_errors}
+            tree.append((exercise, sets))
+        if errors:
+            raise serializers.ValidationError({'exercises': errors})
+        plan['deleted_exercises'] = list(stored)
+
+    current, current_records = _tree_state(workout, tree)
+    # Records depend on the sets, the exercise's identity and, for their dates, the start time
+    affected = set()
+    for exercise_id in previous_records.keys() | current_records.keys():
+        before, after = previous_records.get(exercise_id), current_records.get(exercise_id)
+        if before != after or 'start_time' in changed:
+            affected.update(state[0] for state in (before, after) if state and state[2])
+
+    with transaction.atomic():
+        workout.save(update_fields=[*changed, 'updated_at'])
+        if plan['deleted_sets']:
+            SetLog.objects.filter(pk__in=plan['deleted_sets']).delete()
+        if plan['deleted_exercises']:
+            # Their sets go with them through the cascade
+            ExerciseLog.objects.filter(pk__in=plan['deleted_exercises']).delete()
+        ExerciseLog.objects.bulk_create(plan['created_exercises'])
+        SetLog.objects.bulk_create(plan['created_sets'])
+        if plan['updated_exercises']:
+            ExerciseLog.objects.bulk_update(plan['updated_exercises'], sorted(plan['exercise_fields']))
+        if plan['updated_sets']:
+            SetLog.objects.bulk_update(plan['updated_sets'], sorted(plan['set_fields']))
+
+        if current != previous:
+            apply_workout_stats(workout.user, [previous], sign=-1)
+            apply_workout_stats(workout.user, [current])
+        if affected:
+            jobs.rebuild_personal_records.enqueue(user_id=workout.user_id, keys=sorted(affected))
+    return workout
+
+
+def upsert_biometric_samples(user, items, batch_size=1000):
+    """
+    Writes validated BiometricDataSerializer payloads for `user`, deduplicated on (user, timestamp).
+    Duplicates within the payload collapse to the last occurrence, and samples already stored
+    with the same values are skipped, so resending an overlapping sync window rewrites nothing.
+    The rest are inserted, or updated in place through INSERT ... ON CONFLICT, in batches of
+    `batch_size`; their readiness score is left for apps.activities.readiness to recompute.
+    Returns the payloads written.
+    """
+    samples = {}
+    for sample_data in items:
+        samples[sample_data['timestamp']] = sample_data
+
+    metrics = [metric for metric in BIOMETRIC_METRICS if metric != 'readiness_score']
+    timestamps = list(samples)
+    for start in range(0, len(timestamps), batch_size):
+        stored_samples = BiometricData.objects.filter(
+            user=user, timestamp__in=timestamps[start:start + batch_size],
+        ).only('timestamp', *metrics)
+        for stored in stored_samples:
+            incoming = BiometricData(**samples[stored.timestamp])
+            if all(getattr(incoming, metric) == getattr(stored, metric) for metric in metrics):
+                del samples[stored.timestamp]
+
+    BiometricData.objects.bulk_create(
+        [BiometricData(user=user, **sample_data) for sample_data in samples.values()],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['user', 'timestamp'],
+        update_fields=[*metrics, 'updated_at'],
+    )
+    return list(samples.values())
+
 
 # --- SetLog Serializer (Innermost Tier) ---
 
 class SetLogSerializer(serializers.ModelSerializer):
-    """Serializer for the granular SetLog model."""
+    """
+    Serializer for the granular SetLog model. The `id` is only read on input when editing a
+    workout, to match the set with the stored one (see update_workout_tree).
+    """
+    id = serializers.UUIDField(required=False)
+
     class Meta:
         model = SetLog
         # Exclude 'exercise_log' field here as it is handled by the parent serializer
@@ -18,14 +261,26 @@ class ExerciseLogSerializer(serializers.ModelSerializer):
     """
     Serializer for the ExerciseLog model.
     It includes nested SetLogSerializer to handle sets within an exercise.
+    `exercise_name` is the catalog name of `wger_exercise_id` (null if it isn't in the catalog),
+    so `custom_name` may be left blank for catalog exercises. As for sets, an `id` on input
+    refers to a stored exercise of the workout being edited.
     """
+    id = serializers.UUIDField(required=False)
     sets = SetLogSerializer(many=True, required=False) # Nested field for the related SetLog objects
+    wger_exercise_id = serializers.IntegerField(required=False, allow_null=True)
+    exercise_name = serializers.CharField(source='wger_exercise.name', read_only=True, allow_null=True)
 
     class Meta:
         model = ExerciseLog
         # Exclude 'workout' field here as it is handled by the parent serializer
-        fields = ('id', 'wger_exercise_id', 'custom_name', 'order_in_workout', 'sets', 'created_at')
+        fields = ('id', 'wger_exercise_id', 'exercise_name', 'custom_name', 'order_in_workout', 'sets', 'created_at')
         read_only_fields = ('id', 'created_at')
+
+    def validate(self, attrs):
+        # An edit of a stored exercise is checked once merged with it (see update_workout_tree)
+        if 'id' not in attrs and attrs.get('wger_exercise_id') is None and not attrs.get('custom_name', '').strip():
+            raise serializers.ValidationError({'custom_name': "Required unless wger_exercise_id is given."})
+        return attrs
     
     # NOTE: No custom create needed here, as the deep creation is consolidated in WorkoutSerializer.
 
@@ -53,34 +308,25 @@ class WorkoutSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Handles the creation of a Workout and all nested ExerciseLog and SetLog instances.
+        The whole tree is written with three bulk inserts (workout, exercises, sets).
         """
-        # 1. Pop nested data
-        exercises_data = validated_data.pop('exercises', [])
-        
-        # 2. Create the top-level Workout instance
-        user = validated_data.pop('user')
-        workout = Workout.objects.create(user=user, **validated_data)
-
-        # 3. Iterate through exercises
-        for exercise_data in exercises_data:
-            sets_data = exercise_data.pop('sets', [])
-            
-            # Create the ExerciseLog instance
-            exercise_log = ExerciseLog.objects.create(workout=workout, **exercise_data)
-
-            # 4. Iterate through sets and bulk create for efficiency
-            set_logs = [
-                SetLog(exercise_log=exercise_log, **set_data)
-                for set_data in sets_data
-            ]
-            SetLog.objects.bulk_create(set_logs)
+        # The user is injected by the view through serializer.save(user=...)
+        return create_workout_trees([validated_data])[0]
 
-        return workout
+    def update(self, instance, validated_data):
+        """
+        Updates the workout and diffs the nested exercises and sets against the stored tree by
+        id, so editing one set writes one row (see update_workout_tree).
+        """
+        return update_workout_tree(instance, validated_data)
 
 # --- Biometric Data Serializer ---
 
 class BiometricDataSerializer(serializers.ModelSerializer):
-    """Serializer for BiometricData model."""
+    """
+    Serializer for BiometricData model. `readiness_score` is computed by the server from the
+    user's recovery baselines (see apps.activities.readiness).
+    """
     user = serializers.ReadOnlyField(source='user.email')
     
     class Meta:
@@ -89,6 +335,41 @@ class BiometricDataSerializer(serializers.ModelSerializer):
             'id', 'user', 'timestamp', 'recorded_weight_kg', 
             'sleep_duration_hours', 'sleep_score', 
             'resting_heart_rate', 'heart_rate_variability', 
-            'readiness_score', 'created_at'
+            'readiness_score', 'created_at', 'updated_at'
         )
-        read_only_fields = ('id', 'user', 'created_at')
+        read_only_fields = ('id', 'user', 'readiness_score', 'created_at', 'updated_at')
+
+    def create(self, validated_data):
+        """
+        Idempotent on (user, timestamp): re-sending a sample updates the stored row instead of
+        duplicating it.
+        """
+        user = validated_data.pop('user')
+        sample, created = BiometricData.objects.update_or_create(
+            user=user, timestamp=validated_data.pop('timestamp'), defaults=validated_data
+        )
+        return sample
+
+
+# --- Personal Record Serializers ---
+
+class ExerciseRecordSerializer(serializers.ModelSerializer):
+    """Read-only serializer for a user's current personal bests on one exercise."""
+    class Meta:
+        model = ExerciseRecord
+        fields = (
+            'id', 'exercise_key', 'exercise_name', 'wger_exercise_id',
+            'best_weight_kg', 'best_weight_reps', 'best_weight_at',
+            'best_e1rm_kg', 'best_e1rm_at',
+            'best_session_volume_kg', 'best_session_volume_at',
+            'reps_by_weight', 'last_performed_at',
+        )
+        read_only_fields = fields
+
+
+class PersonalRecordEventSerializer(serializers.ModelSerializer):
+    """Read-only serializer for one entry of an exercise's PR history."""
+    class Meta:
+        model = PersonalRecordEvent
+        fields = ('id', 'workout', 'record_type', 'value', 'weight_kg', 'repetitions', 'achieved_at')
+        read_only_fields = fields
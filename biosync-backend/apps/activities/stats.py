@@ -0,0 +1,172 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, Sum
+from django.utils import timezone
+
+from biosync.response_cache import bump_cache_version
+
+from .models import DailyTrainingVolume, SetLog, TrainingStats, Workout
+from .rollups import day_bucket, week_bucket
+
+# Rolling windows (in days) reported by WorkoutViewSet.metrics, and weeks of weekly volume
+METRIC_WINDOWS = (7, 30, 90)
+METRIC_WEEKS = 12
+
+
+def workout_volume(workout):
+    """Total volume (sum of weight x reps) of a stored workout, in one aggregate query."""
+    volume = SetLog.objects.filter(exercise_log__workout=workout).aggregate(
+        volume=Sum(F('weight_kg') * F('repetitions'), output_field=DecimalField())
+    )['volume']
+    return volume or Decimal('0')
+
+
+def workout_contribution(workout):
+    """The (start_time, activity_type, volume, duration_minutes) a stored workout adds to the stats."""
+    return workout.start_time, workout.activity_type, workout_volume(workout), workout.duration_minutes or 0
+
+
+def apply_workout_stats(user, contributions, sign=1):
+    """
+    Adds (`sign=1`) or removes (`sign=-1`) workouts from the user's TrainingStats and
+    DailyTrainingVolume rows. `contributions` is an iterable of
+    (start_time, activity_type, volume, duration_minutes).
+
+    Deltas are grouped in Python first, so any number of workouts costs a constant number of
+    queries: one insert of the missing buckets, one locked read and one bulk_update per table.
+    """
+    totals = defaultdict(lambda: [0, Decimal('0')])
+    daily = defaultdict(lambda: [0, Decimal('0'), 0])
+    for start_time, activity_type, volume, minutes in contributions:
+        for bucket in (totals[activity_type], daily[(day_bucket(start_time), activity_type)]):
+            bucket[0] += sign
+            bucket[1] += sign * Decimal(volume)
+        daily[(day_bucket(start_time), activity_type)][2] += sign * (minutes or 0)
+
+    if not totals:
+        return
+
+    with transaction.atomic():
+        _apply_deltas(
+            TrainingStats.objects.filter(user=user, activity_type__in=totals.keys()),
+            totals,
+            key=lambda row: row.activity_type,
+            build=lambda activity_type: TrainingStats(user=user, activity_type=activity_type),
+            fields=('total_workouts', 'total_volume_kg'),
+        )
+
+        # Filtering on days x types may read a few extra rows; they are matched by key below
+        _apply_deltas(
+            DailyTrainingVolume.objects.filter(
+                user=user,
+                day__in={day for day, _ in daily},
+                activity_type__in={activity_type for _, activity_type in daily},
+            ),
+            daily,
+            key=lambda row: (row.day, row.activity_type),
+            build=lambda key: DailyTrainingVolume(user=user, day=key[0], activity_type=key[1]),
+            fields=('workouts', 'volume_kg', 'duration_minutes'),
+        )
+
+
+def _apply_deltas(queryset, deltas, key, build, fields):
+    """`fields` are the workout count, then the summed quantities, in the order of each delta."""
+    count_field, *sum_fields = fields
+    # Empty buckets are inserted before the locked read, which then covers every bucket the
+    # deltas add to. A concurrent first write to the same bucket makes one of the inserts a
+    # no-op instead of an IntegrityError; the other write then waits on the row lock.
+    queryset.model.objects.bulk_create(
+        [build(delta_key) for delta_key, (count, *_) in deltas.items() if count > 0],
+        ignore_conflicts=True,
+    )
+    existing = {key(row): row for row in queryset.select_for_update()}
+
+    to_update, to_create, to_delete = [], [], []
+    for delta_key, (count, *amounts) in deltas.items():
+        row = existing.get(delta_key)
+        if row is None and count <= 0:
+            continue
+        if row is None:
+            # Emptied and deleted by a concurrent removal between the insert and the read
+            row = build(delta_key)
+            to_create.append(row)
+        elif getattr(row, count_field) + count <= 0:
+            # Drop buckets whose last workout was removed, matching a rebuild from scratch
+            to_delete.append(row.pk)
+            continue
+        else:
+            to_update.append(row)
+        setattr(row, count_field, getattr(row, count_field) + count)
+        for field, amount in zip(sum_fields, amounts):
+            setattr(row, field, max(0, getattr(row, field) + amount))
+
+    queryset.model.objects.filter(pk__in=to_delete).delete()
+    queryset.model.objects.bulk_update(to_update, list(fields))
+    queryset.model.objects.bulk_create(to_create)
+
+
+def training_metrics(user):
+    """
+    Builds the dashboard metrics from the incrementally maintained tables: lifetime totals
+    (overall and per activity type), rolling windows and recent weekly volume. Two queries.
+    """
+    volume_by_activity = {}
+    total_workouts, total_volume = 0, Decimal('0')
+    for row in TrainingStats.objects.filter(user=user):
+        volume_by_activity[row.activity_type] = round(row.total_volume_kg, 2)
+        total_workouts += row.total_workouts
+        total_volume += row.total_volume_kg
+
+    today = timezone.localdate()
+    horizon = min(today - timedelta(days=max(METRIC_WINDOWS) - 1), week_bucket(today) - timedelta(weeks=METRIC_WEEKS - 1))
+
+    windows = {days: {'workouts': 0, 'volume_kg': Decimal('0')} for days in METRIC_WINDOWS}
+    weeks = {
+        week_bucket(today) - timedelta(weeks=i): {'workouts': 0, 'volume_kg': Decimal('0')}
+        for i in range(METRIC_WEEKS)
+    }
+    for row in DailyTrainingVolume.objects.filter(user=user, day__gte=horizon, day__lte=today):
+        for days, window in windows.items():
+            if row.day > today - timedelta(days=days):
+                window['workouts'] += row.workouts
+                window['volume_kg'] += row.volume_kg
+        week = weeks.get(week_bucket(row.day))
+        if week is not None:
+            week['workouts'] += row.workouts
+            week['volume_kg'] += row.volume_kg
+
+    return {
+        'total_workouts': total_workouts,
+        'total_volume_kg': round(total_volume, 2),
+        'volume_by_activity': volume_by_activity,
+        'windows': {
+            f'last_{days}_days': {'workouts': window['workouts'], 'volume_kg': round(window['volume_kg'], 2)}
+            for days, window in windows.items()
+        },
+        'weekly_volume': [
+            {'week_start': week_start, 'workouts': week['workouts'], 'volume_kg': round(week['volume_kg'], 2)}
+            for week_start, week in sorted(weeks.items())
+        ],
+    }
+
+
+def rebuild_training_stats(user):
+    """
+    Recomputes all training stats for `user` from the raw workout history, and invalidates the
+    cached metrics and training load built from them.
+    """
+    volumes = (
+        Workout.objects.filter(user=user)
+        .annotate(volume=Sum(F('exercises__sets__weight_kg') * F('exercises__sets__repetitions'), output_field=DecimalField()))
+        .values_list('start_time', 'activity_type', 'volume', 'duration_minutes')
+    )
+    with transaction.atomic():
+        TrainingStats.objects.filter(user=user).delete()
+        DailyTrainingVolume.objects.filter(user=user).delete()
+        apply_workout_stats(user, (
+            (start, kind, volume or 0, minutes or 0) for start, kind, volume, minutes in volumes.iterator()
+        ))
+        bump_cache_version(user.pk, 'workouts')
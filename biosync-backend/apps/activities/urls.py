@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from .views import WorkoutViewSet, BiometricDataViewSet
+from .views import WorkoutViewSet, BiometricDataViewSet, PersonalRecordViewSet
 
 # Create a router and register our ViewSets with it.
 router = DefaultRouter()
@@ -11,6 +11,9 @@ router.register(r'workouts', WorkoutViewSet, basename='workout')
 # This creates endpoints like /api/v1/activities/biometrics/ and /api/v1/activities/biometrics/{pk}/
 router.register(r'biometrics', BiometricDataViewSet, basename='biometricdata')
 
+# This creates endpoints like /api/v1/activities/records/ and /api/v1/activities/records/{pk}/history/
+router.register(r'records', PersonalRecordViewSet, basename='personalrecord')
+
 # The API URLs are now determined automatically by the router.
 # The `activities/` prefix will be added in the main project urls.py
 urlpatterns = [
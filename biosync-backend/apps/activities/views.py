@@ -1,26 +1,79 @@
+from datetime import timedelta
+
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Sum, F
+from rest_framework.exceptions import ValidationError
+from rest_framework import status
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from biosync.conditional import ConditionalGetMixin
+from biosync.response_cache import CachedResponseMixin, cache_response
+from biosync.pagination import KeysetPagination
+from biosync.fast_read import ValuesReadMixin
+from biosync.parsers import FastJSONParser, NDJSONParser
+from apps.sync.tombstones import record_tombstones
 
-from .models import Workout, BiometricData
-from .serializers import WorkoutSerializer, BiometricDataSerializer
+from .models import (
+    Workout, BiometricData, BiometricRollup, BIOMETRIC_METRICS, ExerciseRecord, PersonalRecordEvent,
+    PERSONAL_RECORD_TYPES, workout_tree_prefetch,
+)
+from .columnar import ColumnarListMixin
+from .load import training_load
+from .readiness import is_recovery_sample, schedule_rescore, update_readiness
+from . import jobs
+from .records import exercise_key
+from .rollups import refresh_biometric_rollups
+from .stats import apply_workout_stats, workout_contribution, training_metrics
+from .serializers import (
+    WorkoutSerializer, BiometricDataSerializer, create_workout_trees, upsert_biometric_samples,
+    ExerciseRecordSerializer, PersonalRecordEventSerializer,
+)
 
-class WorkoutViewSet(viewsets.ModelViewSet):
+class WorkoutViewSet(ConditionalGetMixin, CachedResponseMixin, ValuesReadMixin, viewsets.ModelViewSet):
     """
     A ViewSet for viewing and editing Workout instances.
     Handles nested creation (Workout -> ExerciseLog -> SetLog) via the serializer.
+    List and retrieve take the values() fast path (see biosync/fast_read.py).
     """
     serializer_class = WorkoutSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    # History is newest first; the id breaks ties between workouts starting at the same instant.
+    ordering = ('-start_time', '-id')
+
+    # Maximum SQL queries per read action, enforced by `manage.py check_query_budgets`.
+    # The nested tree is loaded as: workouts (+ user), exercises, sets, after one aggregate
+    # for the ETag validators. Nested edits go through the workout, which bumps `updated_at`.
+    query_budget = {'list': 4, 'retrieve': 4, 'metrics': 2, 'training_load': 1}
+
+    # Reads are cached per user until the next workout write (see biosync/response_cache.py)
+    cache_resource = 'workouts'
+    # The fast read path loads the nested tree in the same order as get_queryset's prefetch
+    read_prefetches = (workout_tree_prefetch(),)
+
+    # Upper bound on workouts accepted by a single bulk import request
+    bulk_import_limit = 1000
+    # Days of training load returned by default, and at most (five years)
+    training_load_days = 90
+    training_load_max_days = 5 * 366
     
     def get_queryset(self):
         """
         Filters the queryset to only return workouts belonging to the current authenticated user.
+        The full Workout -> ExerciseLog -> SetLog tree is prefetched so serialization
+        costs a fixed number of queries regardless of how many workouts are returned.
         """
         # Note: We order by start_time descending by default for history views
-        return Workout.objects.filter(user=self.request.user).order_by('-start_time')
+        return (
+            Workout.objects.filter(user=self.request.user)
+            .select_related('user')
+            .prefetch_related(workout_tree_prefetch())
+            .order_by(*self.ordering)
+        )
 
     def perform_create(self, serializer):
         """
@@ -30,43 +83,287 @@ class WorkoutViewSet(viewsets.ModelViewSet):
         # The user is automatically set in the serializer's create method using self.context['request'].user
         serializer.save(user=self.request.user)
 
+    def perform_update(self, serializer):
+        """
+        Saves the workout, diffing its nested exercises and sets against the stored tree
+        (see update_workout_tree, which also keeps the training stats and records in step).
+        """
+        workout = serializer.save()
+        # The response is rendered from the stored tree, reloaded with the list's prefetches:
+        # UpdateModelMixin drops the stale prefetch cache of the instance it fetched
+        serializer.instance = self.get_queryset().get(pk=workout.pk)
+
+    def perform_destroy(self, instance):
+        """
+        Deletes the workout (cascading to its exercises and sets), removes it from the training
+        stats, and leaves a tombstone for offline clients. The personal records it set are
+        rebuilt from the remaining history by a background job, queued in the same transaction.
+        """
+        with transaction.atomic():
+            apply_workout_stats(self.request.user, [workout_contribution(instance)], sign=-1)
+            # Only exercises whose records this workout improved can change when it disappears
+            affected_keys = set(instance.personal_record_events.values_list('exercise_key', flat=True))
+            record_tombstones(self.request.user, 'workouts', [instance.pk])
+            instance.delete()
+            if affected_keys:
+                jobs.rebuild_personal_records.enqueue(user_id=self.request.user.pk, keys=sorted(affected_keys))
+
+    @action(detail=False, methods=['post'], url_path='bulk', parser_classes=[FastJSONParser, NDJSONParser])
+    def bulk_import(self, request):
+        """
+        Imports many workouts (with nested exercises and sets) in a single transaction.
+        Accepts a JSON array, a {"workouts": [...]} object, or NDJSON with one workout per line.
+        Valid items are written with a constant number of bulk inserts; invalid items are
+        reported by their index and skipped.
+        """
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get('workouts')
+        if not isinstance(items, list):
+            raise ValidationError("Expected a list of workouts.")
+        if len(items) > self.bulk_import_limit:
+            raise ValidationError(f"A single import may contain at most {self.bulk_import_limit} workouts.")
+
+        # One serializer validates every item, avoiding per-item field construction
+        serializer = self.get_serializer()
+        valid_items, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid_items.append({**serializer.run_validation(item), 'user': request.user})
+            except ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+
+        workouts = create_workout_trees(valid_items) if valid_items else []
+
+        return Response({
+            'created': [str(workout.id) for workout in workouts],
+            'errors': errors,
+        }, status=status.HTTP_201_CREATED if workouts or not errors else status.HTTP_400_BAD_REQUEST)
+
     @action(detail=False, methods=['get'])
+    @cache_response
     def metrics(self, request):
         """
-        Custom action to retrieve simple, aggregated workout metrics for the dashboard.
-        Example: Total workouts and total volume.
+        Aggregated workout metrics for the dashboard: lifetime totals, volume per activity type,
+        rolling 7/30/90-day windows and the last 12 weeks of volume.
+        Read from the incrementally maintained stats tables, never from the SetLog history.
         """
-        # Calculate total workouts
-        total_workouts = self.get_queryset().count()
-        
-        # Calculate total volume (sum of weight * repetitions for all sets in user's workouts)
-        total_volume = self.get_queryset().aggregate(
-            total_volume=Sum(F('exercises__sets__weight_kg') * F('exercises__sets__repetitions'), output_field=models.DecimalField())
-        )['total_volume'] or 0
+        return Response(training_metrics(request.user))
 
-        # Note: More complex metric filtering (e.g., last 7 days) should be added here
-        
-        return Response({
-            'total_workouts': total_workouts,
-            'total_volume_kg': round(total_volume, 2)
-        })
+    @action(detail=False, methods=['get'], url_path='training-load')
+    @cache_response
+    def training_load(self, request):
+        """
+        Daily training load for coaches: acute (7-day) and chronic (28-day) load, their ratio,
+        monotony and strain, for lifted volume and for minutes trained, over the last `days` days
+        (default 90). Computed from the daily stats table in one query (see load.py); cached like
+        the other reads, so it is only recomputed after the user's workouts change.
+        """
+        try:
+            days = int(request.query_params.get('days', self.training_load_days))
+        except ValueError:
+            days = 0
+        if not 1 <= days <= self.training_load_max_days:
+            raise ValidationError({'days': f"Must be a number of days from 1 to {self.training_load_max_days}."})
+        today = timezone.localdate()
+        return Response(training_load(request.user, today - timedelta(days=days - 1), today))
 
-class BiometricDataViewSet(viewsets.ModelViewSet):
+class BiometricDataViewSet(ConditionalGetMixin, CachedResponseMixin, ColumnarListMixin, ValuesReadMixin, viewsets.ModelViewSet):
     """
     A ViewSet for viewing and editing BiometricData instances.
+    List and retrieve take the values() fast path (see biosync/fast_read.py); the list is also
+    available in the compact columnar formats (see columnar.py).
     """
     serializer_class = BiometricDataSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    ordering = ('-timestamp', '-id')
+    query_budget = {'list': 2, 'retrieve': 2, 'trends': 1}
+    cache_resource = 'biometrics'
+
+    # Upper bound on samples accepted by a single ingest request, and rows per upsert statement
+    ingest_limit = 10000
+    ingest_batch_size = 1000
 
     def get_queryset(self):
         """
         Filters the queryset to only return biometric data belonging to the current authenticated user.
         """
-        # Order by timestamp descending (most recent first)
-        return BiometricData.objects.filter(user=self.request.user).order_by('-timestamp')
+        # Order by timestamp descending (most recent first).
+        # The user is joined in so the serializer's `user.email` field doesn't query per row.
+        return BiometricData.objects.filter(user=self.request.user).select_related('user').order_by(*self.ordering)
 
     def perform_create(self, serializer):
         """
-        Saves the new BiometricData instance, associating it with the current user.
+        Saves the new BiometricData instance, associating it with the current user, and scores
+        it for readiness when it is a recovery summary.
         """
-        serializer.save(user=self.request.user)
+        self.check_timestamp_free(serializer)
+        sample = serializer.save(user=self.request.user)
+        if is_recovery_sample(sample):
+            scores = update_readiness(self.request.user, [sample.timestamp])
+            sample.readiness_score = scores.get(sample.pk, sample.readiness_score)
+        refresh_biometric_rollups(self.request.user, [sample.timestamp])
+
+    def perform_update(self, serializer):
+        """
+        Saves the edited sample and refreshes the rollups for both its old and new buckets.
+        Editing a recovery summary rewrites history the readiness baselines already absorbed,
+        so the user's scores are recomputed in the background.
+        """
+        previous_timestamp = serializer.instance.timestamp
+        was_recovery = is_recovery_sample(serializer.instance)
+        self.check_timestamp_free(serializer)
+        sample = serializer.save()
+        if was_recovery or is_recovery_sample(sample):
+            schedule_rescore(self.request.user)
+        refresh_biometric_rollups(self.request.user, [previous_timestamp, sample.timestamp])
+
+    def check_timestamp_free(self, serializer):
+        """
+        `user` is read-only, so DRF skips the (user, timestamp) unique validator; without this
+        check a second sample at the same timestamp would fail on the constraint with a 500.
+        """
+        timestamp = serializer.validated_data.get('timestamp')
+        if timestamp is None:
+            return
+        samples = BiometricData.objects.filter(user=self.request.user, timestamp=timestamp)
+        if serializer.instance is not None:
+            samples = samples.exclude(pk=serializer.instance.pk)
+        if samples.exists():
+            raise ValidationError({'timestamp': ["You already have a biometric sample at this timestamp."]})
+
+    def perform_destroy(self, instance):
+        """
+        Deletes the sample, refreshes the rollups of the bucket it belonged to and leaves a
+        tombstone for offline clients. Deleting a recovery summary queues a readiness rescore.
+        """
+        timestamp = instance.timestamp
+        with transaction.atomic():
+            record_tombstones(self.request.user, 'biometrics', [instance.pk])
+            if is_recovery_sample(instance):
+                schedule_rescore(self.request.user)
+            instance.delete()
+        refresh_biometric_rollups(self.request.user, [timestamp])
+
+    @action(detail=False, methods=['post'], url_path='ingest', parser_classes=[FastJSONParser, NDJSONParser])
+    def ingest(self, request):
+        """
+        High-rate ingestion for wearable syncs. Accepts a JSON array, a {"samples": [...]} object,
+        or NDJSON with one sample per line. Samples are deduplicated on (user, timestamp) and
+        upserted in batches, so overlapping sync windows never create duplicate rows; resent
+        samples whose values are unchanged count as duplicates and aren't rewritten. Recovery
+        summaries are scored for readiness as they arrive.
+        """
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get('samples')
+        if not isinstance(items, list):
+            raise ValidationError("Expected a list of biometric samples.")
+        if len(items) > self.ingest_limit:
+            raise ValidationError(f"A single ingest may contain at most {self.ingest_limit} samples.")
+
+        serializer = self.get_serializer()
+        valid_items, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                valid_items.append(serializer.run_validation(item))
+            except ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+
+        upserted = 0
+        if valid_items:
+            written = upsert_biometric_samples(request.user, valid_items, self.ingest_batch_size)
+            upserted = len(written)
+            update_readiness(request.user, [item['timestamp'] for item in written if is_recovery_sample(item)])
+            refresh_biometric_rollups(request.user, [item['timestamp'] for item in written])
+
+        return Response({
+            'received': len(items),
+            'upserted': upserted,
+            'duplicates': len(valid_items) - upserted,
+            'errors': errors,
+        }, status=status.HTTP_200_OK if valid_items or not errors else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'])
+    @cache_response
+    def trends(self, request):
+        """
+        Returns chart-ready min/max/avg/count per bucket, read from the pre-aggregated rollups.
+        Query params: `resolution` (day|week, default day), `metrics` (comma-separated field names,
+        default all), `start` and `end` (inclusive ISO dates). Cost is O(buckets), not O(samples).
+        """
+        resolution = request.query_params.get('resolution', 'day')
+        if resolution not in dict(BiometricRollup.RESOLUTION_CHOICES):
+            raise ValidationError({'resolution': "Must be 'day' or 'week'."})
+
+        metrics = request.query_params.get('metrics')
+        metrics = metrics.split(',') if metrics else list(BIOMETRIC_METRICS)
+        unknown = set(metrics) - set(BIOMETRIC_METRICS)
+        if unknown:
+            raise ValidationError({'metrics': f"Unknown metrics: {', '.join(sorted(unknown))}."})
+
+        rollups = BiometricRollup.objects.filter(user=request.user, resolution=resolution, metric__in=metrics)
+        try:
+            if request.query_params.get('start'):
+                rollups = rollups.filter(bucket_start__gte=request.query_params['start'])
+            if request.query_params.get('end'):
+                rollups = rollups.filter(bucket_start__lte=request.query_params['end'])
+        except DjangoValidationError:
+            raise ValidationError("`start` and `end` must be dates in YYYY-MM-DD format.")
+
+        buckets = {}
+        for rollup in rollups.order_by('bucket_start'):
+            bucket = buckets.setdefault(rollup.bucket_start, {'bucket_start': rollup.bucket_start})
+            bucket[rollup.metric] = {
+                'count': rollup.count,
+                'min': rollup.minimum,
+                'max': rollup.maximum,
+                'avg': round(rollup.average, 2),
+            }
+
+        return Response({'resolution': resolution, 'buckets': list(buckets.values())})
+
+
+class PersonalRecordViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only access to the user's personal records per exercise and their history.
+    Served entirely from the incrementally maintained record tables, never from raw sets.
+    """
+    serializer_class = ExerciseRecordSerializer
+    permission_classes = [IsAuthenticated]
+    query_budget = {'list': 1, 'retrieve': 1, 'history': 2}
+
+    def get_queryset(self):
+        """
+        Returns the current user's records, optionally narrowed with `?exercise=` to a WGER id
+        or an exercise name (case-insensitive).
+        """
+        queryset = ExerciseRecord.objects.filter(user=self.request.user)
+
+        exercise = self.request.query_params.get('exercise')
+        if exercise:
+            # isdigit() alone also accepts digits int() can't parse, such as '²'
+            is_id = exercise.isascii() and exercise.isdigit()
+            key = exercise_key(int(exercise), None) if is_id else exercise_key(None, exercise)
+            queryset = queryset.filter(exercise_key=key)
+
+        return queryset
+
+    @action(detail=True, methods=['get'])
+    def history(self, request, pk=None):
+        """Every improvement of this exercise's records, oldest first. Filter with `?record_type=`."""
+        record = self.get_object()
+        events = PersonalRecordEvent.objects.filter(user=request.user, exercise_key=record.exercise_key)
+
+        record_type = request.query_params.get('record_type')
+        if record_type:
+            if record_type not in dict(PERSONAL_RECORD_TYPES):
+                raise ValidationError({'record_type': f"Must be one of: {', '.join(dict(PERSONAL_RECORD_TYPES))}."})
+            events = events.filter(record_type=record_type)
+
+        return Response({
+            'exercise_key': record.exercise_key,
+            'exercise_name': record.exercise_name,
+            'history': PersonalRecordEventSerializer(events.order_by('achieved_at'), many=True).data,
+        })
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    # No models: the dashboard only reads the other apps' tables
+    name = 'apps.dashboard'
+    verbose_name = 'Dashboard'
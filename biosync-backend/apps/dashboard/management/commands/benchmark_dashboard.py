@@ -0,0 +1,200 @@
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from biosync.response_cache import RESPONSE_CACHE
+from apps.activities.seed import generate_account
+from apps.users.models import CustomUser
+from apps.users.tokens import issue_tokens
+
+# What the PWA requested at startup before the dashboard endpoint: (section, url name, params)
+STARTUP_REQUESTS = [
+    ('goals', 'goal-list', {}),
+    ('metrics', 'workout-metrics', {}),
+    ('biometrics', 'biometricdata-list', {}),
+    ('progress', 'progressentry-list', {}),
+]
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares loading the PWA's start screen through the four separate requests it used to make "
+        "with one request to the async dashboard endpoint, all through the ASGI handler. Reports wall "
+        "time and process CPU time per page load, and checks the dashboard returns what the separate "
+        "endpoints do. The concurrent sub-queries need committed data visible to other connections, "
+        "so the generated account is committed and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', help="Benchmark this existing account instead of generating one (it is kept).")
+        parser.add_argument('--days', type=int, default=180, help="History of the generated account.")
+        parser.add_argument('--biometric-days', type=int, default=2, help="Days of minute-level heart rate in the generated account.")
+        parser.add_argument('--iterations', type=int, default=50, help="Measured page loads per flow.")
+        parser.add_argument('--warmup', type=int, default=5, help="Unmeasured page loads per flow.")
+        parser.add_argument(
+            '--db-latency-ms', type=float, default=0,
+            help="Simulated network round-trip added to every query, as a database server would have.",
+        )
+        parser.add_argument('--warm-cache', action='store_true', help="Keep the response cache between page loads instead of measuring cold reads.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help="Print the results as a single JSON object.")
+
+    def handle(self, *args, **options):
+        self.options = options
+        if options['email']:
+            user = CustomUser.objects.filter(email__iexact=options['email']).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['email']}")
+        else:
+            user = generate_account(
+                random.Random(options['seed']), days=options['days'],
+                biometric_days=options['biometric_days'], prefix='dashboard',
+            )
+        if options['db_latency_ms']:
+            connection_created.connect(self.add_latency)
+        try:
+            # The async test client always sends `Host: testserver`, as the test runner allows
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                report = asyncio.run(self.run(user, options))
+        finally:
+            if not options['email']:
+                user.delete()
+            caches[RESPONSE_CACHE].clear()
+            connection_created.disconnect(self.add_latency)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+        if not report['conn_max_age']:
+            self.stdout.write(self.style.WARNING(
+                "DB_CONN_MAX_AGE is 0: every concurrent sub-query opens and closes its own connection."
+            ))
+        for name, result in report['flows'].items():
+            self.stdout.write(
+                f"{name:>28}: {result['requests']} request(s)  p50 {result['p50_ms']:>8.2f} ms  "
+                f"p95 {result['p95_ms']:>8.2f} ms  CPU {result['cpu_ms']:>8.2f} ms  {result['bytes']:>8} B"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"The dashboard matches the separate endpoints; one concurrent request takes "
+            f"{report['speedup']['wall']}x less wall time and {report['speedup']['cpu']}x less CPU than four."
+        ))
+
+    def add_latency(self, sender, connection, **kwargs):
+        """Delays every query on a new connection by --db-latency-ms, releasing the GIL like a network wait."""
+        delay = self.options['db_latency_ms'] / 1000
+
+        def wait_for_server(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        connection.execute_wrappers.append(wait_for_server)
+
+    async def run(self, user, options):
+        client = AsyncClient()
+        headers = {'authorization': f"Bearer {issue_tokens(user)['access']}"}
+
+        async def get(url_name, params=None):
+            response = await client.get(reverse(url_name), params or {}, headers=headers)
+            if response.status_code != 200:
+                raise CommandError(f"{url_name} returned HTTP {response.status_code}: {response.content[:300]!r}")
+            return response
+
+        async def separate():
+            return [await get(url_name, params) for _, url_name, params in STARTUP_REQUESTS]
+
+        async def separate_parallel():
+            return await asyncio.gather(*(get(url_name, params) for _, url_name, params in STARTUP_REQUESTS))
+
+        async def dashboard():
+            with override_settings(DASHBOARD_CONCURRENT_QUERIES=True):
+                return [await get('dashboard')]
+
+        async def dashboard_sequential():
+            with override_settings(DASHBOARD_CONCURRENT_QUERIES=False):
+                return [await get('dashboard')]
+
+        await self.check_consistency(get)
+        flows = {
+            'separate requests': separate,
+            'separate requests (parallel)': separate_parallel,
+            'dashboard (sequential)': dashboard_sequential,
+            'dashboard (concurrent)': dashboard,
+        }
+        results = {name: await self.measure(flow, options) for name, flow in flows.items()}
+        before, after = results['separate requests'], results['dashboard (concurrent)']
+        return {
+            'benchmark': 'dashboard',
+            'db_latency_ms': options['db_latency_ms'],
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'flows': results,
+            'speedup': {
+                'wall': round(before['p50_ms'] / after['p50_ms'], 2),
+                'cpu': round(before['cpu_ms'] / after['cpu_ms'], 2),
+            },
+        }
+
+    async def measure(self, flow, options):
+        walls, cpus, sizes = [], [], []
+        for iteration in range(options['warmup'] + options['iterations']):
+            if not options['warm_cache']:
+                caches[RESPONSE_CACHE].clear()
+            began, cpu_began = time.perf_counter(), time.process_time()
+            responses = await flow()
+            wall, cpu = time.perf_counter() - began, time.process_time() - cpu_began
+            if iteration < options['warmup']:
+                continue
+            walls.append(wall * 1000)
+            cpus.append(cpu * 1000)
+            sizes.append(sum(len(response.content) for response in responses))
+        return {
+            'requests': len(responses),
+            'page_loads': len(walls),
+            'p50_ms': round(statistics.median(walls), 3),
+            'p95_ms': round(percentile(walls, 0.95), 3),
+            # Process CPU time covers every thread: the event loop, the sync thread and the pool
+            'cpu_ms': round(statistics.mean(cpus), 3),
+            'bytes': round(statistics.mean(sizes)),
+        }
+
+    async def check_consistency(self, get):
+        """Each dashboard section must hold what its separate endpoint returns."""
+        dashboard = json.loads((await get('dashboard')).content)
+        separate = {
+            section: json.loads((await get(url_name, params)).content)
+            for section, url_name, params in STARTUP_REQUESTS
+        }
+
+        active = [goal for goal in separate['goals'] if goal['status'] != 'COMPLETED']
+        if dashboard['goals'] != active:
+            raise CommandError("The dashboard's goals differ from the active goals of the goal list.")
+        if dashboard['metrics'] != separate['metrics']:
+            raise CommandError("The dashboard's metrics differ from the workout metrics endpoint.")
+        progress = separate['progress']['results']
+        if dashboard['progress'] != progress[:len(dashboard['progress'])] or not dashboard['progress']:
+            raise CommandError("The dashboard's progress entries aren't the newest of the progress list.")
+
+        # The biometric list is newest first; every metric's latest value appears on its first page
+        # unless it was recorded further back, in which case it must be older than the whole page
+        samples = separate['biometrics']['results']
+        for metric, latest in dashboard['biometrics']['metrics'].items():
+            newest = next((sample for sample in samples if sample[metric] is not None), None)
+            if newest is None:
+                if latest is not None and samples and latest['timestamp'] >= samples[-1]['timestamp']:
+                    raise CommandError(f"{metric}: the dashboard's latest value isn't on the biometric list.")
+            elif latest != {'value': newest[metric], 'timestamp': newest['timestamp']}:
+                raise CommandError(f"{metric}: the dashboard has {latest}, the biometric list {newest[metric]} at {newest['timestamp']}.")
@@ -0,0 +1,135 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import OuterRef, Subquery
+
+from apps.activities.models import BiometricData, BIOMETRIC_METRICS
+from apps.activities.serializers import BiometricDataSerializer
+from apps.activities.stats import training_metrics
+from apps.goals.models import Goal
+from apps.goals.serializers import GoalSerializer
+from apps.progress.models import ProgressEntry
+from apps.progress.serializers import ProgressEntrySerializer
+from apps.users.models import CustomUser
+
+
+def active_goals(user):
+    """Every goal not yet completed, as the goal list orders them, with progress_percentage."""
+    goals = Goal.objects.filter(user=user).exclude(status='COMPLETED').order_by('-target_date', 'status')
+    return GoalSerializer(goals, many=True).data
+
+
+# Compiled latest-biometrics statements by database alias; see _latest_biometrics_statement
+_LATEST_BIOMETRICS = {}
+
+
+def _latest_biometrics_statement(user):
+    """
+    The latest-biometrics query as (sql, compiler), compiled by the ORM once and then reused for
+    every user: its twelve subqueries take far longer to compile than SQLite needs to run them.
+    The user's id is its only parameter; the compiler converts the rows it returns.
+    """
+    if connection.alias not in _LATEST_BIOMETRICS:
+        latest = {}
+        for metric in BIOMETRIC_METRICS:
+            samples = BiometricData.objects.filter(user=OuterRef('pk'), **{f'{metric}__isnull': False}).order_by('-timestamp')
+            latest[metric] = Subquery(samples.values(metric)[:1])
+            latest[f'{metric}_at'] = Subquery(samples.values('timestamp')[:1])
+        compiler = CustomUser.objects.filter(pk=user.pk).values(**latest).query.get_compiler(connection.alias)
+        sql, _ = compiler.as_sql()
+        _LATEST_BIOMETRICS[connection.alias] = (sql, compiler)
+    return _LATEST_BIOMETRICS[connection.alias]
+
+
+@cache
+def _biometric_fields():
+    """The biometric serializer's fields, built once: they format values the way the list does."""
+    return BiometricDataSerializer().fields
+
+
+def latest_biometrics(user):
+    """
+    The most recent value of every biometric metric, with when it was recorded: samples rarely
+    carry every metric (heart rate arrives each minute, weight once a day), so the latest row
+    alone would mostly be empty. One query, each metric a subquery reading the user's samples
+    backwards from the newest.
+    """
+    sql, compiler = _latest_biometrics_statement(user)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [CustomUser._meta.pk.get_db_prep_value(user.pk, connection)])
+        rows = list(compiler.results_iter([cursor.fetchall()]))
+    row = dict(zip((alias for _, _, alias in compiler.select), rows[0])) if rows else {}
+
+    fields = _biometric_fields()
+    metrics, timestamps = {}, []
+    for metric in BIOMETRIC_METRICS:
+        recorded_at = row.get(f'{metric}_at')
+        if recorded_at is None:
+            metrics[metric] = None
+            continue
+        timestamps.append(recorded_at)
+        metrics[metric] = {
+            'value': fields[metric].to_representation(row[metric]),
+            'timestamp': fields['timestamp'].to_representation(recorded_at),
+        }
+    return {
+        'timestamp': fields['timestamp'].to_representation(max(timestamps)) if timestamps else None,
+        'metrics': metrics,
+    }
+
+
+def recent_progress(user, limit):
+    """The `limit` latest progress entries, newest first, as the progress list returns them."""
+    entries = ProgressEntry.objects.filter(user=user).select_related('goal').order_by('-date', '-created_at', '-id')
+    return ProgressEntrySerializer(entries[:limit], many=True).data
+
+
+# The threads running concurrent sub-queries. Each keeps its own connection (for CONN_MAX_AGE),
+# so the pool also bounds the connections the dashboard holds per process.
+QUERY_EXECUTOR = ThreadPoolExecutor(max_workers=settings.DASHBOARD_QUERY_THREADS, thread_name_prefix='dashboard')
+
+
+def _in_transaction():
+    return connection.in_atomic_block
+
+
+def _on_own_connection(section, user):
+    """
+    Runs `section` in a pool thread on that thread's own database connection, closed afterwards
+    unless CONN_MAX_AGE keeps it open for the thread's next section, as a request would.
+    """
+    close_old_connections()
+    try:
+        return section(user)
+    finally:
+        close_old_connections()
+
+
+async def load_dashboard(user, progress_limit):
+    """
+    Builds every dashboard section for `user`. The sections don't depend on each other, so with
+    DASHBOARD_CONCURRENT_QUERIES they are issued at the same time, each on its own connection.
+
+    Django's async ORM runs every query on the single thread-sensitive thread, one after another,
+    so concurrency comes from QUERY_EXECUTOR's threads instead. A connection inside a transaction
+    (the rolled-back benchmarks, tests) must answer alone, since other connections can't see its
+    uncommitted rows; the sections then run in turn on it.
+    """
+    sections = {
+        'goals': active_goals,
+        'metrics': training_metrics,
+        'biometrics': latest_biometrics,
+        'progress': partial(recent_progress, limit=progress_limit),
+    }
+    if settings.DASHBOARD_CONCURRENT_QUERIES and not await sync_to_async(_in_transaction)():
+        results = await asyncio.gather(*(
+            sync_to_async(_on_own_connection, thread_sensitive=False, executor=QUERY_EXECUTOR)(section, user)
+            for section in sections.values()
+        ))
+    else:
+        results = await sync_to_async(lambda: [section(user) for section in sections.values()])()
+    return dict(zip(sections, results))
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .views import DashboardView
+
+# The `dashboard/` prefix will be added in the main project urls.py
+urlpatterns = [
+    path('', DashboardView.as_view(), name='dashboard'),
+]
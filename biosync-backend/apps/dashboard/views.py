@@ -0,0 +1,60 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+
+from biosync.renderers import FastJSONRenderer
+from apps.users.authentication import ClaimsJWTAuthentication
+
+from .sections import load_dashboard
+
+
+def _session_user(request):
+    return request.user if request.user.is_authenticated else None
+
+
+class DashboardView(View):
+    """
+    Everything the PWA shows at startup in one request: active goals with their
+    progress_percentage, the training metrics, the latest biometric snapshot and the recent
+    progress entries. The same data took four requests, each paying authentication, middleware
+    and rendering. An async view: under ASGI (biosync/asgi.py) it waits on its concurrent
+    sub-queries without holding a worker thread.
+
+    Authenticates like the API (JWT, then the session), without going through DRF, whose views
+    are synchronous.
+    """
+    # Goals, progress and the biometric snapshot take one query each, the training metrics two
+    # (checked by `manage.py check_query_budgets`).
+    query_budget = {'get': 5}
+    recent_progress = 10
+
+    authentication = ClaimsJWTAuthentication()
+    renderer = FastJSONRenderer()
+
+    async def get(self, request):
+        try:
+            user = await self.authenticate(request)
+        except (AuthenticationFailed, NotAuthenticated) as exc:
+            return self.unauthorized(request, exc)
+        return self.render(await load_dashboard(user, self.recent_progress))
+
+    async def authenticate(self, request):
+        result = self.authentication.authenticate(request)
+        if result is not None:
+            return result[0]
+        # Session authentication loads the session and the user row, so it can't run on the event loop
+        user = await sync_to_async(_session_user)(request)
+        if user is None:
+            raise NotAuthenticated()
+        return user
+
+    def unauthorized(self, request, exc):
+        """The 401 DRF would send, body and WWW-Authenticate challenge included."""
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = self.render(data, status=exc.status_code)
+        response['WWW-Authenticate'] = self.authentication.authenticate_header(request)
+        return response
+
+    def render(self, data, status=200):
+        return HttpResponse(self.renderer.render(data), status=status, content_type=self.renderer.media_type)
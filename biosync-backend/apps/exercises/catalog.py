@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from biosync.parsers import json_loads
+from biosync.response_cache import bump_cache_version
+from apps.activities.models import ExerciseLog
+
+from .models import Exercise, ExerciseSearchTerm
+from .search import AUTOCOMPLETE_CACHE, normalize, search_terms
+
+# WGER language id of English, the language names are imported in by default
+WGER_ENGLISH = 2
+
+IMPORTED_FIELDS = ['wger_uuid', 'name', 'search_name', 'aliases', 'description', 'category', 'muscles', 'equipment']
+
+
+def read_dump(path):
+    """
+    Yields the exercises of a WGER dump: the `/api/v2/exerciseinfo/` objects saved as a JSON
+    array, as one page (`{"results": [...]}`) or an array of pages, or as NDJSON with one
+    exercise or page per line. Files ending in `.gz` are decompressed.
+    """
+    opener = gzip.open if str(path).endswith('.gz') else open
+    with opener(path, 'rb') as dump:
+        content = dump.read()
+    try:
+        documents = [json_loads(content, 'utf-8')]
+    except ValueError:
+        documents = [json_loads(line, 'utf-8') for line in content.splitlines() if line.strip()]
+
+    def walk(document):
+        if isinstance(document, list):
+            for item in document:
+                yield from walk(item)
+        elif isinstance(document, dict) and 'results' in document:
+            yield from walk(document['results'])
+        elif isinstance(document, dict):
+            yield document
+
+    for document in documents:
+        yield from walk(document)
+
+
+def _language(translation):
+    language = translation.get('language')
+    return language.get('id') if isinstance(language, dict) else language
+
+
+def _names(items, *keys):
+    """Display names from a list of WGER objects (or plain strings), in order, without duplicates."""
+    names = []
+    for item in items or ():
+        name = item if isinstance(item, str) else next((item[key] for key in keys if item.get(key)), None)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def catalog_record(item, language=WGER_ENGLISH):
+    """
+    Maps one exerciseinfo object to Exercise field values, with the name, aliases and
+    description of its `language` translation. Returns None if it has no such translation.
+    Flat objects carrying their own `name` (the older `/api/v2/exercise/` shape) are accepted too.
+    """
+    translations = item.get('translations') or item.get('exercises')
+    if translations is None and item.get('name'):
+        translations = [item]
+    translation = next(
+        (t for t in translations or () if t.get('name') and _language(t) in (language, None)), None,
+    )
+    if translation is None or item.get('id') is None:
+        return None
+
+    name = translation['name'].strip()
+    category = item.get('category')
+    record = {
+        'wger_uuid': item.get('uuid'),
+        'name': name,
+        'search_name': ' '.join(normalize(name)),
+        'aliases': _names(translation.get('aliases'), 'alias'),
+        'description': translation.get('description') or '',
+        'category': (category.get('name') if isinstance(category, dict) else category) or '',
+        'muscles': _names(item.get('muscles'), 'name_en', 'name'),
+        'equipment': _names(item.get('equipment'), 'name'),
+    }
+    record['source_hash'] = hashlib.sha256(json.dumps(record, sort_keys=True).encode('utf-8')).hexdigest()
+    return int(item['id']), record
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def import_catalog(items, language=WGER_ENGLISH, deactivate_missing=False, batch_size=500):
+    """
+    Loads exerciseinfo objects into the catalog incrementally, in one transaction: new
+    exercises are inserted, changed ones (by `source_hash`) updated and re-indexed, unchanged
+    ones left untouched. With `deactivate_missing`, active exercises absent from `items` (a
+    full dump) stop being suggested. Cached workout responses show catalog names, so those of
+    users who logged a new or renamed exercise are invalidated. Returns counts per outcome.
+    """
+    records, skipped = {}, 0
+    for item in items:
+        parsed = catalog_record(item, language)
+        if parsed is None:
+            skipped += 1
+            continue
+        # Overlapping pages: the last copy wins
+        records[parsed[0]] = parsed[1]
+
+    existing, names = {}, {}
+    for pk, source_hash, is_active, name in Exercise.objects.values_list('id', 'source_hash', 'is_active', 'name'):
+        existing[pk], names[pk] = (source_hash, is_active), name
+    now = timezone.now()
+    created, updated = [], []
+    for pk, record in records.items():
+        if pk not in existing:
+            created.append(Exercise(id=pk, **record))
+        elif existing[pk] != (record['source_hash'], True):
+            updated.append(Exercise(id=pk, is_active=True, updated_at=now, **record))
+    missing = [pk for pk, (_, is_active) in existing.items() if is_active and pk not in records] \
+        if deactivate_missing else []
+
+    with transaction.atomic():
+        Exercise.objects.bulk_create(created, batch_size=batch_size)
+        Exercise.objects.bulk_update(
+            updated, [*IMPORTED_FIELDS, 'source_hash', 'is_active', 'updated_at'], batch_size=batch_size,
+        )
+        for pks in _chunks((exercise.pk for exercise in updated), batch_size):
+            ExerciseSearchTerm.objects.filter(exercise_id__in=pks).delete()
+        ExerciseSearchTerm.objects.bulk_create(
+            [
+                ExerciseSearchTerm(exercise_id=exercise.pk, term=term)
+                for exercise in (*created, *updated)
+                for term in sorted(search_terms(exercise.name, exercise.aliases))
+            ],
+            batch_size=batch_size,
+        )
+        for pks in _chunks(missing, batch_size):
+            Exercise.objects.filter(pk__in=pks).update(is_active=False, updated_at=now)
+        transaction.on_commit(AUTOCOMPLETE_CACHE.clear)
+
+        renamed = [pk for pk, record in records.items() if names.get(pk) != record['name']]
+        for pks in _chunks(renamed, batch_size):
+            for user_id in ExerciseLog.objects.filter(wger_exercise_id__in=pks).values_list(
+                'workout__user_id', flat=True
+            ).distinct():
+                bump_cache_version(user_id, 'workouts')
+
+    return {
+        'created': len(created),
+        'updated': len(updated),
+        'unchanged': len(records) - len(created) - len(updated),
+        'deactivated': len(missing),
+        'skipped': skipped,
+    }
+
+
+def exercise_names(wger_ids):
+    """Catalog names for the given WGER ids, as {id: name}; unknown ids are left out."""
+    wger_ids = {wger_id for wger_id in wger_ids if wger_id is not None}
+    if not wger_ids:
+        return {}
+    return dict(Exercise.objects.filter(pk__in=wger_ids).values_list('id', 'name'))
@@ -0,0 +1,218 @@
+import json
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.activities.models import ExerciseRecord
+from apps.activities.views import WorkoutViewSet
+from apps.exercises.catalog import import_catalog, read_dump
+from apps.exercises.models import Exercise, ExerciseSearchTerm
+from apps.exercises.search import AUTOCOMPLETE_CACHE, normalize, search_exercises, search_terms
+from apps.exercises.seed import synthetic_dump
+from apps.exercises.views import ExerciseViewSet
+from apps.users.models import CustomUser
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports a WGER dump (a synthetic one by default) into the exercise catalog, re-imports it "
+        "to check that only changes are written, then types exercise names prefix by prefix against "
+        "the autocomplete endpoint. Checks results against a brute-force search and the index plan, "
+        "reports cold (database) and hot (cached) latency against a LIKE scan, and checks that "
+        "catalog names resolve on logged exercises and records. Everything is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help="A WGER dump to use instead of synthetic data.")
+        parser.add_argument('--exercises', type=int, default=2000, help="Synthetic catalog size.")
+        parser.add_argument('--queries', type=int, default=40, help="Exercise names to type out.")
+        parser.add_argument('--limit', type=int, default=10, help="Suggestions per request.")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help="Print the results as a single JSON object.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            items = list(read_dump(options['file'])) if options['file'] else synthetic_dump(rng, options['exercises'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+        report = {'benchmark': 'autocomplete'}
+
+        with transaction.atomic():
+            report['import'] = self.check_import(rng, items)
+            user = CustomUser.objects.create(
+                email=f"autocomplete-{uuid.uuid4().hex[:8]}@example.com", username=f"autocomplete-{uuid.uuid4().hex[:8]}",
+            )
+            names = list(Exercise.objects.filter(is_active=True).values_list('name', flat=True))
+            queries = list(dict.fromkeys(
+                name[:length] for name in rng.sample(names, min(options['queries'], len(names)))
+                for length in range(1, len(name) + 1) if name[:length].strip()
+            ))
+            self.check_results(queries, options['limit'])
+            self.check_plan(queries[len(queries) // 2], options['limit'])
+            report['latency'] = self.measure(user, queries, options['limit'])
+            self.check_name_resolution(user)
+            transaction.set_rollback(True)
+        AUTOCOMPLETE_CACHE.clear()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report))
+            return
+        self.stdout.write(f"import: {report['import']}")
+        for name, result in report['latency'].items():
+            self.stdout.write(
+                f"{name:>16}: p50 {result['p50_ms']:>7} ms  p95 {result['p95_ms']:>7} ms  "
+                f"{result['queries']} SQL queries/request ({result['requests']} requests)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            "Results match a brute-force search, the term lookup is an index search, and catalog names resolve."
+        ))
+
+    def check_import(self, rng, items):
+        """A first import, an unchanged re-import (no writes) and one with a few edits and removals."""
+        began = time.perf_counter()
+        first = import_catalog(items)
+        first_ms = (time.perf_counter() - began) * 1000
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = import_catalog(items)
+        writes = [query['sql'] for query in ctx.captured_queries
+                  if query['sql'].lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        if again['created'] or again['updated'] or writes:
+            raise CommandError(f"Re-importing an unchanged dump wrote to the catalog: {again}, {writes[:3]}")
+
+        edited = [json.loads(json.dumps(item)) for item in items]
+        changed = rng.sample(range(len(edited) - 1), max(1, len(edited) // 50))
+        for index in changed:
+            edited[index]['translations'][0]['name'] += ' Variation'
+        removed = edited.pop()
+        incremental = import_catalog(edited, deactivate_missing=True)
+        if incremental['updated'] != len(changed) or incremental['deactivated'] != 1:
+            raise CommandError(f"Incremental import wrote the wrong rows: {incremental}")
+        if Exercise.objects.get(pk=removed['id']).is_active:
+            raise CommandError("An exercise missing from a full dump is still active.")
+
+        return {
+            'exercises': first['created'],
+            'skipped': first['skipped'],
+            'first_import_ms': round(first_ms, 1),
+            'reimport_queries': len(ctx.captured_queries),
+            'incremental': incremental,
+        }
+
+    def check_results(self, queries, limit):
+        """The indexed search must return exactly what a scan of every exercise would."""
+        catalog = [
+            (pk, name, search_name, search_terms(name, aliases))
+            for pk, name, search_name, aliases in
+            Exercise.objects.filter(is_active=True).values_list('id', 'name', 'search_name', 'aliases')
+        ]
+        for query in queries:
+            words, phrase = normalize(query), ' '.join(normalize(query))
+            matches = [
+                (0 if search_name == phrase else 1 if search_name.startswith(phrase) else 2, len(name), name, pk)
+                for pk, name, search_name, terms in catalog
+                if all(any(term.startswith(word) for term in terms) for word in words)
+            ]
+            expected = [pk for *_, pk in sorted(matches)[:limit]]
+            got = [row['id'] for row in search_exercises(query, limit)]
+            if got != expected:
+                raise CommandError(f"{query!r}: got {got}, expected {expected}")
+
+    def check_plan(self, query, limit):
+        """The word lookups must seek the (term, exercise) index, never scan the term table."""
+        with CaptureQueriesContext(connection) as ctx:
+            search_exercises(query, limit)
+        if connection.vendor != 'sqlite':
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {ctx.captured_queries[-1]['sql']}")
+            plan = [row[-1] for row in cursor.fetchall()]
+        if any(line.startswith(f'SCAN {ExerciseSearchTerm._meta.db_table}') for line in plan):
+            raise CommandError(f"The term lookup scans the table: {plan}")
+
+    def measure(self, user, queries, limit):
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        view = ExerciseViewSet.as_view({'get': 'autocomplete'})
+
+        def request(query):
+            request = factory.get('/', {'q': query, 'limit': limit})
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as ctx:
+                began = time.perf_counter()
+                response = view(request)
+                response.render()
+                elapsed = (time.perf_counter() - began) * 1000
+            if response.status_code != 200:
+                raise CommandError(f"autocomplete {query!r}: HTTP {response.status_code}")
+            return elapsed, len(ctx.captured_queries)
+
+        def like_scan(query):
+            exercises = Exercise.objects.filter(is_active=True)
+            for word in query.split():
+                exercises = exercises.filter(name__icontains=word)
+            began = time.perf_counter()
+            list(exercises.order_by('name').values('id', 'name', 'category', 'equipment')[:limit])
+            return (time.perf_counter() - began) * 1000, 1
+
+        results = {}
+        cold = []
+        for query in queries:
+            AUTOCOMPLETE_CACHE.clear()
+            cold.append(request(query))
+        results['cold (database)'] = cold
+        for query in queries:
+            request(query)
+        results['hot (cached)'] = [request(query) for query in queries]
+        results['LIKE scan'] = [like_scan(query) for query in queries]
+
+        return {
+            name: {
+                'requests': len(samples),
+                'p50_ms': round(statistics.median(ms for ms, _ in samples), 3),
+                'p95_ms': round(percentile([ms for ms, _ in samples], 0.95), 3),
+                'queries': max(count for _, count in samples),
+            }
+            for name, samples in results.items()
+        }
+
+    def check_name_resolution(self, user):
+        """A workout logged with only a catalog id reads back, and is recorded, under the catalog name."""
+        exercise = Exercise.objects.filter(is_active=True).first()
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        request = factory.post('/', {
+            'title': 'Catalog only',
+            'start_time': (timezone.now() - timedelta(hours=1)).isoformat(),
+            'activity_type': 'weightlifting',
+            'exercises': [{'wger_exercise_id': exercise.pk, 'order_in_workout': 1, 'sets': [
+                {'set_number': 1, 'weight_kg': str(Decimal('60.00')), 'repetitions': 5},
+            ]}],
+        }, format='json')
+        force_authenticate(request, user=user)
+        response = WorkoutViewSet.as_view({'post': 'create'})(request)
+        if response.status_code != 201:
+            raise CommandError(f"Creating a workout with only a catalog id failed: {response.data}")
+
+        request = factory.get('/')
+        force_authenticate(request, user=user)
+        response = WorkoutViewSet.as_view({'get': 'list'})(request)
+        logged = response.data['results'][0]['exercises'][0]
+        if logged['exercise_name'] != exercise.name or logged['custom_name'] != '':
+            raise CommandError(f"The logged exercise didn't resolve its catalog name: {logged}")
+        record = ExerciseRecord.objects.get(user=user, wger_exercise_id=exercise.pk)
+        if record.exercise_name != exercise.name:
+            raise CommandError(f"The personal record is named {record.exercise_name!r}, not {exercise.name!r}")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.exercises.catalog import WGER_ENGLISH, import_catalog, read_dump
+
+
+class Command(BaseCommand):
+    help = (
+        "Loads the local exercise catalog from a WGER dump of /api/v2/exerciseinfo/ objects (JSON, "
+        "paginated JSON or NDJSON, optionally gzipped). Re-running is incremental: only new and "
+        "changed exercises are written and re-indexed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Dump file to read.")
+        parser.add_argument('--language', type=int, default=WGER_ENGLISH, help="WGER language id of the names (2 = English).")
+        parser.add_argument(
+            '--deactivate-missing', action='store_true',
+            help="The dump is complete: stop suggesting catalog exercises it no longer contains.",
+        )
+        parser.add_argument('--batch-size', type=int, default=500, help="Rows per bulk write.")
+
+    def handle(self, *args, **options):
+        try:
+            result = import_catalog(
+                read_dump(options['path']),
+                language=options['language'],
+                deactivate_missing=options['deactivate_missing'],
+                batch_size=options['batch_size'],
+            )
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Could not read {options['path']}: {exc}")
+
+        self.stdout.write(self.style.SUCCESS(
+            "Exercise catalog: {created} created, {updated} updated, {unchanged} unchanged, "
+            "{deactivated} deactivated, {skipped} skipped (no name in that language).".format(**result)
+        ))
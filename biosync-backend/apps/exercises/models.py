@@ -0,0 +1,56 @@
+import uuid
+
+from django.db import models
+
+
+class Exercise(models.Model):
+    """
+    One exercise of the local WGER catalog, loaded from a WGER data dump by
+    `manage.py import_wger_exercises`. The primary key is the WGER exercise id (the `id` of
+    `/api/v2/exerciseinfo/`), so an ExerciseLog's `wger_exercise_id` points straight at it.
+    """
+    id = models.IntegerField(primary_key=True, help_text="ID from WGER exercise API.")
+    wger_uuid = models.UUIDField(null=True, blank=True)
+
+    name = models.CharField(max_length=255)
+    # Lower-cased, accent-free name used to rank whole-name prefix matches (see search.py)
+    search_name = models.CharField(max_length=255, db_index=True)
+    aliases = models.JSONField(default=list, blank=True)
+    description = models.TextField(blank=True)
+    category = models.CharField(max_length=100, blank=True)
+    muscles = models.JSONField(default=list, blank=True)
+    equipment = models.JSONField(default=list, blank=True)
+
+    # Exercises missing from a later full dump are deactivated rather than deleted, so names
+    # still resolve for workouts that logged them; inactive exercises are not suggested.
+    is_active = models.BooleanField(default=True)
+    # Digest of the imported fields: unchanged exercises are skipped on re-import
+    source_hash = models.CharField(max_length=64)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['name', 'id']
+
+    def __str__(self):
+        return f"{self.name} (WGER {self.id})"
+
+
+class ExerciseSearchTerm(models.Model):
+    """
+    Inverted index for autocomplete: one row per distinct normalized word of an exercise's
+    name and aliases. A word prefix becomes a range scan over the (term, exercise) index.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    exercise = models.ForeignKey(Exercise, on_delete=models.CASCADE, related_name='search_terms')
+    term = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            # Also the covering index of the prefix range scan, which only needs exercise ids
+            models.UniqueConstraint(fields=['term', 'exercise'], name='exercise_term_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} -> {self.exercise_id}"
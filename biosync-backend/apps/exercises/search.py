@@ -0,0 +1,161 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.functions import Length
+
+from .models import Exercise, ExerciseSearchTerm
+
+TERM_MAX_LENGTH = ExerciseSearchTerm._meta.get_field('term').max_length
+_NON_ALPHANUMERIC = re.compile(r'[\W_]+')
+
+SEARCH_COLUMNS = ('id', 'name', 'category', 'equipment')
+# Words of a query that are matched; the rest are ignored. Keeps the SQL (one subquery per
+# word) within the backend's expression limits and the compiled statements below bounded.
+MAX_QUERY_WORDS = 8
+# (number of words, limit) -> (sql, params with placeholders); see _compiled_search
+_COMPILED_SEARCHES = {}
+
+
+def normalize(text):
+    """Splits text into lower-case, accent-free words: `Développé-couché` -> ['developpe', 'couche']."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return [word[:TERM_MAX_LENGTH] for word in _NON_ALPHANUMERIC.split(stripped.lower()) if word]
+
+
+def search_terms(name, aliases=()):
+    """The distinct words indexed for an exercise, from its name and every alias."""
+    return {word for text in (name, *aliases) for word in normalize(text)}
+
+
+def _successor(prefix):
+    """The smallest string greater than every string starting with `prefix`."""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _prefix(field, prefix):
+    """
+    `field` starts with `prefix`, written as a range (`prefix <= field < successor`) so it is an
+    index seek on any backend; LIKE can't use SQLite's case-sensitive indexes.
+    """
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': _successor(prefix)})
+
+
+def _search_queryset(words, phrase, limit):
+    """Matches every word through the term index, then ranks by the normalized whole name."""
+    exercises = Exercise.objects.filter(is_active=True)
+    for word in words:
+        exercises = exercises.filter(
+            pk__in=ExerciseSearchTerm.objects.filter(_prefix('term', word)).values('exercise_id')
+        )
+    rank = Case(
+        When(search_name=phrase, then=Value(0)),
+        When(_prefix('search_name', phrase), then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+    return (
+        exercises.annotate(rank=rank)
+        .order_by('rank', Length('name'), 'name', 'id')
+        .values(*SEARCH_COLUMNS)[:limit]
+    )
+
+
+def _compiled_search(word_count, limit):
+    """
+    The search SQL for `word_count` words, compiled by the ORM once and then reused with new
+    parameters: building and compiling the queryset costs several times what SQLite needs to run it.
+    It is compiled with placeholder strings, whose positions among the parameters are kept.
+    """
+    key = (word_count, limit)
+    if key not in _COMPILED_SEARCHES:
+        words = [f'\0word{index}\0' for index in range(word_count)]
+        sql, params = _search_queryset(words, '\0phrase\0', limit).query.sql_with_params()
+        _COMPILED_SEARCHES[key] = (sql, params)
+    return _COMPILED_SEARCHES[key]
+
+
+def search_exercises(query, limit):
+    """
+    Active exercises whose name or aliases contain a word starting with every word of `query`,
+    best first: the exact name, then names starting with the query, then shorter names.
+    Only the first MAX_QUERY_WORDS distinct words are matched. Returns `limit` dicts with the id, name, category and equipment, in one query.
+    """
+    words = list(dict.fromkeys(normalize(query)))[:MAX_QUERY_WORDS]
+    if not words:
+        return []
+    phrase = ' '.join(normalize(query))
+
+    values = {'\0phrase\0': phrase, _successor('\0phrase\0'): _successor(phrase)}
+    for index, word in enumerate(words):
+        values[f'\0word{index}\0'] = word
+        values[_successor(f'\0word{index}\0')] = _successor(word)
+    sql, params = _compiled_search(len(words), limit)
+
+    equipment = Exercise._meta.get_field('equipment')
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [values.get(param, param) if isinstance(param, str) else param for param in params])
+        rows = cursor.fetchall()
+    return [
+        {'id': pk, 'name': name, 'category': category, 'equipment': equipment.from_db_value(items, None, connection)}
+        for pk, name, category, items in rows
+    ]
+
+
+class PrefixCache:
+    """
+    In-process LRU of autocomplete results keyed by normalized query and limit. Keystrokes
+    repeat the same short prefixes across users, so the hot ones are answered without touching
+    the database. Entries expire after `ttl` seconds, which bounds how long another process's
+    catalog import can go unseen; an import in this process clears it immediately.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+
+AUTOCOMPLETE_CACHE = PrefixCache(
+    settings.EXERCISE_AUTOCOMPLETE_CACHE_SIZE, settings.EXERCISE_AUTOCOMPLETE_CACHE_SECONDS,
+)
+
+
+def autocomplete(query, limit):
+    """search_exercises through the hot-prefix cache. The returned list is shared; don't mutate it."""
+    key = (' '.join(normalize(query)), limit)
+    results = AUTOCOMPLETE_CACHE.get(key)
+    if results is None:
+        results = search_exercises(query, limit)
+        AUTOCOMPLETE_CACHE.set(key, results)
+    return results
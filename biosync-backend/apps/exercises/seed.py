@@ -0,0 +1,44 @@
+import uuid
+
+EQUIPMENT = ['Barbell', 'Dumbbell', 'Cable', 'Kettlebell', 'Machine', 'Smith Machine', 'Band', 'EZ Bar', 'Trap Bar', 'Landmine']
+ABBREVIATIONS = {'Barbell': 'BB', 'Dumbbell': 'DB', 'Kettlebell': 'KB'}
+MOVEMENTS = {
+    'Bench Press': 'Chest', 'Fly': 'Chest', 'Push Up': 'Chest', 'Squat': 'Legs', 'Lunge': 'Legs',
+    'Split Squat': 'Legs', 'Step Up': 'Legs', 'Leg Extension': 'Legs', 'Deadlift': 'Back', 'Row': 'Back',
+    'Pulldown': 'Back', 'Pullover': 'Back', 'Shrug': 'Back', 'Curl': 'Arms', 'Triceps Extension': 'Arms',
+    'Kickback': 'Arms', 'Shoulder Press': 'Shoulders', 'Lateral Raise': 'Shoulders', 'Hip Thrust': 'Legs',
+    'Good Morning': 'Back', 'Crunch': 'Abs', 'Russian Twist': 'Abs', 'Calf Raise': 'Calves',
+}
+MODIFIERS = ['', 'Incline', 'Decline', 'Seated', 'Standing', 'Single Arm', 'Close Grip', 'Wide Grip',
+             'Paused', 'Tempo', 'Reverse', 'Romanian', 'Sumo', 'Front', 'Overhead', 'Bulgarian', 'Développé']
+
+
+def synthetic_dump(rng, size):
+    """`size` exerciseinfo objects shaped like WGER's, with English names, aliases and other translations."""
+    names = [
+        ' '.join(part for part in (modifier, equipment, movement) if part)
+        for modifier in MODIFIERS for equipment in EQUIPMENT for movement in MOVEMENTS
+    ]
+    rng.shuffle(names)
+    if size > len(names):
+        raise ValueError(f"At most {len(names)} synthetic exercises can be generated.")
+
+    items = []
+    for wger_id, name in enumerate(names[:size], start=1):
+        movement = next(movement for movement in MOVEMENTS if name.endswith(movement))
+        equipment = next(equipment for equipment in EQUIPMENT if equipment in name)
+        aliases = []
+        if equipment in ABBREVIATIONS:
+            aliases.append({'id': wger_id, 'alias': name.replace(equipment, ABBREVIATIONS[equipment])})
+        items.append({
+            'id': wger_id,
+            'uuid': str(uuid.UUID(int=rng.getrandbits(128))),
+            'category': {'id': 1, 'name': MOVEMENTS[movement]},
+            'muscles': [{'id': 1, 'name': 'Musculus', 'name_en': MOVEMENTS[movement]}],
+            'equipment': [{'id': 1, 'name': equipment}],
+            'translations': [
+                {'id': wger_id * 10, 'name': name, 'language': 2, 'description': f"<p>{name}.</p>", 'aliases': aliases},
+                {'id': wger_id * 10 + 1, 'name': f"{name} (de)", 'language': 1, 'description': '', 'aliases': []},
+            ],
+        })
+    return items
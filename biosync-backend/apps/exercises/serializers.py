@@ -0,0 +1,11 @@
+from rest_framework import serializers
+
+from .models import Exercise
+
+
+class ExerciseSerializer(serializers.ModelSerializer):
+    """Read-only serializer for a catalog exercise."""
+    class Meta:
+        model = Exercise
+        fields = ('id', 'name', 'aliases', 'category', 'muscles', 'equipment', 'description', 'is_active')
+        read_only_fields = fields
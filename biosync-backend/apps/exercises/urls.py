@@ -0,0 +1,8 @@
+from rest_framework.routers import DefaultRouter
+from .views import ExerciseViewSet
+
+# /api/v1/exercises/, /api/v1/exercises/{id}/ and /api/v1/exercises/autocomplete/
+router = DefaultRouter()
+router.register(r'', ExerciseViewSet, basename='exercise')
+
+urlpatterns = router.urls
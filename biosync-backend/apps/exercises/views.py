@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from biosync.pagination import KeysetPagination
+
+from .models import Exercise
+from .search import autocomplete
+from .serializers import ExerciseSerializer
+
+
+class ExerciseViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    The local WGER exercise catalog. The list pages through active exercises by name
+    (`?category=` narrows it); detail lookups also resolve deactivated exercises, which
+    old workouts may still reference. `autocomplete` serves search-as-you-type.
+    """
+    serializer_class = ExerciseSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    ordering = ('name', 'id')
+
+    autocomplete_limit = 10
+    autocomplete_max_limit = 25
+
+    def get_queryset(self):
+        queryset = Exercise.objects.all()
+        if self.action == 'list':
+            queryset = queryset.filter(is_active=True)
+            category = self.request.query_params.get('category')
+            if category:
+                queryset = queryset.filter(category__iexact=category)
+        return queryset.order_by(*self.ordering)
+
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """
+        Exercises matching `?q=` as the user types: every word of the query must start a word
+        of the exercise's name or one of its aliases (`be pre` finds "Bench Press"). Returns up
+        to `?limit=` suggestions, best first. The catalog changes only on import, so responses
+        are cacheable by the client too.
+        """
+        try:
+            limit = int(request.query_params.get('limit', self.autocomplete_limit))
+        except ValueError:
+            raise ValidationError({'limit': "Must be an integer."})
+        if not 1 <= limit <= self.autocomplete_max_limit:
+            raise ValidationError({'limit': f"Must be between 1 and {self.autocomplete_max_limit}."})
+
+        query = request.query_params.get('q', '')
+        response = Response({'query': query, 'results': autocomplete(query, limit)})
+        patch_cache_control(response, private=True, max_age=settings.EXERCISE_AUTOCOMPLETE_CACHE_SECONDS)
+        return response
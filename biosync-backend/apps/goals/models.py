@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 from apps.users.models import CustomUser
 
@@ -32,11 +34,11 @@ class Goal(models.Model):
     
     # Target Metrics
     # Max digits 12, decimal places 2 for flexibility (e.g., currency, precise measurements)
-    target_value = models.DecimalField(max_digits=12, decimal_places=2, default=1.00)
+    target_value = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('1.00'))
     target_unit = models.CharField(max_length=50) # e.g., 'km', 'books', 'USD', 'hours'
     
     # New: Current Progress Value (This is what the frontend updates)
-    current_value = models.DecimalField(max_digits=12, decimal_places=2, default=0.00) 
+    current_value = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal('0.00')) 
 
     # Status and Type
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='NOT_STARTED')
@@ -52,6 +54,12 @@ class Goal(models.Model):
         ordering = ['target_date', 'status', 'title']
         verbose_name = "Goal"
         verbose_name_plural = "Goals"
+        indexes = [
+            # The goal list: a user's goals by target date (latest first), then status.
+            models.Index(fields=['user', '-target_date', 'status'], name='goal_user_target_idx'),
+            # Serves the delta sync's per-user "changed since cursor" range scan.
+            models.Index(fields=['user', 'updated_at', 'id'], name='goal_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s Goal: {self.title}"
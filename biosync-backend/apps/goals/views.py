@@ -1,17 +1,28 @@
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
+
+from biosync.conditional import ConditionalGetMixin
+from biosync.response_cache import CachedResponseMixin
+from apps.sync.tombstones import record_tombstones
 from .models import Goal
 from .serializers import GoalSerializer
 
-class GoalViewSet(viewsets.ModelViewSet):
+class GoalViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     A ViewSet for viewing and editing Goal instances.
     Requires authentication to list, retrieve, create, update, or destroy goals.
     Goals are automatically filtered by the authenticated user.
+    List and detail reads honour If-None-Match, so the client's refetch after every
+    mutation costs one aggregate query when nothing changed.
     """
     serializer_class = GoalSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # One query for the ETag validators, one for the rows.
+    query_budget = {'list': 2, 'retrieve': 2}
+    # Cached per user; goal writes here and progress writes (which move current_value) bump it
+    cache_resource = 'goals'
 
     def get_queryset(self):
         """
@@ -25,6 +36,17 @@ class GoalViewSet(viewsets.ModelViewSet):
         """
         serializer.save(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        """
+        Deletes the goal (cascading to its progress entries) and leaves tombstones for both,
+        so offline clients drop the entries too.
+        """
+        with transaction.atomic():
+            entry_ids = list(instance.progress_entries.values_list('pk', flat=True))
+            record_tombstones(self.request.user, 'goals', [instance.pk])
+            record_tombstones(self.request.user, 'progress', entry_ids)
+            instance.delete()
+
     # Example of a custom action: Mark goal as completed
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    # Use UUID primary keys for all models in this app
+    default_auto_field = 'django.db.models.UUIDField'
+    name = 'apps.jobs'
+    verbose_name = 'Background Jobs'
+
+    def ready(self):
+        # Registers the @job functions every app declares in its jobs.py
+        autodiscover_modules('jobs')
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.models import Job
+from apps.jobs.queue import claim_jobs, prune_finished_jobs, requeue_stale_jobs, retry_or_fail
+from apps.jobs.worker import run_in_process, setup_process
+
+# Seconds between the worker's housekeeping passes (stale leases, old finished jobs)
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued background jobs (see apps/jobs/queue.py) on a pool of worker processes, so "
+        "recomputations and cascade deletes run outside the request and beside each other. This "
+        "process claims due jobs from the database and hands them to the pool; stop it with SIGTERM "
+        "or Ctrl-C and it finishes the jobs it has started."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when no job is due.")
+        parser.add_argument(
+            '--max-tasks-per-child', type=int, default=100,
+            help="Jobs a worker process runs before it is replaced, bounding memory growth.",
+        )
+        parser.add_argument('--burst', action='store_true', help="Exit once no job is due instead of waiting for more.")
+
+    def handle(self, *args, **options):
+        self.worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        processes = max(1, options['processes'])
+        counts = {Job.SUCCEEDED: 0, Job.PENDING: 0, Job.FAILED: 0}
+        running = {}
+        pool = self.start_pool(processes, options['max_tasks_per_child'])
+        next_maintenance = 0
+        self.stdout.write(f"Worker {self.worker} running jobs on {processes} process(es).")
+        try:
+            while True:
+                if time.monotonic() >= next_maintenance:
+                    requeue_stale_jobs()
+                    prune_finished_jobs()
+                    next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+
+                if not self.stopping and len(running) < processes:
+                    for job_id in claim_jobs(self.worker, processes - len(running)):
+                        running[pool.submit(run_in_process, job_id)] = job_id
+                if not running:
+                    if self.stopping or options['burst']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                broken = False
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        counts[future.result()] += 1
+                    except BrokenProcessPool:
+                        broken = True
+                        counts[self.attempt_lost(job_id, "The worker process running the job died")] += 1
+                    except Exception as exc:
+                        counts[self.attempt_lost(job_id, f"The job couldn't be recorded: {exc!r}")] += 1
+                if broken:
+                    # Every job still on the broken pool is lost with it
+                    for job_id in running.values():
+                        counts[self.attempt_lost(job_id, "The worker process pool broke")] += 1
+                    running.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self.start_pool(processes, options['max_tasks_per_child'])
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker {self.worker} stopped: {counts[Job.SUCCEEDED]} succeeded, "
+            f"{counts[Job.PENDING]} to be retried, {counts[Job.FAILED]} failed."
+        ))
+
+    def start_pool(self, processes, max_tasks_per_child):
+        return ProcessPoolExecutor(
+            max_workers=processes, mp_context=multiprocessing.get_context('spawn'),
+            initializer=setup_process, max_tasks_per_child=max_tasks_per_child,
+        )
+
+    def attempt_lost(self, job_id, error):
+        """Retries a job whose process crashed before recording the outcome, as a failed attempt."""
+        job = Job.objects.get(pk=job_id)
+        if job.status != Job.RUNNING:
+            return job.status  # Recorded before the process died
+        return retry_or_fail(job, f"{error} ({self.worker}).")
+
+    def stop(self, signum, frame):
+        if self.stopping:
+            raise KeyboardInterrupt
+        self.stopping = True
+        self.stdout.write("Finishing the running jobs; signal again to abort.")
@@ -0,0 +1,59 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    A unit of background work: the registered job `name` called with `kwargs` by the
+    `run_jobs` worker (see queue.py). Pending jobs with the same `dedup_key` are coalesced into
+    one, so enqueueing the same recomputation many times runs it once.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100, help_text="Registered name of the job function.")
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Digest of the name and arguments unless the caller chose a key
+    dedup_key = models.CharField(max_length=64)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    # Not claimed before this time: the delay of a new job, or the backoff of a retry
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, help_text="Worker running the job.")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['run_after', 'created_at']
+        constraints = [
+            # At most one pending job per key; a running one doesn't count, since it may already
+            # have read the data the new job was enqueued for.
+            models.UniqueConstraint(
+                fields=['dedup_key'], condition=models.Q(status='pending'), name='unique_pending_job'
+            ),
+        ]
+        indexes = [
+            # The worker's claim (pending, due) and stale-lease (running, locked long ago) scans.
+            models.Index(fields=['status', 'run_after'], name='job_status_run_after_idx'),
+            models.Index(fields=['status', 'locked_at'], name='job_status_locked_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
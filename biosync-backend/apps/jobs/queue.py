@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Registered job functions by name; see job()
+JOBS = {}
+# How often enqueue retries when the pending job it would coalesce into is claimed meanwhile
+COALESCE_ATTEMPTS = 5
+
+
+def job(name, key=None, coalesce=None, max_attempts=None):
+    """
+    Registers a function as the job `name`, run with keyword arguments only, and adds
+    `fn.enqueue(**kwargs)`. Jobs live in each app's jobs.py, which is imported at startup.
+
+    Pending jobs with the same name and arguments are coalesced. With `key`, only those
+    arguments identify the job, and `coalesce(pending_kwargs, new_kwargs)` returns the
+    arguments of the one job doing the work of both.
+    """
+    def register(fn):
+        if name in JOBS:
+            raise ValueError(f"Job {name!r} is already registered")
+        fn.job_name = name
+        fn.job_options = {'key': key, 'coalesce': coalesce, 'max_attempts': max_attempts}
+        fn.enqueue = partial(enqueue, name)
+        JOBS[name] = fn
+        return fn
+    return register
+
+
+def _json_kwargs(kwargs):
+    """The arguments as they come back from the JSON column (UUIDs, dates and Decimals as strings)."""
+    return json.loads(json.dumps(kwargs, cls=DjangoJSONEncoder))
+
+
+def dedup_key(name, kwargs, key=None):
+    """A digest of the job name and its identifying arguments."""
+    identity = {arg: kwargs.get(arg) for arg in key} if key is not None else kwargs
+    payload = json.dumps([name, identity], sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def enqueue(name, delay=None, **kwargs):
+    """
+    Queues the job `name` to run with `kwargs` (JSON-serializable) after `delay` seconds, or
+    coalesces it into the identical job already pending, and returns the pending Job.
+
+    Call it inside the transaction writing the data the job reads: the worker only sees the job
+    once it commits, and never if it rolls back. The unique index on pending keys makes the
+    insert itself the duplicate check, so concurrent requests can't queue the same job twice.
+    With JOBS_EAGER (tests, single-process setups) the job runs right after the commit instead.
+    """
+    fn = JOBS[name]
+    options = fn.job_options
+    kwargs = _json_kwargs(kwargs)
+    run_after = timezone.now() + timedelta(seconds=delay or 0)
+    key = dedup_key(name, kwargs, options['key'])
+
+    for _ in range(COALESCE_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                pending = Job.objects.create(
+                    name=name, kwargs=kwargs, dedup_key=key, run_after=run_after,
+                    max_attempts=options['max_attempts'] or settings.JOBS_MAX_ATTEMPTS,
+                )
+            break
+        except IntegrityError:
+            pending = Job.objects.filter(dedup_key=key, status=Job.PENDING).first()
+            if pending is None:
+                continue  # Claimed since the insert failed: queue a new one
+            merged = options['coalesce'](pending.kwargs, kwargs) if options['coalesce'] else pending.kwargs
+            # Conditional on the job still being pending and unchanged, so a worker can't have
+            # claimed it with the arguments from before the merge
+            changed = Job.objects.filter(
+                pk=pending.pk, status=Job.PENDING, updated_at=pending.updated_at,
+            ).update(
+                kwargs=_json_kwargs(merged), run_after=min(pending.run_after, run_after), updated_at=timezone.now(),
+            )
+            if changed:
+                pending.kwargs = merged
+                break
+    else:
+        raise RuntimeError(f"Could not enqueue {name}: the pending job kept changing")
+
+    if settings.JOBS_EAGER:
+        transaction.on_commit(partial(run_now, pending.pk))
+    return pending
+
+
+def claim_jobs(worker, limit):
+    """
+    Marks up to `limit` due jobs as running for `worker` and returns their ids. The update only
+    takes jobs still pending, so workers racing for the same ones each get a distinct share.
+    """
+    now = timezone.now()
+    due = list(
+        Job.objects.filter(status=Job.PENDING, run_after__lte=now)
+        .order_by('run_after', 'created_at').values_list('pk', flat=True)[:limit]
+    )
+    if not due:
+        return []
+    Job.objects.filter(pk__in=due, status=Job.PENDING).update(
+        status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1, updated_at=now,
+    )
+    return list(
+        Job.objects.filter(pk__in=due, status=Job.RUNNING, locked_by=worker, locked_at=now)
+        .order_by('run_after', 'created_at').values_list('pk', flat=True)
+    )
+
+
+def run_job(job_id):
+    """
+    Runs a claimed job in this process and records the outcome: succeeded, or retried with
+    exponential backoff until its attempts run out. Returns the job's new status.
+    """
+    job = Job.objects.get(pk=job_id)
+    try:
+        JOBS[job.name](**job.kwargs)
+    except Exception:
+        logger.exception("Job %s (%s) failed on attempt %s", job.name, job.pk, job.attempts)
+        return retry_or_fail(job, traceback.format_exc())
+
+    # Only while this worker still holds it: a job whose lease expired belongs to the retry now
+    Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_at=job.locked_at).update(
+        status=Job.SUCCEEDED, last_error='', finished_at=timezone.now(), updated_at=timezone.now(),
+    )
+    return Job.SUCCEEDED
+
+
+def run_now(job_id):
+    """Claims one pending job and runs it in this process (JOBS_EAGER)."""
+    now = timezone.now()
+    claimed = Job.objects.filter(pk=job_id, status=Job.PENDING).update(
+        status=Job.RUNNING, locked_by='eager', locked_at=now, attempts=F('attempts') + 1, updated_at=now,
+    )
+    if claimed:
+        run_job(job_id)
+
+
+def retry_or_fail(job, error):
+    """
+    Puts a failed attempt of a running job back in the queue after a backoff, or marks the job
+    failed after its last attempt. A retry that meets a newer pending copy of itself is
+    coalesced into that one instead.
+    """
+    now = timezone.now()
+    running = Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_at=job.locked_at)
+    if job.attempts >= job.max_attempts:
+        running.update(status=Job.FAILED, last_error=error, finished_at=now, updated_at=now)
+        return Job.FAILED
+
+    backoff = settings.JOBS_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+    try:
+        with transaction.atomic():
+            running.update(
+                status=Job.PENDING, last_error=error, run_after=now + timedelta(seconds=backoff),
+                locked_by='', locked_at=None, updated_at=now,
+            )
+    except IntegrityError:
+        pending = enqueue(job.name, **job.kwargs)
+        running.update(
+            status=Job.FAILED, finished_at=now, updated_at=now,
+            last_error=f"{error}\nRetried as job {pending.pk}, which was already pending.",
+        )
+        return Job.FAILED
+    return Job.PENDING
+
+
+def requeue_stale_jobs():
+    """
+    Retries the running jobs whose worker has held them for longer than JOBS_LEASE_SECONDS: it
+    died or was killed, and the job would otherwise never finish. Returns how many there were.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_LEASE_SECONDS)
+    stale = list(Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff))
+    for job in stale:
+        retry_or_fail(job, f"Lease expired: {job.locked_by} held the job since {job.locked_at.isoformat()}.")
+    return len(stale)
+
+
+def prune_finished_jobs():
+    """Deletes succeeded and failed jobs older than JOBS_RETENTION_DAYS."""
+    cutoff = timezone.now() - timedelta(days=settings.JOBS_RETENTION_DAYS)
+    deleted, _ = Job.objects.filter(status__in=[Job.SUCCEEDED, Job.FAILED], finished_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,27 @@
+"""
+What the `run_jobs` pool processes run. They are spawned, so they import this module before
+Django is set up: nothing here may import models at module level.
+"""
+import signal
+
+import django
+
+
+def setup_process():
+    """Initializes Django in a fresh pool process (spawned, so nothing is shared with the parent)."""
+    # Ctrl-C reaches the whole process group; the parent decides when the pool stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+
+
+def run_in_process(job_id):
+    """Runs one job in a pool process, which keeps its connection only as long as CONN_MAX_AGE allows."""
+    from django.db import close_old_connections
+
+    from .queue import run_job
+
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        close_old_connections()
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+
+from apps.goals.models import Goal
+from apps.progress.tracking import recompute_goal_progress
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds Goal.current_value and status from the goals' progress entries, in chunks of "
+        "goal ids. Each chunk is one set-based UPDATE, so memory stays flat with millions of entries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Goal ids per UPDATE statement.")
+        parser.add_argument('--user', help="Only rebuild goals of the user with this email.")
+        parser.add_argument('--dry-run', action='store_true', help="Report drifted goals without fixing them.")
+
+    def handle(self, *args, **options):
+        goals = Goal.objects.all()
+        if options['user']:
+            goals = goals.filter(user__email__iexact=options['user'])
+
+        bounds = goals.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            self.stdout.write("No goals to rebuild.")
+            return
+
+        chunk_size = options['chunk_size']
+        drifted = 0
+        for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+            with transaction.atomic():
+                drifted += recompute_goal_progress(
+                    goals.filter(pk__gte=start, pk__lt=start + chunk_size), dry_run=options['dry_run']
+                )
+
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{drifted} drifted goal(s) {verb}."))
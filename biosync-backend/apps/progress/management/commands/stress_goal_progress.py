@@ -0,0 +1,89 @@
+import threading
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.goals.models import Goal
+from apps.progress.views import ProgressEntryViewSet
+from apps.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Concurrency stress test for goal progress: parallel writers log and delete entries on "
+        "one shared goal through the API, then the goal's current_value is checked against the "
+        "sum of the surviving entries. Fails if any update was lost. Scratch data is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help="Number of parallel writer threads.")
+        parser.add_argument('--entries', type=int, default=50, help="Entries logged by each writer.")
+
+    def handle(self, *args, **options):
+        writers, per_writer = options['writers'], options['entries']
+        tag = uuid.uuid4().hex[:8]
+        user = CustomUser.objects.create(email=f"stress-{tag}@example.com", username=f"stress-{tag}")
+        goal = Goal.objects.create(
+            user=user,
+            title="Stress goal",
+            start_date=date.today(),
+            target_value=Decimal('1000000.00'),
+            target_unit='units',
+        )
+
+        create = ProgressEntryViewSet.as_view({'post': 'create'})
+        destroy = ProgressEntryViewSet.as_view({'delete': 'destroy'})
+        failures = []
+
+        def writer(number):
+            factory = APIRequestFactory(SERVER_NAME='localhost')
+            try:
+                for i in range(per_writer):
+                    # Unique dates per writer keep the (goal, date) constraint out of the way
+                    entry_date = date(2000, 1, 1) + timedelta(days=number * per_writer + i)
+                    request = factory.post('/', {'goal': goal.pk, 'date': entry_date, 'value': '1.25'}, format='json')
+                    force_authenticate(request, user=user)
+                    response = create(request)
+                    if response.status_code != 201:
+                        failures.append(f"create: HTTP {response.status_code} {response.data}")
+                        continue
+
+                    # Every third entry is rolled back again
+                    if i % 3 == 0:
+                        request = factory.delete('/')
+                        force_authenticate(request, user=user)
+                        response = destroy(request, pk=response.data['id'])
+                        if response.status_code != 204:
+                            failures.append(f"delete: HTTP {response.status_code}")
+            except Exception as exc:
+                failures.append(repr(exc))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            goal.refresh_from_db()
+            expected = sum(entry.value for entry in goal.progress_entries.all())
+            surviving = goal.progress_entries.count()
+        finally:
+            user.delete()
+
+        if failures:
+            raise CommandError(f"{len(failures)} request(s) failed, first: {failures[0]}")
+        if goal.current_value != expected:
+            raise CommandError(
+                f"Lost updates: current_value is {goal.current_value}, entries sum to {expected}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"ok: {writers} writers, {surviving} surviving entries, current_value {goal.current_value} "
+            f"matches the entry total; status {goal.status}"
+        ))
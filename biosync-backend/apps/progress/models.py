@@ -40,6 +40,14 @@ class ProgressEntry(models.Model):
         ordering = ['-date', '-created_at']
         # Ensure a user cannot log multiple progress entries for the same goal on the same day
         unique_together = ('goal', 'date') 
+        indexes = [
+            # The entry list: a user's entries newest first, with the keyset tie-breakers.
+            models.Index(fields=['user', '-date', '-created_at', '-id'], name='progress_user_date_idx'),
+            # The burn-up series: window functions partitioned by goal and ordered by date.
+            models.Index(fields=['user', 'goal', 'date'], name='progress_user_goal_date_idx'),
+            # Serves the delta sync's per-user "changed since cursor" range scan.
+            models.Index(fields=['user', 'updated_at', 'id'], name='progress_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s progress on {self.goal.title} ({self.date}): {self.value}"
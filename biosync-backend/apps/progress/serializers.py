@@ -2,6 +2,8 @@ from rest_framework import serializers
 from .models import ProgressEntry
 from apps.goals.models import Goal
 from django.db import transaction
+from biosync.response_cache import bump_cache_version
+from .tracking import apply_goal_progress
 
 class ProgressEntrySerializer(serializers.ModelSerializer):
     # Read-only field to show the goal's title in the entry response
@@ -15,28 +17,34 @@ class ProgressEntrySerializer(serializers.ModelSerializer):
         )
         read_only_fields = ('id', 'user', 'created_at', 'updated_at', 'goal_title')
 
+    def validate_goal(self, goal):
+        """Progress may only be logged against the requesting user's own goals."""
+        request = self.context.get('request')
+        if request is not None and goal.user_id != request.user.pk:
+            raise serializers.ValidationError("Invalid goal.")
+        return goal
+
     def create(self, validated_data):
         # Use a transaction to ensure both the entry creation and goal update succeed or fail together.
         with transaction.atomic():
             # 1. Create the ProgressEntry
             progress_entry = ProgressEntry.objects.create(**validated_data)
-            
-            # 2. Update the Goal's current_value
-            goal = progress_entry.goal
-            
-            # The Goal model's current_value field is a DecimalField
-            new_value = goal.current_value + progress_entry.value
 
-            # Update the status if the goal is completed
-            new_status = goal.status
-            if new_value >= goal.target_value:
-                new_status = 'COMPLETED'
-            elif goal.status == 'NOT_STARTED' and new_value > 0:
-                new_status = 'IN_PROGRESS'
-            # If it was already IN_PROGRESS, it remains IN_PROGRESS unless COMPLETED
+            # 2. Increment the Goal's current_value (and derive its status) inside the database,
+            # so entries logged concurrently from several devices can't overwrite each other.
+            apply_goal_progress({progress_entry.goal_id: progress_entry.value})
+            # The goal's cached reads are stale now that its current_value moved
+            bump_cache_version(progress_entry.user_id, 'goals')
 
-            goal.current_value = new_value
-            goal.status = new_status
-            goal.save(update_fields=['current_value', 'status', 'updated_at'])
-            
             return progress_entry
+
+
+class ProgressBulkItemSerializer(serializers.Serializer):
+    """
+    One entry of a bulk progress log. The goal is given by id and resolved by the view
+    against the user's goals in a single query.
+    """
+    goal = serializers.IntegerField()
+    date = serializers.DateField()
+    value = serializers.DecimalField(max_digits=10, decimal_places=2)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
@@ -0,0 +1,119 @@
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When, Window
+from django.db.models.functions import Coalesce, Greatest, TruncWeek
+from django.db.models.lookups import Exact, GreaterThan, GreaterThanOrEqual, LessThan
+from django.utils import timezone
+
+from biosync.response_cache import bump_cache_version
+
+from apps.goals.models import Goal
+
+from .models import ProgressEntry
+
+AMOUNT_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+def apply_goal_progress(deltas):
+    """
+    Adds per-goal deltas to Goal.current_value with a single UPDATE statement.
+
+    `deltas` maps goal id -> amount (positive when logging progress, negative when rolling an
+    entry back). The increment happens in the database (`current_value = current_value + delta`)
+    and the status is derived from the new value in the same statement, so concurrent writers
+    never read-modify-write in Python and no update can be lost. Returns the rows updated.
+
+    Status rules, matching the original create/delete logic:
+    - the new value reaches the target: COMPLETED
+    - a rollback brings the value to zero: NOT_STARTED
+    - a rollback leaves the value below the target: IN_PROGRESS
+    - progress is logged on a NOT_STARTED goal: IN_PROGRESS
+    - otherwise the status is left unchanged
+    """
+    deltas = {pk: Decimal(delta) for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return 0
+
+    delta = Case(*[When(pk=pk, then=Value(amount)) for pk, amount in deltas.items()], output_field=AMOUNT_FIELD)
+    new_value = Greatest(F('current_value') + delta, Value(Decimal('0')), output_field=AMOUNT_FIELD)
+    rolling_back = LessThan(delta, Value(Decimal('0')))
+
+    return Goal.objects.filter(pk__in=deltas.keys()).update(
+        current_value=new_value,
+        status=Case(
+            When(GreaterThanOrEqual(new_value, F('target_value')), then=Value('COMPLETED')),
+            When(rolling_back & Exact(new_value, Value(Decimal('0'))), then=Value('NOT_STARTED')),
+            When(rolling_back, then=Value('IN_PROGRESS')),
+            When(Exact(F('status'), Value('NOT_STARTED')) & GreaterThan(new_value, Value(Decimal('0'))), then=Value('IN_PROGRESS')),
+            default=F('status'),
+        ),
+        # .update() skips auto_now, so the change marker is set explicitly
+        updated_at=timezone.now(),
+    )
+
+
+def goal_progress_series(entries, resolution='day'):
+    """
+    Cumulative progress per goal for a burn-up chart, computed with window functions in one query.
+
+    Returns {goal_id: {'title', 'target_value', 'series': [{'bucket', 'value', 'cumulative'}]}}
+    where `value` is the progress logged in the bucket and `cumulative` the running total at
+    its end. Entries are unique per (goal, date), so daily buckets map one-to-one onto rows;
+    weekly buckets keep the last row of each week.
+    """
+    bucket = F('date') if resolution == 'day' else TruncWeek('date')
+    rows = (
+        entries.annotate(bucket=bucket)
+        .annotate(
+            bucket_value=Window(Sum('value'), partition_by=[F('goal_id'), F('bucket')]),
+            cumulative=Window(Sum('value'), partition_by=[F('goal_id')], order_by=[F('date').asc()]),
+        )
+        .values_list('goal_id', 'goal__title', 'goal__target_value', 'bucket', 'bucket_value', 'cumulative')
+        .order_by('goal_id', 'date')
+    )
+
+    goals = {}
+    for goal_id, title, target_value, bucket_start, bucket_value, cumulative in rows.iterator():
+        goal = goals.setdefault(goal_id, {'title': title, 'target_value': target_value, 'series': []})
+        point = {'bucket': bucket_start, 'value': bucket_value, 'cumulative': cumulative}
+        if goal['series'] and goal['series'][-1]['bucket'] == bucket_start:
+            goal['series'][-1] = point
+        else:
+            goal['series'].append(point)
+    return goals
+
+
+def recompute_goal_progress(goals, dry_run=False):
+    """
+    Rebuilds current_value (the sum of the goal's entries, floored at zero) and status for every
+    goal in the `goals` queryset with a single UPDATE ... SET current_value = (SELECT SUM(...)).
+    Nothing is loaded into Python, so memory is constant however many entries exist.
+    STUCK goals that are still below target keep their status. Returns the number of goals
+    whose stored value or status drifted from the recomputed one (and, unless `dry_run`, were fixed);
+    the cached goal responses of their owners are invalidated.
+    """
+    totals = (
+        ProgressEntry.objects.filter(goal=OuterRef('pk'))
+        .order_by()
+        .values('goal')
+        .annotate(total=Sum('value'))
+        .values('total')
+    )
+    new_value = Greatest(Coalesce(Subquery(totals, output_field=AMOUNT_FIELD), Value(Decimal('0'))), Value(Decimal('0')), output_field=AMOUNT_FIELD)
+    new_status = Case(
+        When(GreaterThanOrEqual(new_value, F('target_value')), then=Value('COMPLETED')),
+        When(Exact(new_value, Value(Decimal('0'))), then=Value('NOT_STARTED')),
+        When(Exact(F('status'), Value('STUCK')), then=Value('STUCK')),
+        default=Value('IN_PROGRESS'),
+    )
+
+    drifted = goals.alias(new_value=new_value, new_status=new_status).filter(
+        ~Q(current_value=F('new_value')) | ~Q(status=F('new_status'))
+    )
+    if dry_run:
+        return drifted.count()
+    owners = set(drifted.values_list('user_id', flat=True).distinct())
+    fixed = drifted.update(current_value=new_value, status=new_status, updated_at=timezone.now())
+    for user_id in owners:
+        bump_cache_version(user_id, 'goals')
+    return fixed
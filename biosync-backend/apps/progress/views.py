@@ -1,16 +1,36 @@
-from rest_framework import viewsets, permissions
+from collections import defaultdict
+from decimal import Decimal
+
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .models import ProgressEntry
-from .serializers import ProgressEntrySerializer
+from .serializers import ProgressEntrySerializer, ProgressBulkItemSerializer
+from .tracking import apply_goal_progress, goal_progress_series
+from apps.goals.models import Goal
 from rest_framework.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.db.models import Q
+from biosync.conditional import ConditionalGetMixin
+from biosync.pagination import KeysetPagination
+from biosync.response_cache import bump_cache_version
+from apps.sync.tombstones import record_tombstones
 
-class ProgressEntryViewSet(viewsets.ModelViewSet):
+class ProgressEntryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for detailed Progress Entries.
     Allows listing, creating, retrieving, updating, and destroying progress records.
     """
     serializer_class = ProgressEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    ordering = ('-date', '-created_at', '-id')
+    query_budget = {'list': 2, 'retrieve': 2, 'series': 1}
+    # Entries embed their goal, so a goal edit must also invalidate the cached list.
+    change_marker_fields = ('updated_at', 'goal__updated_at')
+
+    # Upper bound on entries accepted by a single bulk log request
+    bulk_limit = 1000
 
     def get_queryset(self):
         """
@@ -19,12 +39,19 @@ class ProgressEntryViewSet(viewsets.ModelViewSet):
         """
         queryset = ProgressEntry.objects.filter(user=self.request.user)
         
-        goal_id = self.request.query_params.get('goal_id')
+        goal_id = self.goal_id_param()
         if goal_id is not None:
             # Filter entries specifically for a given goal
             queryset = queryset.filter(goal__id=goal_id)
             
-        return queryset.select_related('goal').order_by('-date')
+        return queryset.select_related('goal').order_by(*self.ordering)
+
+    def goal_id_param(self):
+        """The optional `goal_id` filter, as an integer (ValidationError if it isn't one)."""
+        goal_id = self.request.query_params.get('goal_id')
+        if goal_id is not None and not goal_id.isdigit():
+            raise ValidationError({'goal_id': "Must be a goal id."})
+        return None if goal_id is None else int(goal_id)
 
     def perform_create(self, serializer):
         # Automatically set the user before saving
@@ -35,26 +62,15 @@ class ProgressEntryViewSet(viewsets.ModelViewSet):
     def perform_destroy(self, instance):
         """
         Custom delete logic to rollback the progress on the associated Goal.
+        The rollback is a database-side decrement, applied only if this request actually
+        deleted the row, so concurrent or repeated deletes can't roll back twice.
         """
-        goal = instance.goal
-        
-        # Rollback the current_value
-        goal.current_value -= instance.value
-        if goal.current_value < 0:
-            goal.current_value = 0 # Prevent negative progress
-            
-        # Recalculate status based on new value
-        if goal.current_value == 0:
-            goal.status = 'NOT_STARTED'
-        elif goal.current_value < goal.target_value:
-            goal.status = 'IN_PROGRESS'
-        # If it was previously 'COMPLETED' and is now below the target, set back to 'IN_PROGRESS'
-        elif goal.current_value < goal.target_value and goal.status == 'COMPLETED':
-            goal.status = 'IN_PROGRESS'
-
-        goal.save(update_fields=['current_value', 'status', 'updated_at'])
-        
-        instance.delete()
+        with transaction.atomic():
+            deleted, _ = ProgressEntry.objects.filter(pk=instance.pk).delete()
+            if deleted:
+                apply_goal_progress({instance.goal_id: -instance.value})
+                record_tombstones(self.request.user, 'progress', [instance.pk])
+                bump_cache_version(self.request.user.pk, 'goals')
         
     def perform_update(self, serializer):
         """
@@ -62,3 +78,99 @@ class ProgressEntryViewSet(viewsets.ModelViewSet):
         The user should delete the entry and create a new one to ensure goal history remains linear.
         """
         raise ValidationError("Directly updating progress entries is not allowed. Please delete the entry and log a new one for accurate history.")
+
+    @action(detail=False, methods=['get'])
+    def series(self, request):
+        """
+        Burn-up data: each goal's cumulative progress per day or week, computed with window
+        functions in one query instead of the client summing every entry.
+        Query params: `resolution` (day|week, default day) and the optional `goal_id` filter.
+        """
+        resolution = request.query_params.get('resolution', 'day')
+        if resolution not in ('day', 'week'):
+            raise ValidationError({'resolution': "Must be 'day' or 'week'."})
+
+        entries = ProgressEntry.objects.filter(user=request.user)
+        goal_id = self.goal_id_param()
+        if goal_id is not None:
+            entries = entries.filter(goal__id=goal_id)
+
+        goals = goal_progress_series(entries, resolution)
+        return Response({
+            'resolution': resolution,
+            'goals': [{'goal': goal_id, **goal} for goal_id, goal in goals.items()],
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_log(self, request):
+        """
+        Logs progress for many goals at once. Accepts a list (or {"entries": [...]}) of
+        {goal, date, value, notes}. Goals are resolved in one query, entries are inserted with
+        one bulk_create and every goal is incremented by a single UPDATE statement.
+        Invalid items are reported by their index and skipped.
+        """
+        already_logged = {'non_field_errors': ["Progress for this goal has already been logged on this date."]}
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get('entries')
+        if not isinstance(items, list):
+            raise ValidationError("Expected a list of progress entries.")
+        if len(items) > self.bulk_limit:
+            raise ValidationError(f"A single request may contain at most {self.bulk_limit} entries.")
+
+        serializer = ProgressBulkItemSerializer()
+        parsed, errors = [], []
+        for index, item in enumerate(items):
+            try:
+                parsed.append((index, serializer.run_validation(item)))
+            except ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+
+        goals = Goal.objects.filter(user=request.user, pk__in={data['goal'] for _, data in parsed}).in_bulk()
+        logged = set(
+            ProgressEntry.objects.filter(goal__in=goals.keys(), date__in={data['date'] for _, data in parsed})
+            .values_list('goal_id', 'date')
+        )
+
+        entries = []
+        for index, data in parsed:
+            goal = goals.get(data['goal'])
+            if goal is None:
+                errors.append({'index': index, 'errors': {'goal': ["Invalid goal."]}})
+                continue
+            # Mirrors the (goal, date) uniqueness of ProgressEntry, including duplicates within the payload
+            if (goal.pk, data['date']) in logged:
+                errors.append({'index': index, 'errors': already_logged})
+                continue
+            logged.add((goal.pk, data['date']))
+            entries.append((index, ProgressEntry(
+                user=request.user, goal=goal, date=data['date'], value=data['value'], notes=data.get('notes'),
+            )))
+
+        while True:
+            try:
+                with transaction.atomic():
+                    ProgressEntry.objects.bulk_create([entry for _, entry in entries])
+                    deltas = defaultdict(Decimal)
+                    for _, entry in entries:
+                        deltas[entry.goal_id] += entry.value
+                    apply_goal_progress(deltas)
+                    bump_cache_version(request.user.pk, 'goals')
+                break
+            except IntegrityError:
+                # A concurrent request logged some of the pairs since they were checked: report
+                # those like the check above and insert the rest
+                logged = set(
+                    ProgressEntry.objects.filter(goal__in=goals.keys(), date__in={entry.date for _, entry in entries})
+                    .values_list('goal_id', 'date')
+                )
+                conflicts = [index for index, entry in entries if (entry.goal_id, entry.date) in logged]
+                if not conflicts:
+                    raise
+                errors.extend({'index': index, 'errors': already_logged} for index in conflicts)
+                entries = [(index, entry) for index, entry in entries if (entry.goal_id, entry.date) not in logged]
+
+        return Response({
+            'created': [entry.pk for _, entry in entries],
+            'errors': sorted(errors, key=lambda error: error['index']),
+        }, status=status.HTTP_201_CREATED if entries or not errors else status.HTTP_400_BAD_REQUEST)
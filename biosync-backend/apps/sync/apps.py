@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    # Use UUID primary keys for all models in this app
+    default_auto_field = 'django.db.models.UUIDField'
+    name = 'apps.sync'
+    verbose_name = 'Offline Delta Sync'
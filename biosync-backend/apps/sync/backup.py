@@ -0,0 +1,373 @@
+import csv
+import io
+import json
+import uuid
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from apps.activities.models import Workout, BiometricData, workout_tree_prefetch
+from apps.activities.readiness import is_recovery_sample, update_readiness
+from apps.activities.rollups import refresh_biometric_rollups
+from apps.activities.serializers import (
+    WorkoutSerializer, BiometricDataSerializer, create_workout_trees, upsert_biometric_samples,
+)
+from apps.goals.models import Goal
+from apps.goals.serializers import GoalSerializer
+from apps.progress.models import ProgressEntry
+from apps.progress.serializers import ProgressEntrySerializer, ProgressBulkItemSerializer
+from apps.progress.tracking import apply_goal_progress
+
+EXPORT_FORMAT = 'biosync-export'
+EXPORT_VERSION = 1
+
+# Rows loaded per query while exporting, and records written per statement while importing
+EXPORT_CHUNK_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+
+# One CSV layout holds every record type: each row fills the columns of its `type`. Workouts are
+# flattened to one row per set, repeating the workout and exercise columns.
+CSV_COLUMNS = (
+    'type', 'id',
+    # goal
+    'title', 'description', 'start_date', 'target_date', 'target_value', 'target_unit',
+    'current_value', 'status', 'goal_type',
+    # progress
+    'goal', 'goal_title', 'date', 'value',
+    # workout, exercise and set
+    'start_time', 'end_time', 'duration_minutes', 'activity_type',
+    'exercise_id', 'wger_exercise_id', 'custom_name', 'order_in_workout',
+    'set_id', 'set_number', 'weight_kg', 'repetitions', 'rpe', 'to_failure',
+    # biometric
+    'timestamp', 'recorded_weight_kg', 'sleep_duration_hours', 'sleep_score',
+    'resting_heart_rate', 'heart_rate_variability', 'readiness_score',
+    # shared
+    'notes', 'created_at', 'updated_at',
+)
+EXERCISE_COLUMNS = ('wger_exercise_id', 'custom_name', 'order_in_workout')
+SET_COLUMNS = ('set_number', 'weight_kg', 'repetitions', 'rpe', 'to_failure')
+
+
+class BackupError(ValueError):
+    pass
+
+
+# --- Export ---
+
+def _export_sources(user):
+    """
+    (record type, queryset, serializer) in export order; goals precede the entries that reference
+    them. Each queryset loads everything its serializer reads, so a chunk costs a fixed number
+    of queries.
+    """
+    return (
+        ('goal', Goal.objects.filter(user=user), GoalSerializer),
+        ('progress', ProgressEntry.objects.filter(user=user).select_related('goal'), ProgressEntrySerializer),
+        ('workout', Workout.objects.filter(user=user).select_related('user').prefetch_related(workout_tree_prefetch()),
+         WorkoutSerializer),
+        ('biometric', BiometricData.objects.filter(user=user).select_related('user'), BiometricDataSerializer),
+    )
+
+
+def _chunks(queryset, size):
+    """Yields lists of at most `size` rows, walking the primary key so each chunk is a fresh range query."""
+    last = None
+    while True:
+        page = queryset.order_by('pk')
+        if last is not None:
+            page = page.filter(pk__gt=last)
+        rows = list(page[:size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1].pk
+
+
+def export_records(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields a header followed by every goal, progress entry, workout (with its exercises and sets)
+    and biometric sample of `user`, as plain dicts. Only one chunk of rows is held in memory at
+    a time, so memory use does not grow with the size of the account.
+    """
+    yield {
+        'type': 'header', 'format': EXPORT_FORMAT, 'version': EXPORT_VERSION,
+        'exported_at': timezone.now().isoformat(), 'user': user.email,
+    }
+    for record_type, queryset, serializer_class in _export_sources(user):
+        for rows in _chunks(queryset, chunk_size):
+            for data in serializer_class(rows, many=True).data:
+                # The owner is implied by the account the file is imported into
+                data.pop('user', None)
+                yield {'type': record_type, **data}
+
+
+def _flatten(record):
+    """Turns a record into CSV rows; a workout yields one row per set."""
+    if record['type'] != 'workout':
+        return [record]
+    base = {key: value for key, value in record.items() if key != 'exercises'}
+    rows = []
+    for exercise in record.get('exercises') or []:
+        exercise_row = {**base, 'exercise_id': exercise['id'], **{key: exercise[key] for key in EXERCISE_COLUMNS}}
+        for set_data in exercise.get('sets') or []:
+            rows.append({**exercise_row, 'set_id': set_data['id'], **{key: set_data[key] for key in SET_COLUMNS}})
+        if not exercise.get('sets'):
+            rows.append(exercise_row)
+    return rows or [base]
+
+
+def _buffered(chunks, size=64 * 1024):
+    """Joins small string chunks into blocks of about `size` characters for the response stream."""
+    buffer, length = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def export_ndjson(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Streams the account as NDJSON text blocks, one record per line."""
+    return _buffered(
+        json.dumps(record, cls=DjangoJSONEncoder, separators=(',', ':')) + '\n'
+        for record in export_records(user, chunk_size)
+    )
+
+
+def export_csv(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Streams the account as CSV text blocks using the CSV_COLUMNS layout."""
+    def lines():
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for record in export_records(user, chunk_size):
+            if record['type'] == 'header':
+                continue
+            for row in _flatten(record):
+                writer.writerow(row)
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+    return _buffered(lines())
+
+
+# --- Reading a backup back ---
+
+def read_ndjson(lines):
+    """Parses NDJSON byte or text lines into records, skipping blank lines."""
+    for line_number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as exc:
+            raise BackupError(f'NDJSON parse error on line {line_number} - {exc}')
+
+
+def read_csv(lines):
+    """
+    Parses CSV byte or text lines written by `export_csv` back into records, regrouping the
+    per-set rows of each workout into its nested exercises and sets. Empty cells are omitted.
+    """
+    text = (line.decode('utf-8') if isinstance(line, bytes) else line for line in lines)
+    workout = None
+    for row in csv.DictReader(text):
+        row = {key: value for key, value in row.items() if key and value not in ('', None)}
+        if workout is not None and (row.get('type') != 'workout' or row.get('id') != workout['id']):
+            yield workout
+            workout = None
+        if row.get('type') != 'workout':
+            yield row
+            continue
+
+        if workout is None:
+            workout = {key: value for key, value in row.items()
+                       if key not in ('exercise_id', 'set_id', *EXERCISE_COLUMNS, *SET_COLUMNS)}
+            workout['exercises'] = []
+        if 'exercise_id' in row:
+            exercises = workout['exercises']
+            if not exercises or exercises[-1]['id'] != row['exercise_id']:
+                exercises.append({'id': row['exercise_id'], 'sets': [],
+                                  **{key: row[key] for key in EXERCISE_COLUMNS if key in row}})
+            if 'set_id' in row:
+                exercises[-1]['sets'].append({key: row[key] for key in SET_COLUMNS if key in row})
+    if workout is not None:
+        yield workout
+
+
+# --- Import ---
+
+def import_records(user, records, batch_size=IMPORT_BATCH_SIZE, max_reported_errors=100):
+    """
+    Restores exported records into the account of `user`, validating each one with the same
+    serializer the API uses and writing them in batches. Values are restored as exported
+    (goal progress and status are not re-derived from the entries).
+
+    Importing is idempotent, so an interrupted import can simply be run again: goals are
+    matched by title, progress entries by (goal, date) and workouts by id, and records that
+    already exist are counted as skipped. Biometric samples are upserted on their timestamp.
+
+    Returns {'imported': {type: n}, 'skipped': {type: n}, 'errors': [{'index', 'type', 'errors'}],
+    'error_count': n}; only the first `max_reported_errors` errors are listed.
+    """
+    importer = _Importer(user, batch_size)
+    errors, error_count = [], 0
+
+    for index, record in enumerate(records):
+        record_type = record.get('type') if isinstance(record, dict) else None
+        try:
+            importer.add(record_type, record)
+        except ValidationError as exc:
+            error_count += 1
+            if len(errors) < max_reported_errors:
+                errors.append({'index': index, 'type': record_type, 'errors': exc.detail})
+    importer.flush()
+
+    return {
+        'imported': dict(importer.imported),
+        'skipped': dict(importer.skipped),
+        'errors': errors,
+        'error_count': error_count,
+    }
+
+
+class _Importer:
+    """Validates records one at a time and writes them in per-type batches."""
+
+    def __init__(self, user, batch_size):
+        self.user = user
+        self.batch_size = batch_size
+        self.pending_type, self.pending = None, []
+        self.imported, self.skipped = Counter(), Counter()
+        # Exported goal id -> goal id in this account, filled as goals are restored
+        self.goal_ids = {}
+        # Goals restored by this import, whose current_value already counts their backed-up entries
+        self.created_goals = set()
+        self.goals_by_title = None
+        self.serializers = {
+            'goal': GoalSerializer(),
+            'progress': ProgressBulkItemSerializer(),
+            'workout': WorkoutSerializer(),
+            'biometric': BiometricDataSerializer(),
+        }
+
+    def add(self, record_type, record):
+        if record_type == 'header':
+            if record.get('format') != EXPORT_FORMAT or record.get('version') != EXPORT_VERSION:
+                raise BackupError(f"Unsupported backup format {record.get('format')!r} version {record.get('version')!r}")
+            return
+        if record_type not in self.serializers:
+            raise ValidationError({'type': f'Unknown record type {record_type!r}.'})
+
+        if record_type != self.pending_type or len(self.pending) >= self.batch_size:
+            # Flushing first also means every goal is written before an entry looks it up
+            self.flush()
+            self.pending_type = record_type
+
+        if record_type == 'progress' and 'goal' in record:
+            # Point the entry at this account's copy of its goal before validating it
+            record = {**record, 'goal': self._resolve_goal(record)}
+        self.pending.append((record, self.serializers[record_type].run_validation(record)))
+
+    def flush(self):
+        if self.pending:
+            getattr(self, f'_write_{self.pending_type}')(self.pending)
+        self.pending = []
+
+    def _resolve_goal(self, record):
+        if self.goals_by_title is None:
+            self.goals_by_title = dict(Goal.objects.filter(user=self.user).values_list('title', 'id'))
+        goal_id = self.goal_ids.get(str(record['goal'])) or self.goals_by_title.get(record.get('goal_title'))
+        if goal_id is None:
+            raise ValidationError({'goal': 'Goal not found in this backup or account.'})
+        return goal_id
+
+    def _write_goal(self, batch):
+        titles = dict(Goal.objects.filter(
+            user=self.user, title__in=[data['title'] for _, data in batch],
+        ).values_list('title', 'id'))
+        new = {}
+        for _, data in batch:
+            if data['title'] in titles or data['title'] in new:
+                self.skipped['goal'] += 1
+            else:
+                new[data['title']] = Goal(user=self.user, **data)
+        Goal.objects.bulk_create(new.values())
+        titles.update((title, goal.pk) for title, goal in new.items())
+        self.created_goals.update(goal.pk for goal in new.values())
+        for record, data in batch:
+            self.goal_ids[str(record.get('id'))] = titles[data['title']]
+        self.goals_by_title = None
+        self.imported['goal'] += len(new)
+
+    def _write_progress(self, batch):
+        existing = set(ProgressEntry.objects.filter(
+            goal_id__in={data['goal'] for _, data in batch},
+            date__in={data['date'] for _, data in batch},
+        ).values_list('goal_id', 'date'))
+        entries = {}
+        for _, data in batch:
+            key = (data['goal'], data['date'])
+            if key in existing or key in entries:
+                self.skipped['progress'] += 1
+            else:
+                entries[key] = ProgressEntry(user=self.user, goal_id=data['goal'], date=data['date'],
+                                             value=data['value'], notes=data.get('notes'))
+        ProgressEntry.objects.bulk_create(entries.values())
+        # Entries added to goals that were already in the account move them like logged progress
+        deltas = defaultdict(Decimal)
+        for (goal_id, _), entry in entries.items():
+            if goal_id not in self.created_goals:
+                deltas[goal_id] += entry.value
+        apply_goal_progress(deltas)
+        self.imported['progress'] += len(entries)
+
+    def _write_workout(self, batch):
+        ids = {}
+        for record, _ in batch:
+            try:
+                ids[record.get('id')] = uuid.UUID(str(record.get('id')))
+            except ValueError:
+                pass
+        owners = dict(Workout.objects.filter(id__in=set(ids.values())).values_list('id', 'user_id'))
+        copies = set(Workout.objects.filter(
+            user=self.user, id__in=[uuid.uuid5(workout_id, str(self.user.pk)) for workout_id in owners],
+        ).values_list('id', flat=True))
+
+        items, seen = [], set()
+        for record, data in batch:
+            workout_id = ids.get(record.get('id'))
+            if workout_id in owners:
+                if owners[workout_id] == self.user.pk:
+                    self.skipped['workout'] += 1
+                    continue
+                # The id belongs to another account (a backup restored into a second user). Derive
+                # a stable id from it, so importing the same file again still finds the copy.
+                workout_id = uuid.uuid5(workout_id, str(self.user.pk))
+                if workout_id in copies:
+                    self.skipped['workout'] += 1
+                    continue
+            workout_id = workout_id or uuid.uuid4()
+            if workout_id in seen:
+                self.skipped['workout'] += 1
+                continue
+            seen.add(workout_id)
+            items.append({**data, 'user': self.user, 'id': workout_id})
+        if items:
+            create_workout_trees(items)
+        self.imported['workout'] += len(items)
+
+    def _write_biometric(self, batch):
+        written = upsert_biometric_samples(self.user, [data for _, data in batch], self.batch_size)
+        self.imported['biometric'] += len(written)
+        update_readiness(self.user, [item['timestamp'] for item in written if is_recovery_sample(item)])
+        refresh_biometric_rollups(self.user, [item['timestamp'] for item in written])
@@ -0,0 +1,174 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.activities.models import Workout, BiometricData, workout_tree_prefetch
+from apps.activities.serializers import WorkoutSerializer, BiometricDataSerializer
+from apps.goals.models import Goal
+from apps.goals.serializers import GoalSerializer
+from apps.progress.models import ProgressEntry
+from apps.progress.serializers import ProgressEntrySerializer
+
+from .models import Tombstone, SYNC_COLLECTIONS
+from .tombstones import retention_cutoff
+
+# Rows committed by a transaction that started before a sync but finished after it can carry
+# an `updated_at` just below that sync's upper bound. Each sync therefore re-reads this much
+# history before its cursor; clients apply changes as idempotent upserts, so repeats are harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _collection_querysets(user):
+    """Per-collection querysets and serializers, loading everything each serializer needs up front."""
+    return {
+        'goals': (Goal.objects.filter(user=user), GoalSerializer),
+        'progress': (ProgressEntry.objects.filter(user=user).select_related('goal'), ProgressEntrySerializer),
+        'workouts': (
+            Workout.objects.filter(user=user).select_related('user')
+            .prefetch_related(workout_tree_prefetch()),
+            WorkoutSerializer,
+        ),
+        'biometrics': (BiometricData.objects.filter(user=user).select_related('user'), BiometricDataSerializer),
+    }
+
+
+# --- Cursor encoding ---
+#
+# A cursor is an opaque token holding the sync window and how far into it the client got:
+#   s: lower bound (ISO datetime, None for a full sync)   u: upper bound, fixed on the first batch
+#   c: step (0 = tombstones, then one per collection)      p: (timestamp, id) of the last row sent
+# A finished sync hands back a cursor with only `s` set, which the device stores for next time.
+
+def encode_cursor(state):
+    payload = json.dumps(state, separators=(',', ':'))
+    return urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+
+
+# The model walked by each step, whose primary key ends a position
+STEP_MODELS = (Tombstone, Goal, ProgressEntry, Workout, BiometricData)
+
+
+def _aware(value):
+    """An ISO datetime from a cursor; the cursors only ever hold timezone-aware ones."""
+    value = datetime.fromisoformat(value)
+    if timezone.is_naive(value):
+        raise ValueError(value)
+    return value
+
+
+def decode_cursor(token):
+    """
+    Returns `(since, until, step, position)`, with the datetimes and the position's
+    `(timestamp, id)` parsed; anything malformed or tampered with raises InvalidCursor.
+    """
+    try:
+        state = json.loads(urlsafe_b64decode(token.encode('ascii')).decode('ascii'))
+        since = state['s'] and _aware(state['s'])
+        until = state.get('u') and _aware(state['u'])
+        step = int(state.get('c', 0))
+        position = state.get('p')
+        if not 0 <= step <= len(SYNC_COLLECTIONS):
+            raise InvalidCursor()
+        if position is not None:
+            timestamp, pk = position
+            position = (_aware(timestamp), STEP_MODELS[step]._meta.pk.to_python(pk))
+    except (TypeError, ValueError, KeyError, AttributeError, DjangoValidationError):
+        raise InvalidCursor()
+    return since, until, step, position
+
+
+def _after(field, position):
+    """Keyset filter for rows strictly after `(timestamp, id)` in `(field, id)` order."""
+    timestamp, pk = position
+    return Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, 'id__gt': pk})
+
+
+def changes_since(user, token=None, limit=500):
+    """
+    Returns one batch of the changes for `user` since the cursor `token` (None for a first,
+    full sync). Deletes are sent first as tombstone ids, then upserts per collection, in
+    `(updated_at, id)` order so each collection resumes with a range scan. At most `limit`
+    items are returned; `has_more` tells the client to call again with the returned cursor.
+    `reset` is set on the first batch of a full sync: the client should drop its local copy
+    and rebuild it from the batches that follow.
+    Work is proportional to the number of changed rows, not to the size of the account.
+    """
+    now = timezone.now()
+    if token:
+        since, until, step, position = decode_cursor(token)
+    else:
+        since, until, step, position = None, None, 0, None
+
+    reset = False
+    if until is None:
+        # First batch of a new window: pin its upper bound so later batches see a stable set.
+        until = now
+        if since is not None and since < retention_cutoff(now):
+            # Tombstones older than the cursor may already be pruned; deletes can't be replayed.
+            since, reset = None, True
+        elif since is None:
+            reset = True
+        step, position = 0, None
+    lower = since - SYNC_OVERLAP if since is not None else None
+
+    changes = {name: [] for name, _ in SYNC_COLLECTIONS}
+    deleted = {name: [] for name, _ in SYNC_COLLECTIONS}
+    collections = _collection_querysets(user)
+    remaining = limit
+
+    while step <= len(SYNC_COLLECTIONS) and remaining > 0:
+        if step == 0:
+            # A full sync replaces local state wholesale, so there is nothing to delete.
+            rows = []
+            if lower is not None:
+                queryset = Tombstone.objects.filter(user=user, deleted_at__gte=lower, deleted_at__lt=until)
+                if position:
+                    queryset = queryset.filter(_after('deleted_at', position))
+                rows = list(queryset.order_by('deleted_at', 'id')[:remaining + 1])
+            batch = rows[:remaining]
+            for tombstone in batch:
+                deleted[tombstone.collection].append(tombstone.object_id)
+            last = batch[-1].deleted_at if batch else None
+        else:
+            name = SYNC_COLLECTIONS[step - 1][0]
+            queryset, serializer_class = collections[name]
+            queryset = queryset.filter(updated_at__lt=until)
+            if lower is not None:
+                queryset = queryset.filter(updated_at__gte=lower)
+            if position:
+                queryset = queryset.filter(_after('updated_at', position))
+            rows = list(queryset.order_by('updated_at', 'id')[:remaining + 1])
+            batch = rows[:remaining]
+            changes[name] = serializer_class(batch, many=True).data
+            last = batch[-1].updated_at if batch else None
+
+        remaining -= len(batch)
+        if len(rows) > len(batch):
+            # The step has more rows than fit in this batch; resume after the last one sent.
+            position = [last.isoformat(), str(batch[-1].pk)]
+            break
+        step, position = step + 1, None
+
+    finished = step > len(SYNC_COLLECTIONS)
+    if finished:
+        cursor = {'s': until.isoformat()}
+    else:
+        cursor = {
+            's': since.isoformat() if since else None, 'u': until.isoformat(),
+            'c': step, 'p': position,
+        }
+    return {
+        'cursor': encode_cursor(cursor),
+        'has_more': not finished,
+        'reset': reset,
+        'deleted': deleted,
+        'changes': changes,
+    }
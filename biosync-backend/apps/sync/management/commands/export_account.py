@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sync.backup import EXPORT_CHUNK_SIZE, export_csv, export_ndjson
+from apps.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes a user's full history (goals, progress, workouts with exercises and sets, biometrics) "
+        "as an NDJSON or CSV backup. Rows are streamed in chunks, so memory stays flat for any account size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help="Email of the account to export.")
+        parser.add_argument('--format', choices=('ndjson', 'csv'), default='ndjson')
+        parser.add_argument('--output', help="File to write; defaults to stdout.")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="Rows loaded per query.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email__iexact=options['email'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+
+        writer = export_csv if options['format'] == 'csv' else export_ndjson
+        out = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for block in writer(user, options['chunk_size']):
+                out.write(block)
+        finally:
+            if out is not sys.stdout:
+                out.close()
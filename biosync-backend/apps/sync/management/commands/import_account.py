@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sync.backup import BackupError, IMPORT_BATCH_SIZE, import_records, read_csv, read_ndjson
+from apps.users.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        "Restores an NDJSON or CSV backup written by export_account (or the export endpoint) into a "
+        "user's account. The file is read line by line and written in batches; re-running is safe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help="Email of the account to restore into.")
+        parser.add_argument('path', help="Backup file to read.")
+        parser.add_argument('--format', choices=('ndjson', 'csv'), help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help="Records per bulk write.")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(email__iexact=options['email'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+
+        file_format = options['format'] or ('csv' if options['path'].lower().endswith('.csv') else 'ndjson')
+        reader = read_csv if file_format == 'csv' else read_ndjson
+        try:
+            with open(options['path'], 'rb') as backup:
+                result = import_records(user, reader(backup), batch_size=options['batch_size'])
+        except (OSError, BackupError) as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(json.dumps(result, indent=2, default=str))
+        if result['error_count']:
+            raise CommandError(f"{result['error_count']} record(s) could not be imported.")
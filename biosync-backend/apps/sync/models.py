@@ -0,0 +1,36 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+# Collections exposed through the sync endpoint, in the order changes are sent.
+SYNC_COLLECTIONS = (
+    ('goals', 'Goals'),
+    ('progress', 'Progress Entries'),
+    ('workouts', 'Workouts'),
+    ('biometrics', 'Biometric Data'),
+)
+
+
+class Tombstone(models.Model):
+    """
+    Records that an object was deleted, so an offline client can drop its local copy on the
+    next delta sync. Only the id is kept; tombstones older than the retention window are pruned
+    and clients whose cursor predates that window are told to reset instead.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='tombstones')
+    collection = models.CharField(max_length=20, choices=SYNC_COLLECTIONS)
+    # Goals use integer keys, everything else UUIDs; both are stored as text.
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            # Serves the per-user "deleted since cursor" range scan.
+            models.Index(fields=['user', 'deleted_at', 'id'], name='tombstone_user_deleted_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.collection}:{self.object_id}"
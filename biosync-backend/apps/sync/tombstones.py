@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Tombstone
+
+
+def retention_cutoff(now=None):
+    """Oldest instant for which tombstones are still guaranteed to exist."""
+    return (now or timezone.now()) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+
+def record_tombstones(user, collection, object_ids):
+    """
+    Records the deletion of `object_ids` from `collection` for `user`. Call it in the same
+    transaction as the delete. Tombstones past the retention window are pruned on the way,
+    keeping the table proportional to recent deletes.
+    """
+    now = timezone.now()
+    Tombstone.objects.filter(deleted_at__lt=retention_cutoff(now)).delete()
+    Tombstone.objects.bulk_create([
+        Tombstone(user=user, collection=collection, object_id=str(object_id), deleted_at=now)
+        for object_id in object_ids
+    ])
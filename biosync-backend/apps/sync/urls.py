@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .views import SyncView, ExportView, ImportView
+
+# The `sync/` prefix will be added in the main project urls.py
+urlpatterns = [
+    path('', SyncView.as_view(), name='sync'),
+    path('export/', ExportView.as_view(), name='sync-export'),
+    path('import/', ImportView.as_view(), name='sync-import'),
+]
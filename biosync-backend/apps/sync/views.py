@@ -0,0 +1,96 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from biosync.response_cache import bump_cache_version
+
+from .backup import BackupError, export_csv, export_ndjson, import_records, read_csv, read_ndjson
+from .changes import InvalidCursor, changes_since
+
+# Streaming writers and readers per backup file format
+EXPORT_FORMATS = {
+    'ndjson': (export_ndjson, 'application/x-ndjson'),
+    'csv': (export_csv, 'text/csv'),
+}
+
+
+class SyncView(APIView):
+    """
+    Delta sync for the offline PWA.
+
+    GET without a cursor returns a full snapshot (flagged `reset`); every response carries a
+    `cursor` the device stores and sends back as `?cursor=`. While `has_more` is true the
+    client keeps calling with the newest cursor to fetch the next batch; once it is false the
+    cursor marks the point the next reconnect resumes from. Each batch holds the ids deleted
+    since the cursor (`deleted`) and the goals, progress entries, workouts (with exercises and
+    sets) and biometrics created or updated since it (`changes`).
+    """
+    permission_classes = [IsAuthenticated]
+
+    # Items per batch, and the most a client may ask for with `?limit=`
+    default_limit = 500
+    max_limit = 2000
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        limit = min(max(limit, 1), self.max_limit)
+
+        try:
+            batch = changes_since(request.user, request.query_params.get('cursor'), limit=limit)
+        except InvalidCursor:
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        return Response(batch)
+
+
+class ExportView(APIView):
+    """
+    Streams the user's full history as a backup file: `?file_format=ndjson` (default) or `csv`.
+    Rows are read and serialized in fixed-size chunks while the response is being sent, so
+    memory stays flat however large the account is. The file can be restored with ImportView
+    or `manage.py import_account`.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Not `?format=`, which DRF reserves for choosing a renderer
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in EXPORT_FORMATS:
+            raise ValidationError({'file_format': f"Must be one of: {', '.join(EXPORT_FORMATS)}."})
+        writer, content_type = EXPORT_FORMATS[file_format]
+
+        response = StreamingHttpResponse(writer(request.user), content_type=f'{content_type}; charset=utf-8')
+        filename = f"biosync-export-{timezone.now():%Y%m%d}.{file_format}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+
+class ImportView(APIView):
+    """
+    Restores a backup produced by ExportView into the user's account. The body is the raw file,
+    sent as `text/csv` or `application/x-ndjson`; it is read line by line straight from the
+    request stream rather than parsed up front, so large backups are not held in memory.
+    Importing is idempotent: records already present are skipped.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        reader = read_csv if request.content_type.startswith('text/csv') else read_ndjson
+        stream = request.stream
+        if stream is None:
+            raise ValidationError("Expected a backup file in the request body.")
+        try:
+            result = import_records(request.user, reader(stream))
+        except BackupError as exc:
+            raise ValidationError(str(exc))
+        finally:
+            # Batches may have been written even if a later line failed
+            bump_cache_version(request.user.pk, 'goals', 'workouts', 'biometrics')
+        return Response(result, status=status.HTTP_200_OK if not result['error_count'] else status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,36 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    Stateless JWT authentication: the user is rebuilt from the signed access token claims
+    instead of being fetched from the database, so authenticating a request costs no queries.
+
+    The resulting `request.user` is a CustomUser carrying only the id, email, username and
+    staff flag. It works for filtering and foreign keys, but views that need the full profile
+    (or want to save it) must reload the row. Deactivation takes effect at the next refresh,
+    which does check the database, so keep ACCESS_TOKEN_LIFETIME short.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = CustomUser(
+            id=CustomUser._meta.pk.to_python(user_id),
+            email=validated_token.get('email', ''),
+            username=validated_token.get('username', ''),
+            is_staff=validated_token.get('is_staff', False),
+            is_active=True,
+        )
+        # Behave like a row loaded from the database rather than a new, unsaved instance
+        user._state.adding = False
+        user._state.db = 'default'
+        return user
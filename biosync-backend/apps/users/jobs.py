@@ -0,0 +1,34 @@
+from django.db import models, transaction
+
+from apps.jobs.queue import job
+
+from .models import CustomUser
+
+# Rows of one table deleted per transaction, keeping each one (and its locks) short
+DELETE_BATCH_SIZE = 500
+
+
+def _delete_in_batches(queryset):
+    pk_name = queryset.model._meta.pk.name
+    while True:
+        batch = list(queryset.values_list(pk_name, flat=True)[:DELETE_BATCH_SIZE])
+        if not batch:
+            return
+        with transaction.atomic():
+            # Still cascades to the rows' own children (a workout's exercises and sets)
+            queryset.model.objects.filter(pk__in=batch).delete()
+
+
+@job('users.delete_account')
+def delete_account(user_id):
+    """
+    Deletes a deactivated account and everything it owns, a batch at a time, then the user.
+    Years of workouts and minute-level biometrics can't be collected and deleted in one request.
+    """
+    user = CustomUser.objects.filter(pk=user_id, is_active=False).first()
+    if user is None:
+        return  # Already deleted, or reactivated since
+    for relation in CustomUser._meta.related_objects:
+        if relation.on_delete is models.CASCADE:
+            _delete_in_batches(relation.related_model.objects.filter(**{relation.field.name: user}))
+    user.delete()
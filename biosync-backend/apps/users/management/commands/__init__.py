@@ -0,0 +1 @@
+# This file marks the commands directory as a Python package.
@@ -0,0 +1,76 @@
+import json
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from apps.users.authentication import ClaimsJWTAuthentication
+from apps.users.models import CustomUser
+from apps.users.tokens import issue_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the per-request cost of authenticating with the legacy token table, "
+        "simplejwt's default JWT authentication (one user lookup) and the stateless "
+        "ClaimsJWTAuthentication. Reports microseconds and queries per request; data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help="Authentications per scheme.")
+        parser.add_argument('--json', action='store_true', help="Print the results as a single JSON object.")
+
+    def handle(self, *args, **options):
+        iterations = options['requests']
+        factory = APIRequestFactory(SERVER_NAME='localhost')
+        results = {}
+
+        with transaction.atomic():
+            tag = uuid.uuid4().hex[:8]
+            user = CustomUser.objects.create(email=f"auth-{tag}@example.com", username=f"auth-{tag}")
+            token = Token.objects.create(user=user)
+            access = issue_tokens(user)['access']
+
+            schemes = [
+                ('token_table', TokenAuthentication(), f'Token {token.key}'),
+                ('jwt_db_user', JWTAuthentication(), f'Bearer {access}'),
+                ('jwt_stateless', ClaimsJWTAuthentication(), f'Bearer {access}'),
+            ]
+            for name, authenticator, header in schemes:
+                request = Request(factory.get('/', HTTP_AUTHORIZATION=header))
+                authenticator.authenticate(request)  # warm-up
+
+                with CaptureQueriesContext(connection) as queries:
+                    began = time.perf_counter()
+                    for _ in range(iterations):
+                        authenticated_user, _auth = authenticator.authenticate(request)
+                    elapsed = time.perf_counter() - began
+
+                assert str(authenticated_user.pk) == str(user.pk)
+                results[name] = {
+                    'us_per_request': round(elapsed / iterations * 1e6, 1),
+                    'queries_per_request': len(queries.captured_queries) / iterations,
+                }
+
+            transaction.set_rollback(True)
+
+        baseline = results['token_table']['us_per_request']
+        for result in results.values():
+            result['speedup_vs_token_table'] = round(baseline / result['us_per_request'], 2)
+
+        if options['json']:
+            self.stdout.write(json.dumps({'benchmark': 'auth', 'requests': iterations, 'results': results}))
+            return
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:>14}: {result['us_per_request']:>8} us/request, "
+                f"{result['queries_per_request']:.0f} queries/request, "
+                f"{result['speedup_vs_token_table']}x vs token table"
+            )
@@ -60,3 +60,17 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.email
+
+
+class RevokedToken(models.Model):
+    """
+    Denylist of revoked JWT refresh tokens, identified by their `jti` claim.
+    Only revoked tokens are stored and rows are pruned once the token would have expired anyway,
+    so the table stays small. Access tokens are short-lived and never looked up here.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
@@ -1,5 +1,8 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from .models import CustomUser
+from .tokens import BioSyncRefreshToken, issue_tokens, revoke_refresh_token
 
 class CustomUserSerializer(serializers.ModelSerializer):
     """
@@ -41,3 +44,40 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             last_name=validated_data.get('last_name', ''),
         )
         return user
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    """
+    Exchanges a refresh token for a new access/refresh pair (the old refresh token is rotated out).
+    This is the only point where the denylist and the user's active flag are checked.
+    """
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        try:
+            refresh = BioSyncRefreshToken(attrs['refresh'])
+        except TokenError as exc:
+            raise InvalidToken(exc.args[0])
+
+        user = CustomUser.objects.filter(pk=refresh[jwt_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise InvalidToken("User is inactive or no longer exists.")
+
+        # Revoking doubles as the denylist check: it fails if the token was already used or revoked
+        if not revoke_refresh_token(refresh):
+            raise InvalidToken("Token has been revoked.")
+
+        return issue_tokens(user)
+
+
+class TokenRevokeSerializer(serializers.Serializer):
+    """Revokes a refresh token, e.g. on logout."""
+    refresh = serializers.CharField(write_only=True)
+
+    def validate(self, attrs):
+        try:
+            refresh = BioSyncRefreshToken(attrs['refresh'])
+        except TokenError as exc:
+            raise InvalidToken(exc.args[0])
+        revoke_refresh_token(refresh)
+        return {}
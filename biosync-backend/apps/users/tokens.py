@@ -0,0 +1,47 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import RevokedToken
+
+
+class BioSyncRefreshToken(RefreshToken):
+    """
+    Refresh token that also carries the profile claims needed to authenticate a request
+    without loading the user row. The claims are copied onto every derived access token.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['email'] = user.email
+        token['username'] = user.username
+        token['is_staff'] = user.is_staff
+        return token
+
+
+def issue_tokens(user):
+    """Returns a fresh {'access', 'refresh'} pair for `user`."""
+    refresh = BioSyncRefreshToken.for_user(user)
+    return {
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+    }
+
+
+def revoke_refresh_token(token):
+    """
+    Adds a validated refresh token to the denylist. Returns False if it was already revoked,
+    which lets a refresh treat the insert itself as its (race-free) denylist check.
+    Expired entries are pruned on the way, keeping the denylist compact.
+    """
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    RevokedToken.objects.filter(expires_at__lt=timezone.now()).delete()
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=token['jti'], expires_at=expires_at)
+    except IntegrityError:
+        return False
+    return True
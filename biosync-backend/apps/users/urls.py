@@ -1,10 +1,12 @@
 from django.urls import path
-from .views import UserRegistrationView, UserLoginView, UserProfileView
+from .views import UserRegistrationView, UserLoginView, UserProfileView, TokenRefreshView, LogoutView
 
 urlpatterns = [
     # Authentication endpoints
     path('register/', UserRegistrationView.as_view(), name='user-register'),
     path('login/', UserLoginView.as_view(), name='user-login'),
+    path('token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('logout/', LogoutView.as_view(), name='user-logout'),
 
     # Profile management (requires authentication)
     path('profile/', UserProfileView.as_view(), name='user-profile'),
@@ -1,14 +1,17 @@
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
-from rest_framework.authtoken.models import Token
 from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenViewBase
 from django.contrib.auth import authenticate
-from .serializers import CustomUserSerializer, UserRegistrationSerializer
+from django.db import transaction
+from .serializers import CustomUserSerializer, UserRegistrationSerializer, TokenRefreshSerializer, TokenRevokeSerializer
 from .models import CustomUser
+from .tokens import issue_tokens
+from .jobs import delete_account
 
 class UserRegistrationView(generics.CreateAPIView):
     """
-    Registers a new user and automatically generates and returns an authentication token.
+    Registers a new user and automatically issues a JWT access/refresh pair.
     """
     queryset = CustomUser.objects.all()
     serializer_class = UserRegistrationSerializer
@@ -19,18 +22,20 @@ class UserRegistrationView(generics.CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        # Generate token for the newly registered user
-        token, created = Token.objects.get_or_create(user=user)
+        # Issue tokens for the newly registered user
+        tokens = issue_tokens(user)
         
         headers = self.get_success_headers(serializer.data)
         return Response({
             'user': CustomUserSerializer(user).data,
-            'token': token.key
+            **tokens,
+            'token': tokens['access'],  # Kept for clients that still read `token`
         }, status=status.HTTP_201_CREATED, headers=headers)
 
 class UserLoginView(APIView):
     """
-    Authenticates a user via email/username and password, and returns the authentication token.
+    Authenticates a user via email/username and password, and returns a JWT access/refresh pair.
+    Tokens are stateless, so nothing is written on login.
     """
     permission_classes = [permissions.AllowAny]
 
@@ -51,24 +56,56 @@ class UserLoginView(APIView):
         if not user and username:
             user = CustomUser.objects.filter(username__iexact=username).first()
 
-        if user and user.check_password(password):
+        # Deleted accounts are deactivated first and removed in the background
+        if user and user.is_active and user.check_password(password):
             # Authentication successful
-            Token.objects.filter(user=user).delete() # Invalidate old token
-            token, created = Token.objects.get_or_create(user=user)
+            tokens = issue_tokens(user)
             return Response({
                 'user': CustomUserSerializer(user).data,
-                'token': token.key
+                **tokens,
+                'token': tokens['access'],  # Kept for clients that still read `token`
             })
         
         # Authentication failed
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_400_BAD_REQUEST)
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(generics.RetrieveUpdateDestroyAPIView):
     """
-    View to retrieve and update the authenticated user's profile.
+    View to retrieve, update and delete the authenticated user's profile.
     """
     serializer_class = CustomUserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user is rebuilt from token claims and only carries a few fields, so load the full row
+        return CustomUser.objects.get(pk=self.request.user.pk)
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        Deactivates the account at once (no login or token refresh from now on) and queues the
+        deletion of its data, which takes too long for a request on an account with years of it.
+        """
+        user = self.get_object()
+        with transaction.atomic():
+            user.is_active = False
+            user.save(update_fields=['is_active'])
+            delete_account.enqueue(user_id=user.pk)
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+
+class TokenRefreshView(TokenViewBase):
+    """
+    Rotates a refresh token: returns a new access/refresh pair and revokes the one presented.
+    """
+    serializer_class = TokenRefreshSerializer
+
+
+class LogoutView(TokenViewBase):
+    """
+    Revokes the given refresh token. Access tokens already issued expire on their own shortly after.
+    """
+    serializer_class = TokenRevokeSerializer
+
+    def post(self, request, *args, **kwargs):
+        super().post(request, *args, **kwargs)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,15 @@
+"""
+ASGI config for the biosync project.
+
+It exposes the ASGI callable as a module-level variable named ``application``. Serve it with
+any ASGI server, e.g. `uvicorn biosync.asgi:application`, so async views such as the dashboard
+run on the event loop instead of holding a worker thread while their queries run.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'biosync.settings')
+
+application = get_asgi_application()
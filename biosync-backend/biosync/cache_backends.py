@@ -0,0 +1,42 @@
+import os
+
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class LRUFileBasedCache(FileBasedCache):
+    """
+    File-based cache that evicts least recently used entries instead of random ones.
+
+    Django's FileBasedCache culls a random sample once MAX_ENTRIES is reached. Here every hit
+    refreshes the file's mtime (the expiry lives inside the file, so mtime is free to use) and
+    culling removes the files with the oldest mtimes, matching LocMemCache's LRU behaviour.
+    """
+    _missing = object()
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, self._missing, version)
+        if value is self._missing:
+            return default
+        try:
+            os.utime(self._key_to_file(key, version))
+        except FileNotFoundError:
+            # Culled by another process between the read and the touch
+            pass
+        return value
+
+    def _cull(self):
+        filelist = self._list_cache_files()
+        num_entries = len(filelist)
+        if num_entries < self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            return self.clear()
+
+        def last_used(fname):
+            try:
+                return os.path.getmtime(fname)
+            except FileNotFoundError:
+                return 0
+
+        for fname in sorted(filelist, key=last_used)[:num_entries // self._cull_frequency]:
+            self._delete(fname)
@@ -0,0 +1,89 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag / Last-Modified validators to the `list` and `retrieve` actions of a viewset.
+
+    The validators are derived from cheap per-user change markers instead of the rendered
+    body: a single aggregate query returns the row count and the newest value of each
+    field in `change_marker_fields` for the filtered queryset. An insert or an edit moves
+    the newest `updated_at`, and a delete changes the count, so the pair changes whenever
+    the collection does. When the client's `If-None-Match` / `If-Modified-Since` still
+    match, a 304 is returned without loading or serializing a single row.
+    """
+    # Timestamp columns whose maximum marks the last change, e.g. `updated_at` or
+    # `goal__updated_at` when related data is embedded in the representation.
+    change_marker_fields = ('updated_at',)
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
+
+    def _conditional(self, request, render):
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return render()
+
+        headers = HttpResponse()
+        headers['ETag'] = etag
+        headers['Cache-Control'] = 'private, no-cache'
+        if last_modified is not None:
+            headers['Last-Modified'] = http_date(last_modified)
+
+        conditional = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified, response=headers,
+        )
+        if conditional is not headers:
+            return conditional
+
+        response = render()
+        if 200 <= response.status_code < 300:
+            for name, value in headers.items():
+                response[name] = value
+        return response
+
+    def get_validators(self, request):
+        """
+        Returns `(etag, last_modified)` for the current request, or `(None, None)` when the
+        detail lookup matches nothing and the normal 404 path should run.
+        """
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        detail = lookup_url_kwarg in self.kwargs
+        if detail:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+        markers = {f'latest_{i}': Max(field) for i, field in enumerate(self.change_marker_fields)}
+        # Prefetches and select_related are irrelevant to an aggregate; drop them.
+        state = queryset.prefetch_related(None).select_related(None).aggregate(count=Count('pk'), **markers)
+        if detail and not state['count']:
+            return None, None
+
+        latest = [value for key, value in state.items() if key != 'count' and value is not None]
+        last_modified = int(max(latest).timestamp()) if latest else None
+
+        # The representation also depends on the URL (filters, cursor, page size) and on
+        # the negotiated format, so both take part in the tag.
+        parts = [
+            self.basename or type(self).__name__,
+            str(request.user.pk),
+            str(state['count']),
+            *(value.isoformat() if value else '' for key, value in state.items() if key != 'count'),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ]
+        digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+        # Weak: equal tags promise an equivalent representation, not identical bytes.
+        etag = f'W/"{digest}"'
+
+        # A delete in a list does not move the newest timestamp, so Last-Modified alone would
+        # wrongly validate; it is only sent for a single object, where it is exact.
+        return etag, (last_modified if detail else None)
@@ -0,0 +1,172 @@
+from collections import defaultdict
+from datetime import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.fields import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation returns database values unchanged, so the call can be skipped
+_IDENTITY_FIELDS = (
+    serializers.ReadOnlyField, serializers.CharField, serializers.IntegerField,
+    serializers.BooleanField, serializers.ChoiceField,
+)
+
+
+def _is_iso_datetime(field):
+    return (
+        type(field) is serializers.DateTimeField and not hasattr(field, 'timezone')
+        and getattr(field, 'format', api_settings.DATETIME_FORMAT) == ISO_8601
+    )
+
+
+class _IsoDateTime:
+    """
+    DateTimeField.to_representation for the default ISO 8601 output, minus the per-value
+    timezone lookup. Aware datetimes (what the database returns with USE_TZ) are formatted
+    inline; anything else goes through the field itself.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def bind(self):
+        field_timezone = self.field.default_timezone()
+        if field_timezone is None:
+            return self.field.to_representation
+        to_representation = self.field.to_representation
+
+        def convert(value):
+            if not isinstance(value, datetime) or value.tzinfo is None:
+                return to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+        return convert
+
+
+class ValuesRepresentation:
+    """
+    Builds a serializer's output from `values()` rows instead of model instances.
+
+    It is compiled from the serializer's own fields: each readable field becomes a column
+    (`source` `user.email` is read as `user__email`) converted with that field's
+    `to_representation`, so formats (ISO datetimes, quantized decimals, UUID strings) and key
+    order match the serializer exactly. Nested `many=True` serializers on reverse foreign keys
+    are loaded with one query per level, ordered by the matching Prefetch in `prefetches`,
+    which keeps children in the same order as the prefetching path.
+    """
+
+    def __init__(self, serializer, prefetches=()):
+        model = serializer.Meta.model
+        prefetches = {prefetch.prefetch_to: prefetch for prefetch in prefetches}
+        self.pk = model._meta.pk.attname
+        self.fields = []  # (name, column, convert) for columns, (name, None, child spec) for nested lists
+        self.children = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                prefetch = prefetches.get(field.source)
+                if prefetch is None or prefetch.queryset is None:
+                    raise ImproperlyConfigured(f"Nested field '{name}' needs a Prefetch with an ordered queryset.")
+                relation = model._meta.get_field(field.source)
+                child = ValuesRepresentation(field.child, prefetch.queryset._prefetch_related_lookups)
+                spec = (relation.field.attname, prefetch.queryset.prefetch_related(None), child)
+                self.fields.append((name, None, spec))
+                self.children.append((name, spec))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField) and not field.pk_field:
+                # values() yields the raw key, which is what the field would return
+                self.fields.append((name, field.source.replace('.', '__'), None))
+            elif isinstance(field, (serializers.BaseSerializer, serializers.RelatedField)) or field.source == '*':
+                raise ImproperlyConfigured(f"Field '{name}' can't be read from values() rows.")
+            else:
+                if type(field) in _IDENTITY_FIELDS:
+                    convert = None
+                elif _is_iso_datetime(field):
+                    convert = _IsoDateTime(field)
+                else:
+                    convert = field.to_representation
+                self.fields.append((name, field.source.replace('.', '__'), convert))
+
+    def columns(self, *extra):
+        """The values() lookups a row needs: every column, the primary key and `extra`."""
+        columns = [column for _, column, _ in self.fields if column is not None]
+        return list(dict.fromkeys([*columns, self.pk, *extra]))
+
+    def represent(self, rows):
+        """Returns one dict per row, in order, with nested lists attached."""
+        nested = {}
+        for name, (foreign_key, queryset, child) in self.children:
+            child_rows = list(
+                queryset.filter(**{f'{foreign_key}__in': [row[self.pk] for row in rows]})
+                .values(*child.columns(foreign_key))
+            ) if rows else []
+            grouped = defaultdict(list)
+            for child_row, data in zip(child_rows, child.represent(child_rows)):
+                grouped[child_row[foreign_key]].append(data)
+            nested[name] = grouped
+
+        # Datetime columns resolve the current timezone once per call rather than once per value
+        fields = [
+            (name, column, convert.bind() if isinstance(convert, _IsoDateTime) else convert)
+            for name, column, convert in self.fields
+        ]
+        results = []
+        for row in rows:
+            data = {}
+            for name, column, convert in fields:
+                if column is None:
+                    data[name] = nested[name].get(row[self.pk], [])
+                    continue
+                value = row[column]
+                # Serializers skip to_representation for None, and so do we
+                data[name] = value if value is None or convert is None else convert(value)
+            results.append(data)
+        return results
+
+
+class ValuesReadMixin:
+    """
+    Read-only fast path for `list` and `retrieve`: rows are fetched with `values()` and turned
+    into the serializer's exact output by a ValuesRepresentation, skipping model instantiation
+    and DRF's per-field machinery. Writes still go through the serializer.
+
+    Place it after ConditionalGetMixin/CachedResponseMixin so ETags and caching still wrap it.
+    `read_prefetches` lists the Prefetch objects the regular queryset uses for nested fields.
+    Rows are plain dicts, so object-level permissions are not checked; `get_queryset` must
+    already scope reads to what the user may see.
+    """
+    read_prefetches = ()
+
+    def get_values_representation(self):
+        cls = type(self)
+        # Compiled once per viewset class; the fields don't depend on the request
+        if cls.__dict__.get('_values_representation') is None:
+            cls._values_representation = ValuesRepresentation(self.get_serializer(), self.read_prefetches)
+        return cls._values_representation
+
+    def get_values_queryset(self):
+        representation = self.get_values_representation()
+        # Keyset pagination reads the ordering columns from each row
+        ordering = [field.lstrip('-') for field in getattr(self, 'ordering', None) or ()]
+        return (
+            self.filter_queryset(self.get_queryset())
+            .select_related(None).prefetch_related(None)
+            .values(*representation.columns(*ordering))
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_values_queryset()
+        representation = self.get_values_representation()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(representation.represent(page))
+        return Response(representation.represent(list(queryset)))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(self.get_values_queryset(), **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return Response(self.get_values_representation().represent([row])[0])
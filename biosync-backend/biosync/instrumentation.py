@@ -0,0 +1,311 @@
+import bisect
+import functools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+from rest_framework import permissions, status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+
+logger = logging.getLogger('biosync.performance')
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# The timings of the request being handled, or None outside an instrumented request. A context
+# variable, so code the request runs through sync_to_async, in any thread, still finds them.
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Time spent per phase of one request, in milliseconds."""
+    __slots__ = ('request', 'lock', 'queries', 'db_ms', 'auth_ms', 'serialize_ms', 'serialize_depth', 'render_ms')
+
+    def __init__(self, request):
+        self.request = request
+        # Queries of one request can run in several threads at once (see apps/dashboard)
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.db_ms = self.auth_ms = self.serialize_ms = self.render_ms = 0.0
+        self.serialize_depth = 0
+
+    @property
+    def view_name(self):
+        match = getattr(self.request, 'resolver_match', None)
+        return match.view_name if match is not None else None
+
+
+def _timed_serializer_data(data_property):
+    """Wraps BaseSerializer.data; only the outermost `.data` of a request phase is timed."""
+    @functools.wraps(data_property.fget)
+    def data(self):
+        timings = _current.get()
+        if timings is None:
+            return data_property.fget(self)
+        timings.serialize_depth += 1
+        began = time.perf_counter()
+        try:
+            return data_property.fget(self)
+        finally:
+            timings.serialize_depth -= 1
+            if not timings.serialize_depth:
+                timings.serialize_ms += (time.perf_counter() - began) * 1000
+    return property(data)
+
+
+def _timed_authenticate(authenticate):
+    @functools.wraps(authenticate)
+    def wrapper(self):
+        timings = _current.get()
+        if timings is None:
+            return authenticate(self)
+        began = time.perf_counter()
+        try:
+            return authenticate(self)
+        finally:
+            timings.auth_ms += (time.perf_counter() - began) * 1000
+    return wrapper
+
+
+def _timed_rendered_content(rendered_content_property):
+    """Wraps DRF's Response.rendered_content, which the handler calls to render the response."""
+    @functools.wraps(rendered_content_property.fget)
+    def rendered_content(self):
+        timings = _current.get()
+        if timings is None:
+            return rendered_content_property.fget(self)
+        began = time.perf_counter()
+        try:
+            return rendered_content_property.fget(self)
+        finally:
+            timings.render_ms += (time.perf_counter() - began) * 1000
+    return property(rendered_content)
+
+
+def _time_query(execute, sql, params, many, context):
+    """Execute wrapper on every connection: counts and times the queries of the current request."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    began = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - began) * 1000
+        with timings.lock:
+            timings.queries += 1
+            timings.db_ms += duration_ms
+        if duration_ms >= getattr(settings, 'PERFORMANCE_SLOW_QUERY_MS', 100):
+            # Parameters are left out: they can hold users' health data
+            logger.warning(
+                "Slow query in %s (%.1f ms, database %s): %s",
+                timings.view_name or 'middleware', duration_ms, context['connection'].alias, sql[:2000],
+            )
+
+
+def _attach_query_timer(connection, **kwargs):
+    # First in the list: execute_wrapper() blocks pop their own wrapper from the end
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+_hooks_installed = False
+
+
+def install_hooks():
+    """
+    Times DRF authentication, serialization and rendering, and the queries of every connection.
+    Serializer `.data`, `Request._authenticate` and `Response.rendered_content` are wrapped once
+    per process, and only when instrumentation is enabled; outside an instrumented request the
+    wrappers just call through. Connections are per thread, so the query timer is attached to
+    each as it connects, whichever thread (event loop, sync_to_async worker, pool) it belongs to.
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    BaseSerializer.data = _timed_serializer_data(BaseSerializer.data)
+    Request._authenticate = _timed_authenticate(Request._authenticate)
+    Response.rendered_content = _timed_rendered_content(Response.rendered_content)
+    connection_created.connect(lambda sender, connection, **kwargs: _attach_query_timer(connection), weak=False)
+    for connection in connections.all(initialized_only=True):
+        _attach_query_timer(connection)
+    _hooks_installed = True
+
+
+class EndpointHistograms:
+    """
+    In-process latency histograms per endpoint. Each worker process keeps its own; counts are
+    cumulative since the process started or since the last reset.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self.since = timezone.now()
+
+    def observe(self, endpoint, duration_ms, queries, status_code):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'counts': [0] * (len(self.buckets) + 1),
+                    'count': 0, 'sum_ms': 0.0, 'max_ms': 0.0, 'queries': 0, 'errors': 0,
+                }
+            stats['counts'][bisect.bisect_left(self.buckets, duration_ms)] += 1
+            stats['count'] += 1
+            stats['sum_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['queries'] += queries
+            stats['errors'] += status_code >= 500
+
+    def _quantile(self, counts, total, q):
+        """Upper bound of the bucket holding the q-th quantile (the max for the open bucket)."""
+        rank, seen = q * total, 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else None
+        return None
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {name: {**stats, 'counts': list(stats['counts'])} for name, stats in self._endpoints.items()}
+            since = self.since
+
+        rows = []
+        for name, stats in sorted(endpoints.items()):
+            total = stats['count']
+            quantiles = {
+                f'p{int(q * 100)}_ms': self._quantile(stats['counts'], total, q) or round(stats['max_ms'], 2)
+                for q in (0.5, 0.95, 0.99)
+            }
+            rows.append({
+                'endpoint': name,
+                'count': total,
+                'errors': stats['errors'],
+                'mean_ms': round(stats['sum_ms'] / total, 2),
+                'max_ms': round(stats['max_ms'], 2),
+                **quantiles,
+                'mean_queries': round(stats['queries'] / total, 2),
+                'buckets': {
+                    (f'le_{bound}' if index < len(self.buckets) else 'inf'): count
+                    for index, (bound, count) in enumerate(zip(self.buckets + (None,), stats['counts']))
+                },
+            })
+        return {'since': since.isoformat(), 'endpoints': rows}
+
+
+HISTOGRAMS = EndpointHistograms()
+
+
+class PerformanceMiddleware:
+    """
+    Measures each request: SQL count and time, DRF authentication, serialization and rendering.
+    Adds them as a `Server-Timing` header, logs requests and queries slower than the configured
+    thresholds (with the view name), and records latency in the per-endpoint histograms served
+    by MetricsView.
+
+    Phases can overlap: queries run lazily while serializing are counted in both `db` and
+    `serialize`. Streamed responses are measured up to the first byte only. Queries an async
+    view runs in other threads (the dashboard's concurrent sections) are counted too.
+
+    Both sync and async capable: under ASGI the async views keep running on the event loop
+    rather than in a thread of a sync middleware chain.
+
+    When PERFORMANCE_INSTRUMENTATION is off, the middleware removes itself at startup
+    (MiddlewareNotUsed), so it adds no per-request cost at all.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFORMANCE_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.server_timing = getattr(settings, 'PERFORMANCE_SERVER_TIMING', True)
+        self.slow_request_ms = getattr(settings, 'PERFORMANCE_SLOW_REQUEST_MS', 500)
+        install_hooks()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings(request)
+        token = _current.set(timings)
+        began = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, timings, began)
+
+    async def __acall__(self, request):
+        timings = RequestTimings(request)
+        token = _current.set(timings)
+        began = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, timings, began)
+
+    def record(self, request, response, timings, began):
+        total_ms = (time.perf_counter() - began) * 1000
+
+        # Unmatched URLs share one name, so scanners can't create an endpoint per path
+        view_name = timings.view_name or '<unmatched>'
+        endpoint = f"{request.method} {view_name}"
+        HISTOGRAMS.observe(endpoint, total_ms, timings.queries, response.status_code)
+
+        if self.server_timing:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={timings.db_ms:.1f};desc="{timings.queries} queries"',
+                f'auth;dur={timings.auth_ms:.1f}',
+                f'serialize;dur={timings.serialize_ms:.1f}',
+                f'render;dur={timings.render_ms:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ])
+        if total_ms >= self.slow_request_ms:
+            logger.warning(
+                "Slow request %s %s (%s): %.1f ms, status %s, %d queries in %.1f ms, auth %.1f ms, "
+                "serialize %.1f ms, render %.1f ms",
+                request.method, request.path, view_name, total_ms, response.status_code,
+                timings.queries, timings.db_ms, timings.auth_ms, timings.serialize_ms, timings.render_ms,
+            )
+        return response
+
+
+class MetricsView(APIView):
+    """
+    Staff-only read of this process's per-endpoint latency histograms: request count, errors,
+    mean/max and approximate p50/p95/p99 (bucket upper bounds), mean queries and raw buckets.
+    DELETE resets them.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'enabled': getattr(settings, 'PERFORMANCE_INSTRUMENTATION', False),
+            'buckets_ms': list(LATENCY_BUCKETS_MS),
+            **HISTOGRAMS.snapshot(),
+        })
+
+    def delete(self, request):
+        HISTOGRAMS.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
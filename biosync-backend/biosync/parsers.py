@@ -0,0 +1,63 @@
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.settings import api_settings
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:  # Optional: without it the standard library parses every body
+    orjson = None
+
+
+def json_loads(data, encoding, strict=api_settings.STRICT_JSON):
+    """
+    Parses a JSON document from bytes. orjson handles the common case; whatever it rejects
+    (integers beyond 64 bits, NaN, invalid input, non-UTF-8 charsets) is parsed by the standard
+    library, which then accepts or rejects it with exactly the error DRF's parser would give.
+    """
+    if orjson is not None and codecs.lookup(encoding).name == 'utf-8':
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data.decode(encoding), parse_constant=strict_constant if strict else None)
+
+
+class FastJSONParser(JSONParser):
+    """Drop-in JSONParser that parses with orjson when it is installed (see `json_loads`)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            return json_loads(stream.read(), encoding, strict=self.strict)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON (one JSON document per line) into a list.
+    Blank lines are ignored, so payloads may end with a trailing newline.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        items = []
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                # Non-strict like json.loads: NaN is left for the serializers to reject
+                items.append(json_loads(line, encoding, strict=False))
+            except ValueError as exc:
+                raise ParseError(f'NDJSON parse error on line {line_number} - {exc}')
+        return items
@@ -0,0 +1,137 @@
+import json
+import struct
+import sys
+from array import array
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: without it every response goes through DRF's renderer
+    orjson = None
+
+# orjson hands these to `default`, so DRF's encoder formats them exactly as the stdlib path would
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer that encodes with orjson when it is installed, producing the same bytes
+    as DRF's compact, unicode renderer for the data this API returns. Dates and other non-native
+    types are delegated to DRF's JSONEncoder, U+2028/U+2029 are escaped like DRF does, and
+    anything orjson can't encode (e.g. integers beyond 64 bits) falls back to DRF's renderer,
+    as do indented (browsable) or ASCII-only responses.
+
+    Two edge cases differ from the stdlib: NaN/Infinity render as null instead of raising, and
+    floats below 1e-4 or from 1e16 use orjson's exponent notation (`1e-5` rather than `1e-05`).
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (orjson is None or self.ensure_ascii or not self.compact or self.encoder_class is not JSONEncoder
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=_ORJSON_OPTIONS)
+        except TypeError:  # orjson.JSONEncodeError
+            return super().render(data, accepted_media_type, renderer_context)
+        # Valid JSON but not valid JavaScript; DRF escapes them, so must we
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """The columnar biometric format (apps/activities/columnar.py) as JSON."""
+    media_type = 'application/vnd.biosync.columnar+json'
+    format = 'columnar'
+
+
+# Typed array codes from narrowest to widest, as (array typecode, name for the client)
+_PACKED_TYPES = [('b', 'int8'), ('h', 'int16'), ('i', 'int32'), ('q', 'int64')]
+_PACKED_RANGES = [(-2 ** (8 * size - 1), 2 ** (8 * size - 1) - 1) for size in (1, 2, 4, 8)]
+PACKED_MAGIC = b'BSPK'
+_PACKED_ALIGNMENT = 8
+
+
+def _padding(length):
+    return -length % _PACKED_ALIGNMENT
+
+
+class PackedColumnarRenderer(BaseRenderer):
+    """
+    Binary variant of the columnar format: every list of integers becomes a little-endian typed
+    array of the narrowest width that holds it, and the rest of the payload stays JSON.
+
+    Layout: `BSPK`, a uint32 (little-endian) header length, the UTF-8 JSON header, then the
+    arrays. Each list in the header is replaced by `{"$block": {"type": "int8|int16|int32|int64",
+    "offset": n, "length": n}}`, the offset counting from the first array. The header and every
+    array are zero-padded to 8 bytes, so a browser can map each array straight onto an
+    Int8Array/Int16Array/Int32Array/BigInt64Array without copying. `unpack_columnar` decodes it.
+    """
+    media_type = 'application/vnd.biosync.packed'
+    format = 'packed'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        blocks = []
+        offset = 0
+
+        def pack(value):
+            nonlocal offset
+            if isinstance(value, dict):
+                return {key: pack(item) for key, item in value.items()}
+            if not isinstance(value, list):
+                return value
+            try:
+                packed = array('q', value)
+            except (TypeError, OverflowError):  # Not a list of 64-bit integers; keep it in the header
+                return [pack(item) for item in value]
+            low, high = (min(packed), max(packed)) if packed else (0, 0)
+            typecode, name = next(
+                code for code, (minimum, maximum) in zip(_PACKED_TYPES, _PACKED_RANGES)
+                if minimum <= low and high <= maximum
+            )
+            if typecode != 'q':
+                packed = array(typecode, packed)
+            if sys.byteorder == 'big':
+                packed.byteswap()
+            raw = packed.tobytes()
+            block = {'type': name, 'offset': offset, 'length': len(packed)}
+            blocks.append(raw + b'\0' * _padding(len(raw)))
+            offset += len(blocks[-1])
+            return {'$block': block}
+
+        header = json.dumps(pack(data), cls=JSONEncoder, separators=(',', ':')).encode('utf-8')
+        prefix = PACKED_MAGIC + struct.pack('<I', len(header)) + header
+        return b''.join([prefix, b'\0' * _padding(len(prefix)), *blocks])
+
+
+def unpack_columnar(content):
+    """Decodes a PackedColumnarRenderer body back into the original data."""
+    if content[:4] != PACKED_MAGIC:
+        raise ValueError("Not a packed columnar body.")
+    (header_length,) = struct.unpack_from('<I', content, 4)
+    header_end = 8 + header_length
+    data_start = header_end + _padding(header_end)
+    typecodes = {name: code for code, name in _PACKED_TYPES}
+
+    def unpack(value):
+        if isinstance(value, list):
+            return [unpack(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if set(value) == {'$block'}:
+            block = value['$block']
+            values = array(typecodes[block['type']])
+            start = data_start + block['offset']
+            values.frombytes(content[start:start + block['length'] * values.itemsize])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            return values.tolist()
+        return {key: unpack(item) for key, item in value.items()}
+
+    return unpack(json.loads(content[8:header_end]))
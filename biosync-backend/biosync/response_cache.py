@@ -0,0 +1,99 @@
+import functools
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+# Cache alias holding both the cached response data and the per-user version counters
+RESPONSE_CACHE = 'responses'
+
+
+def _version_key(resource, user_id):
+    return f'ver:{resource}:{user_id}'
+
+
+def get_cache_version(resource, user_id):
+    """
+    Returns the current version of `resource` for a user. A missing counter (never set, or
+    evicted) starts from the clock rather than zero, so it can never collide with a version
+    that stale entries are still stored under.
+    """
+    cache = caches[RESPONSE_CACHE]
+    key = _version_key(resource, user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(user_id, *resources):
+    """
+    Invalidates every cached response of `resources` for a user by moving their version
+    counters; old entries are never looked up again and age out through LRU eviction.
+    The bump runs once the current transaction commits, so a concurrent read can't cache
+    pre-commit data under the new version.
+    """
+    def bump():
+        cache = caches[RESPONSE_CACHE]
+        for resource in resources:
+            key = _version_key(resource, user_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def cache_response(view_method):
+    """Caches a custom read action of a CachedResponseMixin viewset, like list and retrieve."""
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: view_method(self, request, *args, **kwargs))
+    return wrapper
+
+
+class CachedResponseMixin:
+    """
+    Caches the response data of `list`, `retrieve` and actions decorated with `cache_response`
+    per user, keyed by a per-user, per-resource version counter (`cache_resource`), so a hit
+    skips both the database and the serializers.
+
+    Any successful write through the viewset (create, update, destroy and custom POST
+    actions) bumps the counter, which makes invalidation O(1): nothing is scanned or deleted.
+    Writes that change the resource from elsewhere call `bump_cache_version` themselves.
+    """
+    cache_resource = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs))
+
+    def cached_response(self, request, render):
+        cache = caches[RESPONSE_CACHE]
+        version = get_cache_version(self.cache_resource, request.user.pk)
+        # The data depends on the URL (filters, cursor, page size) and the negotiated format
+        variant = hashlib.sha1(
+            f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}".encode('utf-8')
+        ).hexdigest()
+        key = f'resp:{self.cache_resource}:{request.user.pk}:{version}:{self.action}:{variant}'
+
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = render()
+        if response.status_code == 200:
+            cache.set(key, response.data)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and 200 <= response.status_code < 300 \
+                and request.user.is_authenticated:
+            bump_cache_version(request.user.pk, self.cache_resource)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,4 +1,5 @@
 import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -23,15 +24,22 @@ INSTALLED_APPS = [
     # Third-party apps
     'rest_framework',
     'corsheaders',
-    'rest_framework.authtoken', # <-- NEW: Enable Token Authentication
+    'rest_framework.authtoken', # Legacy token table, no longer used for authentication (see benchmark_auth)
 
     # Project apps
     'apps.users',
     'apps.goals',
     'apps.progress',
+    'apps.activities',
+    'apps.sync',
+    'apps.exercises',
+    'apps.dashboard',
+    'apps.jobs',
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover every other middleware (removes itself when disabled)
+    'biosync.instrumentation.PerformanceMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -61,15 +69,44 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'biosync.wsgi.application'
+# Async views (the dashboard) only run on the event loop when served through ASGI
+ASGI_APPLICATION = 'biosync.asgi.application'
 
 # Database
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Seconds a connection is kept for the next request (0 closes it after every request)
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Caches
+# 'responses' holds per-user cached API reads (see biosync/response_cache.py). It is bounded by
+# MAX_ENTRIES and evicts least recently used entries: LocMemCache does so natively, and
+# biosync.cache_backends.LRUFileBasedCache can be selected to share the cache between processes.
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': RESPONSE_CACHE_BACKEND,
+        # A directory for the file backend, an instance name for local memory
+        'LOCATION': os.environ.get('RESPONSE_CACHE_LOCATION') or (
+            str(BASE_DIR / 'cache' / 'responses') if 'FileBasedCache' in RESPONSE_CACHE_BACKEND else 'biosync-responses'
+        ),
+        'TIMEOUT': int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 5000)),
+            # Evict a tenth of the entries when full
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',},
@@ -96,17 +133,65 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated', # Default to requiring authentication
     ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication', # <-- NEW: Set Token Auth as default
+        'apps.users.authentication.ClaimsJWTAuthentication', # Stateless JWT, no per-request DB lookup
         'rest_framework.authentication.SessionAuthentication', 
     ),
+    # orjson-backed drop-ins producing the same output as DRF's JSON classes (see biosync/renderers.py)
     'DEFAULT_PARSER_CLASSES': (
-        'rest_framework.parsers.JSONParser',
+        'biosync.parsers.FastJSONParser',
     ),
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'biosync.renderers.FastJSONRenderer',
     )
 }
 
+# JWT Configuration (djangorestframework-simplejwt)
+SIMPLE_JWT = {
+    # Access tokens are never checked against the database, so keep them short-lived
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.environ.get('JWT_ACCESS_MINUTES', 15))),
+    'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.environ.get('JWT_REFRESH_DAYS', 14))),
+    'SIGNING_KEY': SECRET_KEY,
+    # 'Token' is accepted alongside 'Bearer' so existing clients keep working with the access token
+    'AUTH_HEADER_TYPES': ('Bearer', 'Token'),
+    'USER_ID_FIELD': 'id',
+    'USER_ID_CLAIM': 'user_id',
+    'UPDATE_LAST_LOGIN': False,
+}
+
+# Offline sync: how long delete tombstones are kept. A device whose sync cursor is older than
+# this receives a full snapshot instead of a delta.
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+# Per-request performance instrumentation (see biosync/instrumentation.py): Server-Timing
+# headers, slow request/query logging and per-endpoint latency histograms at /api/v1/metrics/.
+PERFORMANCE_INSTRUMENTATION = os.environ.get('PERFORMANCE_INSTRUMENTATION', 'False').lower() in ('true', '1', 'yes')
+PERFORMANCE_SERVER_TIMING = os.environ.get('PERFORMANCE_SERVER_TIMING', 'True').lower() in ('true', '1', 'yes')
+PERFORMANCE_SLOW_REQUEST_MS = float(os.environ.get('PERFORMANCE_SLOW_REQUEST_MS', 500))
+PERFORMANCE_SLOW_QUERY_MS = float(os.environ.get('PERFORMANCE_SLOW_QUERY_MS', 100))
+
+# Exercise catalog autocomplete (see apps/exercises/search.py): each process keeps this many hot
+# query prefixes in memory, for this long (also the Cache-Control max-age of the responses).
+EXERCISE_AUTOCOMPLETE_CACHE_SIZE = int(os.environ.get('EXERCISE_AUTOCOMPLETE_CACHE_SIZE', 2048))
+EXERCISE_AUTOCOMPLETE_CACHE_SECONDS = int(os.environ.get('EXERCISE_AUTOCOMPLETE_CACHE_SECONDS', 300))
+
+# Dashboard (see apps/dashboard/sections.py): issue the independent sub-queries concurrently, on
+# a pool of DASHBOARD_QUERY_THREADS threads with a connection each. That only pays off when those
+# connections persist (DB_CONN_MAX_AGE); opening one per sub-query costs more than it saves.
+DASHBOARD_CONCURRENT_QUERIES = os.environ.get(
+    'DASHBOARD_CONCURRENT_QUERIES', str(DATABASES['default']['CONN_MAX_AGE'] > 0),
+).lower() in ('true', '1', 'yes')
+DASHBOARD_QUERY_THREADS = int(os.environ.get('DASHBOARD_QUERY_THREADS', 4))
+
+# Background jobs (see apps/jobs/queue.py), run by `manage.py run_jobs`. With JOBS_EAGER they run
+# in the enqueuing process right after its transaction commits, needing no worker (tests, dev).
+# A failed job is retried after JOBS_RETRY_DELAY_SECONDS, doubling each time; a job running for
+# longer than JOBS_LEASE_SECONDS is presumed lost with its worker and retried.
+JOBS_EAGER = os.environ.get('JOBS_EAGER', 'False').lower() in ('true', '1', 'yes')
+JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 5))
+JOBS_RETRY_DELAY_SECONDS = int(os.environ.get('JOBS_RETRY_DELAY_SECONDS', 30))
+JOBS_LEASE_SECONDS = int(os.environ.get('JOBS_LEASE_SECONDS', 600))
+JOBS_RETENTION_DAYS = int(os.environ.get('JOBS_RETENTION_DAYS', 7))
+
 # CORS Configuration (Required for React frontend to talk to Django backend)
 CORS_ORIGIN_WHITELIST = (
     'http://localhost:3000', # Assuming React runs here
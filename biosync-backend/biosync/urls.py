@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from biosync.instrumentation import MetricsView
+
 urlpatterns = [
     # 1. Django Admin Site
     path('admin/', admin.site.urls),
@@ -16,5 +18,20 @@ urlpatterns = [
         # Goals and Progress
         path('goals/', include('apps.goals.urls')),
         path('progress/', include('apps.progress.urls')), # Uncomment when Progress app is ready
+
+        # Workouts and Biometrics
+        path('activities/', include('apps.activities.urls')),
+
+        # Local WGER exercise catalog and autocomplete
+        path('exercises/', include('apps.exercises.urls')),
+
+        # Everything the PWA shows at startup, in one async request
+        path('dashboard/', include('apps.dashboard.urls')),
+
+        # Offline delta sync for the PWA
+        path('sync/', include('apps.sync.urls')),
+
+        # Per-endpoint latency histograms (staff only)
+        path('metrics/', MetricsView.as_view(), name='performance-metrics'),
     ])),
 ]